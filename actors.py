@@ -0,0 +1,117 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+
+
+class _Actor:
+    __slots__ = ("queue", "wakeup", "space", "task")
+
+    def __init__(self):
+        self.queue = deque()  # (func, args, future)
+        self.wakeup = asyncio.Event()
+        self.space = asyncio.Event()
+        self.task = None
+
+
+class ActorPool:
+    """Runs work one item at a time per key, and different keys concurrently
+
+    Each key (a channel, a member, ...) gets an actor task with its own
+    queue, so work for one key keeps its order without holding up the
+    others. Actors exit after `idle_timeout` seconds without work. A queue
+    holds at most `max_depth` items; submit() waits for room beyond that.
+    """
+
+    def __init__(self, max_depth=64, idle_timeout=30.0):
+        self.max_depth = max_depth
+        self.idle_timeout = idle_timeout
+        self.actors = {}  # key -> _Actor
+        # Optional hook called as observer(name, seconds) after each item
+        self.observer = None
+        self.processed = 0
+        self.failed = 0
+        self.blocked = 0
+        self.reclaimed = 0
+        self.max_depth_seen = 0
+        self.running = 0
+        self._drained = None
+
+    async def submit(self, key, func, *args):
+        """Queue `await func(*args)` on key's actor; returns a future for the result"""
+        actor = self.actors.get(key)
+        if actor is None:
+            actor = self.actors[key] = _Actor()
+            # Start from an empty context so profiling state of the first caller doesn't leak in
+            actor.task = contextvars.Context().run(asyncio.create_task, self._run(key, actor))
+
+        if len(actor.queue) >= self.max_depth:
+            self.blocked += 1
+            while len(actor.queue) >= self.max_depth:
+                actor.space.clear()
+                await actor.space.wait()
+
+        future = asyncio.get_running_loop().create_future()
+        actor.queue.append((func, args, future))
+        self.max_depth_seen = max(self.max_depth_seen, len(actor.queue))
+        actor.wakeup.set()
+        return future
+
+    async def _run(self, key, actor):
+        queue = actor.queue
+        while True:
+            if not queue:
+                actor.wakeup.clear()
+                try:
+                    await asyncio.wait_for(actor.wakeup.wait(), timeout=self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if not queue:
+                        # Idle: reclaim the actor; the next submit starts a new one
+                        del self.actors[key]
+                        self.reclaimed += 1
+                        return
+                continue
+
+            func, args, future = queue.popleft()
+            actor.space.set()
+            self.running += 1
+            started = time.perf_counter()
+            try:
+                result = await func(*args)
+            except Exception as e:
+                self.failed += 1
+                print(f"Error handling {func.__name__} for {key}: {str(e)}")
+                if not future.done():
+                    future.set_exception(e)
+                    future.exception()  # Nobody has to wait for it; don't warn if unread
+            else:
+                if not future.done():
+                    future.set_result(result)
+            self.processed += 1
+            self.running -= 1
+            if self.observer is not None:
+                self.observer(func.__name__, time.perf_counter() - started)
+            if self._drained is not None and not self.running and not self.depth():
+                self._drained.set()
+
+    async def drain(self):
+        """Wait until every queue is empty and nothing is running"""
+        while self.running or self.depth():
+            self._drained = asyncio.Event()
+            await self._drained.wait()
+        self._drained = None
+
+    def depth(self):
+        return sum(len(actor.queue) for actor in self.actors.values())
+
+    def stats(self):
+        return {
+            "actors": len(self.actors),
+            "queued": self.depth(),
+            "running": self.running,
+            "max_depth_seen": self.max_depth_seen,
+            "processed": self.processed,
+            "failed": self.failed,
+            "blocked": self.blocked,
+            "reclaimed": self.reclaimed,
+        }
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+
+
+class _TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self):
+        self.refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self):
+        self.refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class AdmissionController:
+    """Limits how fast channels can be created
+
+    Each member may create `member_limit` channels per `member_window`
+    seconds (sliding window). Each guild has a token bucket of
+    `guild_rate` creates per second with bursts of `guild_burst`. Callers
+    that find the bucket empty wait in a queue that is served round-robin
+    by member, for at most `max_wait` seconds.
+    """
+
+    def __init__(self, member_limit=3, member_window=60.0, guild_rate=0.5, guild_burst=10, max_wait=10.0):
+        self.member_limit = member_limit
+        self.member_window = member_window
+        self.guild_rate = guild_rate
+        self.guild_burst = guild_burst
+        self.max_wait = max_wait
+        self.history = {}  # (guild_id, member_id) -> deque of admit times
+        self.buckets = {}  # guild_id -> _TokenBucket
+        self.waiting = {}  # guild_id -> OrderedDict(member_id -> deque of futures)
+        self._drainers = {}  # guild_id -> Task
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = {"cooldown": 0, "busy": 0}
+
+    async def admit(self, guild_id, member_id):
+        """Wait for a creation slot; returns None if admitted or a reason it was refused"""
+        refusal = self._cooldown(guild_id, member_id)
+        if refusal:
+            return refusal
+
+        bucket = self.buckets.get(guild_id)
+        if bucket is None:
+            bucket = self.buckets[guild_id] = _TokenBucket(self.guild_rate, self.guild_burst)
+
+        # Only take a token directly if nobody is queued ahead of us
+        if not self.waiting.get(guild_id) and bucket.take():
+            self._admitted(guild_id, member_id)
+            return None
+
+        self.queued += 1
+        future = asyncio.get_running_loop().create_future()
+        queue = self.waiting.setdefault(guild_id, OrderedDict())
+        queue.setdefault(member_id, deque()).append(future)
+        self._start_drainer(guild_id)
+        try:
+            # The drainer admits (None) or refuses (a reason) queued callers
+            return await asyncio.wait_for(future, timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self.rejected["busy"] += 1
+            return "Lots of channels are being created right now. Please try again in a moment."
+
+    def _cooldown(self, guild_id, member_id):
+        """Why the member can't create another channel yet, or None"""
+        history = self.history.get((guild_id, member_id))
+        if history is None:
+            return None
+        now = time.monotonic()
+        while history and now - history[0] > self.member_window:
+            history.popleft()
+        if len(history) < self.member_limit:
+            return None
+        self.rejected["cooldown"] += 1
+        retry_in = int(self.member_window - (now - history[0])) + 1
+        return f"You're creating channels too quickly. Try again in {retry_in} seconds."
+
+    def _admitted(self, guild_id, member_id):
+        self.admitted += 1
+        history = self.history.get((guild_id, member_id))
+        if history is None:
+            history = self.history[(guild_id, member_id)] = deque()
+        history.append(time.monotonic())
+        if self.admitted % 1000 == 0:
+            self.prune()
+
+    def _start_drainer(self, guild_id):
+        task = self._drainers.get(guild_id)
+        if task is None or task.done():
+            self._drainers[guild_id] = asyncio.create_task(self._drain(guild_id))
+
+    async def _drain(self, guild_id):
+        """Hand out tokens to queued callers, one member at a time"""
+        bucket = self.buckets[guild_id]
+        queue = self.waiting[guild_id]
+        while queue:
+            member_id, futures = next(iter(queue.items()))
+            # Skip callers that already gave up
+            while futures and futures[0].done():
+                futures.popleft()
+            if not futures:
+                del queue[member_id]
+                continue
+            # Wait for a token without taking it, so one isn't spent on a
+            # caller that gives up in the meantime
+            wait = bucket.time_until_token()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            # Queued requests count against the member's window too
+            future = futures.popleft()
+            refusal = self._cooldown(guild_id, member_id)
+            if refusal is None:
+                bucket.take()
+                self._admitted(guild_id, member_id)
+            future.set_result(refusal)
+            # Back of the line for this member's next request
+            queue.move_to_end(member_id)
+            if not futures:
+                del queue[member_id]
+        del self.waiting[guild_id]
+
+    def prune(self):
+        """Forget members whose window has expired"""
+        now = time.monotonic()
+        for key, history in list(self.history.items()):
+            if not history or now - history[-1] > self.member_window:
+                del self.history[key]
+
+    def stats(self):
+        return {
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": dict(self.rejected),
+            "waiting": sum(len(futures) for queue in self.waiting.values() for futures in queue.values()),
+        }
@@ -0,0 +1,185 @@
+import heapq
+import time
+
+# Windows !stats reports on: name -> seconds
+WINDOWS = {"1h": 3600.0, "24h": 86400.0}
+
+
+class RollingCounts:
+    """Per-key sums over the last `window` seconds
+
+    The window is split into `buckets` slots. Adding goes to the current
+    slot and to a running total per key; when time moves into a new slot
+    the expired one is subtracted from the totals. Every event is counted
+    and expired once, so updates are O(1) and reads never rescan events.
+    Resolution is one slot: counts leave the window a slot at a time.
+    """
+
+    def __init__(self, window, buckets=60):
+        self.window = window
+        self.width = window / buckets
+        self.slots = [{} for _ in range(buckets)]
+        self.totals = {}  # key -> sum over the window
+        self._head = None  # Bucket number of the newest slot
+
+    def _advance(self, now):
+        bucket = int(now // self.width)
+        if self._head is None:
+            self._head = bucket
+            return
+        if bucket <= self._head:
+            return
+        if bucket - self._head >= len(self.slots):
+            # Idle for longer than the window: everything expired
+            for slot in self.slots:
+                slot.clear()
+            self.totals.clear()
+        else:
+            for number in range(self._head + 1, bucket + 1):
+                slot = self.slots[number % len(self.slots)]
+                for key, value in slot.items():
+                    total = self.totals[key] - value
+                    if total:
+                        self.totals[key] = total
+                    else:
+                        del self.totals[key]
+                slot.clear()
+        self._head = bucket
+
+    def add(self, key, value=1, now=None):
+        now = time.monotonic() if now is None else now
+        self._advance(now)
+        slot = self.slots[self._head % len(self.slots)]
+        slot[key] = slot.get(key, 0) + value
+        self.totals[key] = self.totals.get(key, 0) + value
+
+    def get(self, key, now=None):
+        self._advance(time.monotonic() if now is None else now)
+        return self.totals.get(key, 0)
+
+    def top(self, count, now=None):
+        """The `count` keys with the largest sums, as (key, sum)"""
+        self._advance(time.monotonic() if now is None else now)
+        return heapq.nlargest(count, self.totals.items(), key=lambda item: item[1])
+
+
+class RollingPeak:
+    """Highest value of a level (like a member count) over the last `window` seconds
+
+    Each slot keeps the highest value seen during it, starting from the
+    level it was entered with, so a level that held steady through quiet
+    slots still counts. Updates are O(1); a read looks at the slots.
+    """
+
+    def __init__(self, window, buckets=60):
+        self.width = window / buckets
+        self.slots = [(None, 0)] * buckets  # (bucket number, peak)
+        self.current = 0
+
+    def update(self, value, now=None):
+        bucket = int((time.monotonic() if now is None else now) // self.width)
+        index = bucket % len(self.slots)
+        number, peak = self.slots[index]
+        if number != bucket:
+            peak = self.current
+        self.slots[index] = (bucket, max(peak, value))
+        self.current = value
+
+    def peak(self, now=None):
+        bucket = int((time.monotonic() if now is None else now) // self.width)
+        oldest = bucket - len(self.slots) + 1
+        return max([self.current] + [peak for number, peak in self.slots if number is not None and number >= oldest])
+
+
+class ActivityWindow:
+    """Every aggregate of one scope over one window"""
+
+    __slots__ = ("counts", "presets", "hosts", "channels", "members")
+
+    def __init__(self, window):
+        self.counts = RollingCounts(window)  # created, deleted, lifetime (seconds), timed (deletes with a lifetime)
+        self.presets = RollingCounts(window)  # preset -> channels created with it
+        self.hosts = RollingCounts(window)  # owner_id -> channels created
+        self.channels = RollingPeak(window)
+        self.members = RollingPeak(window)
+
+
+class VoiceAnalytics:
+    """Rolling channel and occupancy aggregates for !stats
+
+    Fed as things happen: channel_created / channel_deleted from the
+    creation and deletion paths and occupancy() from voice state updates.
+    Each event updates the guild's windows and the overall ones in O(1).
+    Lifetimes are only known for channels created while the bot was
+    running; restored and adopted channels count as deleted but not in
+    the average lifetime.
+    """
+
+    def __init__(self, windows=None):
+        self.windows = dict(windows or WINDOWS)
+        self.started = time.monotonic()
+        self.scopes = {}  # guild_id (None for every guild) -> {window name: ActivityWindow}
+        self.created_at = {}  # channel_id -> monotonic creation time
+
+    def _scopes(self, guild_id):
+        scope = self.scopes.get(guild_id)
+        if scope is None:
+            scope = self.scopes[guild_id] = {name: ActivityWindow(seconds) for name, seconds in self.windows.items()}
+        overall = self.scopes.get(None)
+        if overall is None:
+            overall = self.scopes[None] = {name: ActivityWindow(seconds) for name, seconds in self.windows.items()}
+        return scope, overall
+
+    def channel_created(self, guild_id, channel_id, owner_id, preset, now=None):
+        now = time.monotonic() if now is None else now
+        self.created_at[channel_id] = now
+        for scope in self._scopes(guild_id):
+            for window in scope.values():
+                window.counts.add("created", 1, now)
+                window.presets.add(preset, 1, now)
+                window.hosts.add(owner_id, 1, now)
+
+    def channel_deleted(self, guild_id, channel_id, now=None):
+        now = time.monotonic() if now is None else now
+        created_at = self.created_at.pop(channel_id, None)
+        for scope in self._scopes(guild_id):
+            for window in scope.values():
+                window.counts.add("deleted", 1, now)
+                if created_at is not None:
+                    window.counts.add("lifetime", now - created_at, now)
+                    window.counts.add("timed", 1, now)
+
+    def occupancy(self, guild_id, channels, members, total_channels, total_members, now=None):
+        """Current managed channels and members in them, for the guild and overall"""
+        now = time.monotonic() if now is None else now
+        scope, overall = self._scopes(guild_id)
+        for window in scope.values():
+            window.channels.update(channels, now)
+            window.members.update(members, now)
+        for window in overall.values():
+            window.channels.update(total_channels, now)
+            window.members.update(total_members, now)
+
+    def forget_guild(self, guild_id):
+        self.scopes.pop(guild_id, None)
+
+    def report(self, guild_id, window, top=5, now=None):
+        """Aggregates of a guild (None for every guild) over a named window"""
+        now = time.monotonic() if now is None else now
+        aggregates = self.scopes.get(guild_id, {}).get(window)
+        if aggregates is None:
+            aggregates = ActivityWindow(self.windows[window])
+        counts = aggregates.counts
+        # Until the bot has run for a whole window, rates are over the uptime
+        minutes = max(1.0, min(self.windows[window], now - self.started) / 60)
+        timed = counts.get("timed", now)
+        return {
+            "created": counts.get("created", now),
+            "deleted": counts.get("deleted", now),
+            "created_per_minute": counts.get("created", now) / minutes,
+            "average_lifetime": counts.get("lifetime", now) / timed if timed else None,
+            "peak_channels": aggregates.channels.peak(now),
+            "peak_members": aggregates.members.peak(now),
+            "presets": aggregates.presets.top(len(aggregates.presets.totals), now),
+            "hosts": aggregates.hosts.top(top, now),
+        }
@@ -0,0 +1,178 @@
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+
+# Event fields copied into their own indexed columns; the rest stay in `data`
+COLUMNS = ("ts", "event", "guild_id", "channel_id", "actor_id", "target_id")
+# Name fields searchable as free text
+TEXT_FIELDS = ("channel_name", "actor_name", "target_name", "name", "previous_name", "list")
+
+_WORD = re.compile(r"\w+")
+_MENTION = re.compile(r"<(@!?|#)(\d+)>")
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)([smhdw])")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _text(entry):
+    return " ".join(str(entry[field]) for field in TEXT_FIELDS if entry.get(field))
+
+
+def parse_query(args, now):
+    """search() arguments from !logs words: @member, #channel, event:<name>, since:<24h|7d|30m>, text
+
+    Raises ValueError for a since: it can't read.
+    """
+    query = {}
+    text = []
+    for arg in args:
+        mention = _MENTION.fullmatch(arg)
+        if mention:
+            query["channel_id" if mention.group(1) == "#" else "member_id"] = int(mention.group(2))
+        elif arg.startswith("event:"):
+            query["event"] = arg[len("event:"):].lower()
+        elif arg.startswith("since:"):
+            duration = _DURATION.fullmatch(arg[len("since:"):].lower())
+            if duration is None:
+                raise ValueError(f"Can't read {arg!r}; use e.g. since:30m, since:24h or since:7d")
+            query["since"] = now - float(duration.group(1)) * _UNITS[duration.group(2)]
+        else:
+            text.append(arg)
+    if text:
+        query["text"] = " ".join(text)
+    return query
+
+
+class AuditIndex:
+    """SQLite index over the audit log, for !logs
+
+    Events are added in batches as the audit writer thread appends them
+    (see AuditLog.on_written), so the index never rescans the log. Lookups
+    by guild, channel, member and time use B-tree indexes; names are
+    matched through an FTS5 table. Writes and reads use separate
+    connections, so a search never waits for a batch being indexed (WAL).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._writer = sqlite3.connect(path, check_same_thread=False)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+        self._writer.executescript(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY, ts REAL NOT NULL, event TEXT NOT NULL, guild_id INTEGER, "
+            "channel_id INTEGER, actor_id INTEGER, target_id INTEGER, data TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS events_guild ON events (guild_id, ts);"
+            "CREATE INDEX IF NOT EXISTS events_channel ON events (guild_id, channel_id, ts);"
+            "CREATE INDEX IF NOT EXISTS events_actor ON events (guild_id, actor_id, ts);"
+            "CREATE INDEX IF NOT EXISTS events_target ON events (guild_id, target_id, ts);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS events_text USING fts5(text, content='');"
+        )
+        self._writer.commit()
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.indexed = 0
+
+    def add(self, events):
+        """Index a batch of audit events (called from the audit writer thread)"""
+        with self._write_lock:
+            for entry in events:
+                cursor = self._writer.execute(
+                    "INSERT INTO events (ts, event, guild_id, channel_id, actor_id, target_id, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [entry.get(column) for column in COLUMNS] + [json.dumps(entry, separators=(",", ":"))]
+                )
+                text = _text(entry)
+                if text:
+                    self._writer.execute("INSERT INTO events_text (rowid, text) VALUES (?, ?)", (cursor.lastrowid, text))
+            self._writer.commit()
+            self.indexed += len(events)
+
+    def last_ts(self):
+        with self._write_lock:
+            return self._writer.execute("SELECT MAX(ts) FROM events").fetchone()[0] or 0.0
+
+    def backfill(self, segments, batch_size=5000):
+        """Index events in the log files that are newer than the index
+
+        Run once before the audit writer starts, so events written while
+        the index was missing (or before it existed) become searchable.
+        """
+        since = self.last_ts()
+        added = 0
+        for segment in segments:
+            if os.path.getmtime(segment) < since:
+                continue  # Nothing in it is newer than the index
+            opener = gzip.open if segment.endswith(".gz") else open
+            batch = []
+            with opener(segment, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get("ts", 0) > since:
+                        batch.append(entry)
+                    if len(batch) >= batch_size:
+                        self.add(batch)
+                        added += len(batch)
+                        batch = []
+            if batch:
+                self.add(batch)
+                added += len(batch)
+        return added
+
+    def search(self, guild_id, event=None, channel_id=None, member_id=None, since=None, text=None, limit=200):
+        """Matching events of one guild, newest first (blocking; run it in a thread)"""
+        where = ["guild_id = ?"]
+        params = [guild_id]
+        if event:
+            where.append("event = ?")
+            params.append(event)
+        if channel_id:
+            where.append("channel_id = ?")
+            params.append(channel_id)
+        if member_id:
+            # Spelled out as two index lookups that drive the query; as an OR
+            # (or with guild_id left indexable) SQLite would rather walk the
+            # whole guild in time order
+            where[0] = "+guild_id = ?"
+            where.append(
+                "id IN (SELECT id FROM events WHERE guild_id = ? AND actor_id = ? "
+                "UNION ALL SELECT id FROM events WHERE guild_id = ? AND target_id = ?)"
+            )
+            params.extend((guild_id, member_id, guild_id, member_id))
+        if since:
+            where.append("ts >= ?")
+            params.append(since)
+        words = _WORD.findall(text) if text else []
+        match = " ".join(f'"{word}"' for word in words)
+        if match and not (member_id or channel_id):
+            # Walk the name matches newest first (ids are assigned in time
+            # order) and stop at `limit`, instead of scanning the guild
+            query = (
+                "SELECT data FROM events_text CROSS JOIN events ON events.id = events_text.rowid "
+                f"WHERE events_text MATCH ? AND {' AND '.join(where)} ORDER BY events_text.rowid DESC LIMIT ?"
+            )
+            params = [match] + params
+        else:
+            if match:
+                # The member/channel index is far more selective than a name;
+                # only check the few rows it finds against FTS
+                where.append("EXISTS (SELECT 1 FROM events_text WHERE events_text MATCH ? AND rowid = events.id)")
+                params.append(match)
+            query = f"SELECT data FROM events WHERE {' AND '.join(where)} ORDER BY ts DESC LIMIT ?"
+        params.append(limit)
+        with self._read_lock:
+            rows = self._reader.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        self._writer.close()
+        self._reader.close()
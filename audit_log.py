@@ -0,0 +1,165 @@
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+# Put on the queue by close() to stop the writer
+_STOP = object()
+
+
+class AuditLog:
+    """Append-only JSONL audit stream, written by a background thread
+
+    record() only puts the event on a queue, so the event loop never waits
+    on the disk. The writer thread appends events in batches and rotates
+    the file once it passes `max_bytes` or is older than `rotate_interval`
+    seconds; rotated segments are renamed with a timestamp and gzipped when
+    `compress` is set. Nothing is written when no path is set.
+    """
+
+    def __init__(self, path, max_bytes=50 * 2 ** 20, rotate_interval=86400.0, compress=True,
+                 max_queue=100_000, batch_size=1000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        # Optional hook called from the writer thread as on_written(events) after each batch
+        self.on_written = None
+        self._thread = None
+        self._file = None
+        self._size = 0
+        self._started_at = 0.0  # Time of the current segment's first event
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def record(self, event, guild_id, **fields):
+        """Queue one audit event; never blocks"""
+        if not self.enabled:
+            return
+        entry = {"ts": round(time.time(), 3), "event": event, "guild_id": guild_id}
+        entry.update(fields)
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        """Start the writer thread (safe to call on every reconnect)"""
+        if self.enabled and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join()
+        self._thread = None
+
+    def queue_depth(self):
+        return self.queue.qsize()
+
+    def segments(self):
+        """Rotated segments, oldest first, then the current file"""
+        base, _ = os.path.splitext(self.path)
+        rotated = sorted(glob.glob(f"{glob.escape(base)}-*.jsonl*"), key=os.path.getmtime)
+        return rotated + ([self.path] if os.path.exists(self.path) else [])
+
+    # Writer thread
+    def _run(self):
+        self._open()
+        stopping = False
+        while not stopping:
+            try:
+                entry = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                self._maybe_rotate()
+                continue
+            batch = []
+            while entry is not _STOP:
+                batch.append(entry)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    entry = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            stopping = entry is _STOP
+            if batch:
+                self._write(batch)
+        self._file.close()
+        self._file = None
+
+    def _write(self, batch):
+        try:
+            if not self._started_at:
+                self._started_at = batch[0]["ts"]
+            data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in batch)
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data.encode())
+            self.written += len(batch)
+        except (OSError, TypeError, ValueError) as e:
+            self.dropped += len(batch)
+            print(f"Error writing audit log: {str(e)}")
+            return
+        if self.on_written is not None:
+            try:
+                self.on_written(batch)
+            except Exception as e:
+                print(f"Error in audit log hook: {str(e)}")
+        self._maybe_rotate()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._started_at = 0.0
+        if self._size:
+            # Keep timing the segment from its first event across restarts
+            with open(self.path, encoding="utf-8") as f:
+                try:
+                    self._started_at = json.loads(f.readline())["ts"]
+                except (ValueError, KeyError):
+                    self._started_at = time.time()
+
+    def _maybe_rotate(self):
+        if not self._size:
+            return
+        too_big = self.max_bytes > 0 and self._size >= self.max_bytes
+        too_old = self.rotate_interval > 0 and time.time() - self._started_at >= self.rotate_interval
+        if too_big or too_old:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        base, _ = os.path.splitext(self.path)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(self._started_at or time.time()))
+        target = f"{base}-{stamp}.jsonl"
+        suffix = 1
+        while os.path.exists(target) or os.path.exists(target + ".gz"):
+            target = f"{base}-{stamp}.{suffix}.jsonl"
+            suffix += 1
+        try:
+            os.replace(self.path, target)
+            if self.compress:
+                with open(target, "rb") as source, gzip.open(target + ".gz", "wb") as compressed:
+                    shutil.copyfileobj(source, compressed)
+                os.remove(target)
+            self.rotations += 1
+        except OSError as e:
+            print(f"Error rotating audit log: {str(e)}")
+        self._open()
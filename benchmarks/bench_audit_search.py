@@ -0,0 +1,112 @@
+"""Indexing throughput and !logs query latency of AuditIndex
+
+Fills a temporary index with synthetic audit events (joins and leaves
+mostly, with creates, deletes and list/host changes mixed in) over several
+guilds, then times the queries !logs runs.
+
+    python benchmarks/bench_audit_search.py
+    python benchmarks/bench_audit_search.py --events 5000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from audit_index import AuditIndex  # noqa: E402
+from latency import percentile  # noqa: E402
+
+EVENTS = ["join"] * 40 + ["leave"] * 40 + ["create"] * 6 + ["delete"] * 6 + ["list_add"] * 4 + \
+    ["list_remove", "host", "privacy", "rename"]
+
+
+def generate(rng, count, guilds, members, start, created):
+    """Synthetic events spread over the last 30 days; fills `created` with (guild, name) samples"""
+    step = 30 * 86400 / count
+    for index in range(count):
+        event = rng.choice(EVENTS)
+        actor = rng.randrange(members)
+        entry = {
+            "ts": round(start + index * step, 3),
+            "event": event,
+            "guild_id": rng.randrange(guilds),
+            "channel_id": 10_000 + rng.randrange(members // 4),
+            "channel_name": f"user{actor}'s Channel",
+            "actor_id": actor,
+            "actor_name": f"user{actor}",
+        }
+        if event == "create" and len(created) < 1000:
+            created.append((entry["guild_id"], entry["actor_name"]))
+        if event in ("list_add", "list_remove", "host"):
+            target = rng.randrange(members)
+            entry["target_id"] = target
+            entry["target_name"] = f"user{target}"
+            entry["list"] = rng.choice(("whitelist", "blacklist", "guests"))
+        yield entry
+
+
+def timed_queries(index, name, make_query, repeat):
+    samples = []
+    rows = 0
+    for _ in range(repeat):
+        kwargs = make_query()
+        started = time.perf_counter()
+        rows += len(index.search(**kwargs))
+        samples.append(time.perf_counter() - started)
+    print(f"{name:<34} {percentile(samples, 0.5) * 1000:>8.2f} {percentile(samples, 0.99) * 1000:>8.2f} "
+          f"{rows / repeat:>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--members", type=int, default=50_000)
+    parser.add_argument("--batch", type=int, default=1000, help="events per add(), like the writer thread")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = time.time()
+    with tempfile.TemporaryDirectory() as directory:
+        index = AuditIndex(os.path.join(directory, "audit_index.db"))
+        started = time.perf_counter()
+        batch = []
+        created = []
+        for entry in generate(rng, args.events, args.guilds, args.members, now - 30 * 86400, created):
+            batch.append(entry)
+            if len(batch) == args.batch:
+                index.add(batch)
+                batch = []
+        if batch:
+            index.add(batch)
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(index.path) / 2 ** 20
+        print(f"indexed {args.events} events in {elapsed:.1f}s ({args.events / elapsed:,.0f}/s), {size:.0f} MiB")
+
+        guild = lambda: rng.randrange(args.guilds)  # noqa: E731
+        member = lambda: rng.randrange(args.members)  # noqa: E731
+        print(f"{'query':<34} {'p50 ms':>8} {'p99 ms':>8} {'rows':>8}")
+        timed_queries(index, "latest in guild", lambda: {"guild_id": guild(), "limit": 200}, args.repeat)
+        def who_created():
+            guild_id, name = rng.choice(created)
+            return {"guild_id": guild_id, "event": "create", "text": name}
+
+        timed_queries(index, "who created channel (by name)", who_created, args.repeat)
+        timed_queries(index, "channel history",
+                      lambda: {"guild_id": guild(), "channel_id": 10_000 + rng.randrange(args.members // 4)},
+                      args.repeat)
+        timed_queries(index, "member blacklisted (list_add)",
+                      lambda: {"guild_id": guild(), "event": "list_add", "member_id": member(), "text": "blacklist"},
+                      args.repeat)
+        timed_queries(index, "member actions, last 24h",
+                      lambda: {"guild_id": guild(), "member_id": member(), "since": now - 86400}, args.repeat)
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Cost of producing the bot's embeds: built per call vs rendered from templates
+
+"built" runs the builder every time, which is what the handlers did before.
+"copy" is discord.Embed.copy() of a prebuilt embed (a to_dict/from_dict
+round trip) and "template" is EmbedTemplates.render().
+
+    python benchmarks/bench_embed_templates.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from embed_templates import templates  # noqa: E402
+
+CASES = {
+    "info": {},
+    "commands": {},
+    "channel_created": {"slots": "4", "name": "oliver's Channel", "size": "4 members", "owner": "oliver"},
+    "error": {"message": "You must be in or own a custom voice channel!"},
+}
+
+
+def per_call(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    templates.build()
+    number = 20_000
+    print(f"{'embed':<16} {'built':>9} {'copy':>9} {'template':>9}")
+    for name, values in CASES.items():
+        builder = templates.builders[name]
+        prebuilt = templates.templates[name].embed
+
+        def build():
+            # Builder plus filling in the values, as the f-strings used to
+            embed = builder()
+            if values:
+                embed.description = embed.description.format_map(values)
+                for field in getattr(embed, "_fields", ()):
+                    field["name"] = field["name"].format_map(values)
+                    field["value"] = field["value"].format_map(values)
+            return embed
+
+        # Same output either way
+        assert build().to_dict() == templates.render(name, **values).to_dict()
+
+        built = per_call(build, number)
+        copied = per_call(prebuilt.copy, number)
+        rendered = per_call(lambda: templates.render(name, **values), number)
+        print(f"{name:<16} {built:7.2f}us {copied:7.2f}us {rendered:7.2f}us  ({built / rendered:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
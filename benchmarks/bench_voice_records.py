@@ -0,0 +1,103 @@
+"""Memory used by voice channel records at 10k and 100k channels
+
+Compares the old VoiceChannel (live object references, per-instance dict,
+Python sets) with the compact ID-only record in voice_records.py.
+
+    python benchmarks/bench_voice_records.py
+"""
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from voice_records import VoiceChannel  # noqa: E402
+
+
+class LegacyVoiceChannel:
+    """The record as it was before: object references and sets"""
+
+    def __init__(self, channel, owner):
+        self.channel = channel
+        self.owner = owner
+        self.guests = set()
+        self.blacklist = set()
+        self.whitelist = set()
+        self.is_private = False
+        self.host = owner
+
+
+class FakeObject:
+    __slots__ = ("id",)
+
+    def __init__(self, id):
+        self.id = id
+
+
+def access_lists(rng):
+    """Most channels have empty lists; some have a handful of IDs"""
+    if rng.random() < 0.8:
+        return [], [], []
+    return (
+        [rng.randrange(10**17, 10**18) for _ in range(rng.randint(0, 5))],
+        [rng.randrange(10**17, 10**18) for _ in range(rng.randint(0, 3))],
+        [rng.randrange(10**17, 10**18) for _ in range(rng.randint(0, 5))],
+    )
+
+
+def build_legacy(count, rng, channels, members):
+    records = {}
+    for i in range(count):
+        record = LegacyVoiceChannel(channels[i], members[i])
+        whitelist, blacklist, guests = access_lists(rng)
+        record.whitelist.update(whitelist)
+        record.blacklist.update(blacklist)
+        record.guests.update(guests)
+        records[channels[i].id] = record
+    return records
+
+
+def build_compact(count, rng, channels, members):
+    records = {}
+    for i in range(count):
+        record = VoiceChannel(channels[i].id, 1, members[i].id)
+        whitelist, blacklist, guests = access_lists(rng)
+        for user_id in whitelist:
+            record.add("whitelist", user_id)
+        for user_id in blacklist:
+            record.add("blacklist", user_id)
+        for user_id in guests:
+            record.add("guests", user_id)
+        records[record.channel_id] = record
+    return records
+
+
+def measure(build, count):
+    # Discord objects live in the library cache either way; build them first
+    channels = [FakeObject(10**18 + i) for i in range(count)]
+    members = [FakeObject(2 * 10**18 + i) for i in range(count)]
+    rng = random.Random(count)
+
+    tracemalloc.start()
+    records = build(count, rng, channels, members)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current
+
+
+def main():
+    for count in (10_000, 100_000):
+        legacy = measure(build_legacy, count)
+        compact = measure(build_compact, count)
+        print(
+            f"{count:>7} channels: legacy {legacy / 2**20:7.2f} MiB "
+            f"({legacy / count:6.0f} B/channel), "
+            f"compact {compact / 2**20:7.2f} MiB ({compact / count:6.0f} B/channel), "
+            f"{legacy / compact:.1f}x smaller"
+        )
+
+
+if __name__ == "__main__":
+    main()
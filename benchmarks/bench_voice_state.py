@@ -0,0 +1,249 @@
+"""Offline load test for voice state handling, Join-to-Create and commands
+
+Imports bot.py against in-memory fakes (benchmarks/fakes.py) and drives
+on_voice_state_update and a share of owner commands with synthetic
+open-loop traffic at each requested rate. No network is used; Discord
+requests are answered by FakeHTTP after --rest-latency seconds.
+
+Voice latency is reported twice: until the handler returns (the event is
+queued on a voice actor) and until the work it queued is done (e.g. the
+member is in their new Join-to-Create channel).
+
+Each rate runs in a fresh process so no state leaks between runs.
+
+    python benchmarks/bench_voice_state.py
+    python benchmarks/bench_voice_state.py --rates 1000 100000 --duration 20
+"""
+import argparse
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeCategory, FakeContext, FakeGuild, FakeHTTP, FakeVoiceChannel  # noqa: E402
+from latency import percentile  # noqa: E402
+
+GUILD_ID = 1
+LOBBY_NAME = "➕ Join to Create"
+
+
+def configure(args, state_dir):
+    """Environment for importing bot.py offline"""
+    os.environ["GUILD_ID"] = str(GUILD_ID)
+    os.environ["STATE_DB_PATH"] = os.path.join(state_dir, "voice_state.db")
+    os.environ["EMPTY_CHANNEL_GRACE"] = str(args.grace)
+    os.environ["METRICS_PORT"] = "0"
+    os.environ["AUDIT_LOG_PATH"] = os.path.join(state_dir, "audit.jsonl")
+    if not args.production_limits:
+        # Measure the handlers, not the admission limits
+        os.environ["CREATE_LIMIT_PER_MEMBER"] = "1000000"
+        os.environ["CREATE_RATE_PER_GUILD"] = "1000000"
+        os.environ["CREATE_BURST_PER_GUILD"] = "1000000"
+
+
+async def simulate(rate, args):
+    import bot as app
+
+    rng = random.Random(args.seed)
+    http = FakeHTTP(latency=args.rest_latency, jitter=args.rest_latency / 2, seed=args.seed)
+    guild = FakeGuild(GUILD_ID, http, args.members)
+    app.bot.get_guild = lambda guild_id: guild if guild_id == guild.id else None
+
+    # A server with a Join-to-Create lobby and a few permanent rooms
+    zone = guild.add_channel(FakeCategory(guild, "・ PRIVATE VOICE ZONE・"))
+    lobby = guild.add_channel(FakeVoiceChannel(guild, LOBBY_NAME, zone))
+    for index in range(args.rooms):
+        guild.add_channel(FakeVoiceChannel(guild, f"Room {index}", zone))
+
+    app.log_sink.start()
+    app.audit_log.start()
+    app.state_store.start()
+    app.deletion_timers.start()
+    app.rest.start()
+
+    members = list(guild.members.values())
+    latencies = {"voice": [], "voice_done": [], "command": []}
+    errors = {"voice": 0, "command": 0}
+    pending = set()
+
+    # Actor work queued by the handler running in this task, to time events to the end of it
+    queued_work = contextvars.ContextVar("queued_work", default=None)
+    submit = app.voice_actors.submit
+
+    async def tracked_submit(key, func, *args):
+        future = await submit(key, func, *args)
+        work = queued_work.get()
+        if work is not None:
+            work.append(future)
+        return future
+
+    app.voice_actors.submit = tracked_submit
+
+    async def run(kind, coro, scheduled):
+        work = []
+        queued_work.set(work)
+        try:
+            await coro
+        except Exception as e:
+            errors[kind] += 1
+            if errors[kind] <= 3:
+                print(f"  {kind} handler error: {e!r}", file=sys.stderr)
+        if scheduled is None:
+            return
+        latencies[kind].append(time.perf_counter() - scheduled)
+        if kind == "voice":
+            if work:
+                # Failures are counted by the actor pool; only the time matters here
+                await asyncio.wait(work)
+            latencies["voice_done"].append(time.perf_counter() - scheduled)
+
+    def spawn(kind, coro, scheduled=None):
+        task = asyncio.create_task(run(kind, coro, scheduled))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    # Moves made by the bot come back as gateway events; they run but are not timed
+    http.gateway = lambda member, before, after: spawn("voice", app.on_voice_state_update(member, before, after))
+
+    # Command name -> (positional, keyword) arguments
+    commands = [
+        ("size", lambda: ((rng.randint(0, 10),), {})),
+        ("privacy", lambda: ((), {})),
+        ("name", lambda: ((), {"new_name": f"room {rng.randint(0, 999)}"})),
+        ("info", lambda: ((), {})),
+    ]
+
+    def voice_event():
+        member = rng.choice(members)
+        if member.voice is None:
+            target = lobby if rng.random() < args.create_share else rng.choice(guild.voice_channels)
+        elif rng.random() < 0.5:
+            target = None
+        else:
+            target = rng.choice(guild.voice_channels)
+            if target == member.voice.channel:
+                target = None
+        before, after = member.set_channel(target)
+        return app.on_voice_state_update(member, before, after)
+
+    def command_event():
+        owners = list(app.voice_channels.values())
+        if not owners:
+            return None
+        author = guild.get_member(rng.choice(owners).owner_id)
+        name, arguments = rng.choice(commands)
+        positional, keyword = arguments()
+        return app.bot.get_command(name).callback(FakeContext(guild, author), *positional, **keyword)
+
+    interval = 60.0 / rate
+    started = time.perf_counter()
+    end = started + args.duration
+    next_at = started
+    sent = {"voice": 0, "command": 0}
+    while next_at < end:
+        now = time.perf_counter()
+        while next_at <= now and next_at < end:
+            coro = command_event() if rng.random() < args.command_share else None
+            if coro is not None:
+                spawn("command", coro, next_at)
+                sent["command"] += 1
+            else:
+                spawn("voice", voice_event(), next_at)
+                sent["voice"] += 1
+            next_at += interval
+        await asyncio.sleep(max(0.0, min(next_at, end) - time.perf_counter()))
+
+    # Let in-flight events finish, then flush the voice-logs batches
+    while pending:
+        await asyncio.wait(set(pending), timeout=args.drain_timeout)
+        if time.perf_counter() - end > args.drain_timeout:
+            break
+    # Handlers return once their work is queued on a voice actor
+    try:
+        await asyncio.wait_for(app.voice_actors.drain(), timeout=args.drain_timeout)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started
+    await app.log_sink.flush()
+
+    events = sent["voice"] + sent["command"]
+    result = {
+        "rate": rate,
+        "events": events,
+        "throughput": events / elapsed * 60,
+        "errors": sum(errors.values()),
+        "rest_per_event": http.total() / max(1, events),
+        "rest_calls": dict(http.calls),
+        "channels": len(app.voice_channels),
+        "unfinished": len(pending),
+        "actor_failures": app.voice_actors.failed,
+    }
+    for kind, samples in latencies.items():
+        result[kind] = {
+            "count": len(samples),
+            "p50": percentile(samples, 0.50) * 1000,
+            "p95": percentile(samples, 0.95) * 1000,
+            "p99": percentile(samples, 0.99) * 1000,
+        }
+    return result
+
+
+def run_rate(rate, args):
+    """One rate in this (fresh) process"""
+    with tempfile.TemporaryDirectory() as state_dir:
+        configure(args, state_dir)
+        result = asyncio.run(simulate(rate, args))
+        import bot as app
+        app.state_store.close()
+        app.audit_log.close()
+        result["audit_events"] = app.audit_log.written
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[1_000, 10_000, 50_000, 100_000],
+                        help="events per minute to drive, one run each")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of traffic per run")
+    parser.add_argument("--members", type=int, default=5_000)
+    parser.add_argument("--rooms", type=int, default=5, help="permanent voice channels besides the lobby")
+    parser.add_argument("--create-share", type=float, default=0.2,
+                        help="chance a member joining voice goes through Join-to-Create")
+    parser.add_argument("--command-share", type=float, default=0.05, help="share of events that are commands")
+    parser.add_argument("--rest-latency", type=float, default=0.05, help="seconds per fake Discord request")
+    parser.add_argument("--grace", type=float, default=1.0, help="EMPTY_CHANNEL_GRACE for the run")
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--production-limits", action="store_true", help="keep the default admission limits")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'events/min':>10} {'sent':>7} {'done/min':>9} {'voice handler p50/p95/p99 ms':>28} "
+          f"{'voice done p50/p95/p99 ms':>28} {'command p50/p95/p99 ms':>24} {'REST/event':>10} {'errors':>6}")
+    context = multiprocessing.get_context("spawn")
+    for rate in args.rates:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_rate, rate, args).result()
+        voice, done, command = result["voice"], result["voice_done"], result["command"]
+        print(
+            f"{rate:>10} {result['events']:>7} {result['throughput']:>9.0f} "
+            f"{voice['p50']:>12.1f}/{voice['p95']:>7.1f}/{voice['p99']:>7.1f} "
+            f"{done['p50']:>12.1f}/{done['p95']:>7.1f}/{done['p99']:>7.1f} "
+            f"{command['p50']:>8.1f}/{command['p95']:>7.1f}/{command['p99']:>7.1f} "
+            f"{result['rest_per_event']:>10.2f} {result['errors'] + result['actor_failures']:>6}"
+        )
+        print(f"{'':>10} REST by route: {result['rest_calls']}, managed channels at end: {result['channels']}, "
+              f"audit events: {result['audit_events']}"
+              + (f", unfinished: {result['unfinished']}" if result["unfinished"] else ""))
+
+
+if __name__ == "__main__":
+    main()
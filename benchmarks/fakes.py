@@ -0,0 +1,221 @@
+"""In-memory stand-ins for the Discord objects bot.py touches
+
+Every call that would be a Discord request goes through FakeHTTP, which
+counts it per route and sleeps for a configurable latency instead of
+touching the network. Moves update the fake voice state and hand the
+resulting voice state update to `FakeHTTP.gateway`, like Discord echoing
+the change back over the gateway.
+"""
+import asyncio
+import itertools
+import random
+from collections import Counter
+
+
+class FakeHTTP:
+    def __init__(self, latency=0.02, jitter=0.01, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = Counter()  # route kind -> requests
+        self.gateway = None  # callable(member, before, after) for echoed voice updates
+        self._ids = itertools.count(10_000_000)
+        self._rng = random.Random(seed)
+
+    def next_id(self):
+        return next(self._ids)
+
+    async def request(self, route):
+        self.calls[route] += 1
+        delay = self.latency + self._rng.random() * self.jitter
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def total(self):
+        return sum(self.calls.values())
+
+
+class FakeRole:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+
+class FakeVoiceState:
+    __slots__ = ("channel",)
+
+    def __init__(self, channel):
+        self.channel = channel
+
+
+class FakeMessage:
+    def __init__(self, http, channel):
+        self.id = http.next_id()
+        self.channel = channel
+
+
+class _FakeChannel:
+    def __init__(self, guild, name, category=None, overwrites=None):
+        self.guild = guild
+        self.id = guild.http.next_id()
+        self.name = name
+        self.category = category
+        self.overwrites = dict(overwrites or {})
+        self.position = 0
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    async def edit(self, **fields):
+        await self.guild.http.request("channel")
+        for name, value in fields.items():
+            setattr(self, name, value)
+        return self
+
+    async def set_permissions(self, target, overwrite=None, **permissions):
+        await self.guild.http.request("channel")
+        self.overwrites[target] = overwrite
+
+    async def delete(self, reason=None):
+        await self.guild.http.request("channel")
+        self.guild.remove_channel(self)
+
+    async def send(self, *args, **kwargs):
+        await self.guild.http.request("channel_messages")
+        return FakeMessage(self.guild.http, self)
+
+
+class FakeCategory(_FakeChannel):
+    pass
+
+
+class FakeTextChannel(_FakeChannel):
+    pass
+
+
+class FakeVoiceChannel(_FakeChannel):
+    def __init__(self, guild, name, category=None, overwrites=None, user_limit=None, bitrate=64000):
+        super().__init__(guild, name, category, overwrites)
+        self.user_limit = user_limit or 0
+        self.bitrate = bitrate
+        self.members = []
+
+
+class FakeMember:
+    def __init__(self, guild, id, name):
+        self.guild = guild
+        self.id = id
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{id}>"
+        self.voice = None
+        self.bot = False
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def set_channel(self, channel):
+        """Move locally (cache update only) and return the (before, after) states"""
+        before = FakeVoiceState(self.voice.channel if self.voice else None)
+        if before.channel is not None and self in before.channel.members:
+            before.channel.members.remove(self)
+        if channel is not None:
+            channel.members.append(self)
+        self.voice = FakeVoiceState(channel) if channel is not None else None
+        return before, FakeVoiceState(channel)
+
+    async def move_to(self, channel, reason=None):
+        await self.guild.http.request("guild_members")
+        if self.voice is None:
+            return
+        before, after = self.set_channel(channel)
+        if self.guild.http.gateway is not None:
+            self.guild.http.gateway(self, before, after)
+
+    async def edit(self, **fields):
+        await self.guild.http.request("guild_members")
+        if "voice_channel" in fields:
+            await self.move_to(fields["voice_channel"])
+
+
+class FakeGuild:
+    def __init__(self, id, http, member_count=1000):
+        self.id = id
+        self.http = http
+        self.name = "Load Test"
+        self.channels = {}
+        self.default_role = FakeRole(id, "@everyone")
+        self.me = FakeMember(self, http.next_id(), "bot")
+        self.members = {}
+        for index in range(member_count):
+            member = FakeMember(self, 1_000 + index, f"user{index}")
+            self.members[member.id] = member
+
+    @property
+    def member_count(self):
+        return len(self.members)
+
+    @property
+    def categories(self):
+        return [c for c in self.channels.values() if isinstance(c, FakeCategory)]
+
+    @property
+    def voice_channels(self):
+        return [c for c in self.channels.values() if isinstance(c, FakeVoiceChannel)]
+
+    @property
+    def text_channels(self):
+        return [c for c in self.channels.values() if isinstance(c, FakeTextChannel)]
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+    async def query_members(self, query=None, *, limit=5, user_ids=None, cache=True, **kwargs):
+        # A gateway request, not REST, so it is not counted
+        return [self.members[user_id] for user_id in user_ids or () if user_id in self.members][:limit]
+
+    def add_channel(self, channel):
+        self.channels[channel.id] = channel
+        return channel
+
+    def remove_channel(self, channel):
+        self.channels.pop(channel.id, None)
+
+    async def create_voice_channel(self, name, category=None, overwrites=None, user_limit=None, **kwargs):
+        await self.http.request("guild_channels")
+        return self.add_channel(FakeVoiceChannel(self, name, category, overwrites, user_limit))
+
+    async def create_text_channel(self, name, category=None, overwrites=None, **kwargs):
+        await self.http.request("guild_channels")
+        return self.add_channel(FakeTextChannel(self, name, category, overwrites))
+
+    async def create_category(self, name, overwrites=None, **kwargs):
+        await self.http.request("guild_channels")
+        return self.add_channel(FakeCategory(self, name, None, overwrites))
+
+
+class FakeContext:
+    """Enough of commands.Context for calling command callbacks directly"""
+
+    def __init__(self, guild, author):
+        self.guild = guild
+        self.author = author
+        self.command_failed = False
+
+    async def send(self, *args, **kwargs):
+        await self.guild.http.request("channel_messages")
+        return FakeMessage(self.guild.http, None)
@@ -3,6 +3,32 @@ import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 import asyncio
+import signal
+import time
+from log_sink import VoiceLogSink
+from audit_log import AuditLog
+from audit_index import AuditIndex, parse_query
+from analytics import VoiceAnalytics, WINDOWS
+from channel_resolver import ChannelResolver
+from channel_pool import SpareChannelPool
+from state_store import SQLiteStateStore
+from reconcile import plan_reconciliation, delete_channels
+from rest_scheduler import RestScheduler, PRIORITY_USER, PRIORITY_PERMISSIONS
+from overwrites import apply_overwrites
+from timer_wheel import TimerWheel
+from admission import AdmissionController
+from actors import ActorPool
+from voice_records import VoiceChannel, ChannelRegistry
+from presence import PresenceManager
+from embed_templates import templates
+from info_panel import InfoPanel
+from latency import StageLatency
+from metrics import MetricsRegistry, MetricsServer, timed
+from profiling import Profiler, SamplingProfiler
+from member_names import MemberNameCache
+from paginator import chunked, clip_lines, send_paged
+from cluster import BusClient
+from guild_config import GuildConfigStore
 
 # Load environment variables
 load_dotenv()
@@ -13,41 +39,268 @@ intents.message_content = True
 intents.voice_states = True
 intents.members = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Under cluster.py each process runs the shard range it was given
+SHARD_IDS = [int(shard) for shard in os.getenv('SHARD_IDS', '').split(',') if shard]
+WORKER_ID = int(os.getenv('CLUSTER_WORKER_ID', '0'))
+if SHARD_IDS:
+    bot = commands.AutoShardedBot(
+        command_prefix='!',
+        intents=intents,
+        shard_ids=SHARD_IDS,
+        shard_count=int(os.getenv('SHARD_COUNT'))
+    )
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents)
+VoiceChannel.client = bot
+
+def worker_path(path):
+    """In cluster mode every worker keeps its own copy of a file: name.worker<N>.ext"""
+    if not path or not SHARD_IDS:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.worker{WORKER_ID}{ext}"
+
+# Store voice channel data, indexed by owner, host and current members
+voice_channels = ChannelRegistry()
+
+# Durable copy of voice_channels, reloaded on startup
+# (shared by every cluster worker; each reads only its own guilds)
+state_store = SQLiteStateStore(os.getenv('STATE_DB_PATH', 'voice_state.db'))
+
+# Every Discord mutation goes through one prioritized queue
+rest = RestScheduler()
+
+# Cached lookups for named channels and categories
+channel_resolver = ChannelResolver(rest)
+
+# Structured audit trail on disk (AUDIT_LOG_PATH, empty disables it); in
+# cluster mode every worker writes its own file
+audit_path = worker_path(os.getenv('AUDIT_LOG_PATH', os.path.join('audit', 'audit.jsonl')))
+audit_log = AuditLog(
+    audit_path,
+    max_bytes=int(os.getenv('AUDIT_MAX_BYTES', str(50 * 2 ** 20))),
+    rotate_interval=float(os.getenv('AUDIT_ROTATE_SECONDS', '86400')),
+    compress=os.getenv('AUDIT_COMPRESS', '1') != '0'
+)
+
+# Searchable index of the audit log for !logs, fed by the audit writer thread
+# (AUDIT_INDEX_PATH, empty disables it); one per worker like the log itself
+audit_index = None
+audit_index_path = os.getenv('AUDIT_INDEX_PATH')
+if audit_index_path is None:
+    audit_index_path = f"{os.path.splitext(audit_path)[0]}_index.db" if audit_path else ''
+else:
+    audit_index_path = worker_path(audit_index_path)
+if audit_path and audit_index_path:
+    audit_index = AuditIndex(audit_index_path)
+    audit_log.on_written = audit_index.add
+audit_backfilled = False
+audit_startup = None  # Task that backfills the index, then starts the audit writer
+
+def audit(event, guild_id, channel=None, actor=None, target=None, **fields):
+    """Record an audit event, filling in IDs and names of the channel and members"""
+    if channel is not None:
+        fields["channel_id"] = channel.id
+        fields["channel_name"] = channel.name
+    if actor is not None:
+        fields["actor_id"] = actor.id
+        fields["actor_name"] = actor.name
+    if target is not None:
+        fields["target_id"] = target.id
+        fields["target_name"] = target.name
+    audit_log.record(event, guild_id, **fields)
+
+# Rolling channel and occupancy aggregates for !stats
+analytics = VoiceAnalytics()
+
+def track_occupancy(guild_id):
+    """Feed the current managed channel and member counts to the analytics"""
+    analytics.occupancy(guild_id, *voice_channels.occupancy(guild_id), *voice_channels.occupancy())
+
+# Batched writer for the voice-logs channel, now a mirror of the audit log
+# that can be turned off with VOICE_LOG_MIRROR=0
+log_sink = VoiceLogSink(bot, channel_resolver, rest, enabled=os.getenv('VOICE_LOG_MIRROR', '1') != '0')
+
+# Empty channels are deleted after a grace period, so a quick rejoin keeps them
+EMPTY_CHANNEL_GRACE = float(os.getenv('EMPTY_CHANNEL_GRACE', '15'))
+deletion_timers = TimerWheel()
+
+# Voice work that awaits Discord runs on per-channel / per-member actors
+voice_actors = ActorPool(
+    max_depth=int(os.getenv('VOICE_ACTOR_MAX_DEPTH', '64')),
+    idle_timeout=float(os.getenv('VOICE_ACTOR_IDLE', '30'))
+)
+
+# Limits on how fast members and the guild can create channels
+admission = AdmissionController(
+    member_limit=int(os.getenv('CREATE_LIMIT_PER_MEMBER', '3')),
+    member_window=float(os.getenv('CREATE_LIMIT_WINDOW', '60')),
+    guild_rate=float(os.getenv('CREATE_RATE_PER_GUILD', '0.5')),
+    guild_burst=int(os.getenv('CREATE_BURST_PER_GUILD', '10'))
+)
+
+# Info panel with the size buttons, kept as one message across restarts
+info_panel = InfoPanel(bot, rest, state_store)
+
+# Size-button clicks: in-flight creation per (guild, member) and stage timings
+button_creations = {}
+button_latency = StageLatency()
+
+# Prometheus-style metrics, served on METRICS_HOST:METRICS_PORT/metrics (off when the port is 0)
+metrics = MetricsRegistry()
+voice_update_seconds = metrics.histogram("vcbot_voice_state_update_seconds", "Time spent handling on_voice_state_update")
+command_seconds = metrics.histogram("vcbot_command_seconds", "Command handler latency", ("command", "status"))
+rest_seconds = metrics.histogram("vcbot_rest_request_seconds", "Discord REST request latency", ("route", "status"))
+rest_rate_limited = metrics.counter("vcbot_rest_rate_limited_total", "429 responses seen by the REST scheduler", ("route",))
+metrics.gauge("vcbot_managed_channels", "Managed voice channels").set_function(lambda: len(voice_channels))
+metrics.gauge("vcbot_gateway_latency_seconds", "Gateway heartbeat latency").set_function(lambda: bot.latency)
+queue_depth = metrics.gauge("vcbot_queue_depth", "Pending items per internal queue", ("queue",))
+queue_depth.set_function(lambda: {f"rest_{name}": count for name, count in rest.queue_depth().items()})
+queue_depth.set_function(lambda: {
+    "voice_logs": log_sink.queue_depth(),
+    "state_writes": len(state_store.dirty),
+    "deletion_timers": deletion_timers.pending(),
+    "admission": admission.stats()["waiting"],
+    "voice_actors": voice_actors.depth(),
+    "audit_log": audit_log.queue_depth(),
+})
+metrics.gauge("vcbot_voice_actors", "Live per-channel / per-member voice actors").set_function(lambda: len(voice_actors.actors))
+voice_actor_seconds = metrics.histogram("vcbot_voice_actor_seconds", "Time spent on one voice actor task", ("task",))
+voice_actors.observer = lambda task, seconds: voice_actor_seconds.observe(seconds, task)
+metrics.counter("vcbot_voice_actor_tasks_total", "Voice actor tasks by outcome", ("outcome",)).set_function(
+    lambda: {outcome: voice_actors.stats()[outcome] for outcome in ("processed", "failed", "blocked")}
+)
+metrics.counter("vcbot_voice_actors_reclaimed_total", "Idle voice actors shut down").set_function(
+    lambda: voice_actors.stats()["reclaimed"]
+)
+metrics.gauge("vcbot_voice_actor_running", "Voice actor tasks running now").set_function(
+    lambda: voice_actors.stats()["running"]
+)
+metrics.gauge("vcbot_voice_actor_max_depth", "Deepest voice actor mailbox seen").set_function(
+    lambda: voice_actors.stats()["max_depth_seen"]
+)
+rest_wait_seconds = metrics.histogram(
+    "vcbot_rest_queue_wait_seconds", "Time REST requests wait in the scheduler queue", ("priority",)
+)
+rest.wait_observer = lambda priority, seconds: rest_wait_seconds.observe(seconds, priority)
+metrics.counter("vcbot_rest_merged_edits_total", "Channel edits merged into one still queued").set_function(
+    lambda: rest.stats()["merged_edits"]
+)
+button_stage_seconds = metrics.histogram("vcbot_button_stage_seconds", "Size-button click stages", ("stage",))
+button_latency.observer = lambda stage, seconds: button_stage_seconds.observe(seconds, stage)
+metrics.counter("vcbot_button_events_total", "Merged and failed size-button clicks", ("event",)).set_function(
+    lambda: button_latency.stats()["counters"]
+)
+metrics.counter("vcbot_admission_admitted_total", "Channel creations admitted").set_function(
+    lambda: admission.stats()["admitted"]
+)
+metrics.counter("vcbot_admission_queued_total", "Channel creations that waited for a token").set_function(
+    lambda: admission.stats()["queued"]
+)
+metrics.counter("vcbot_admission_rejected_total", "Channel creations refused", ("reason",)).set_function(
+    lambda: admission.stats()["rejected"]
+)
+spare_claim_seconds = metrics.histogram("vcbot_spare_claim_seconds", "Time to claim a pre-warmed spare channel")
+spare_refill_seconds = metrics.histogram(
+    "vcbot_spare_refill_lag_seconds", "Time from a spare being claimed to its replacement being ready"
+)
+metrics.gauge("vcbot_spare_channels", "Pre-warmed spare channels").set_function(lambda: channel_pool.stats()["spares"])
+# Cluster workers each listen on METRICS_PORT + their worker ID
+metrics_port = int(os.getenv('METRICS_PORT', '0'))
+metrics_server = MetricsServer(metrics, os.getenv('METRICS_HOST', '127.0.0.1'), metrics_port + WORKER_ID if metrics_port else 0)
+
+# State bus shared with the other cluster workers (off outside cluster mode)
+cluster_bus = BusClient(os.getenv('CLUSTER_SOCKET'), WORKER_ID, SHARD_IDS)
+
+def observe_rest_call(route, seconds, status):
+    # Label by route kind ("channel", "guild_members", ...) rather than the full ID
+    route = route.split(":", 1)[0]
+    rest_seconds.observe(seconds, route, str(status))
+    if status == 429:
+        rest_rate_limited.inc(route)
+
+rest.call_observer = observe_rest_call
+
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.started_at = time.perf_counter()
+
+@bot.after_invoke
+async def record_command_time(ctx):
+    started = getattr(ctx, "started_at", None)
+    if started is not None:
+        status = "error" if ctx.command_failed else "ok"
+        command_seconds.observe(time.perf_counter() - started, ctx.command.qualified_name, status)
+
+# Per-handler timings for !perf, and a sampling profiler that is off until enabled
+profiler = Profiler()
+sampler = SamplingProfiler()
+rest.submit_observer = profiler.rest_call
+
+# Names for user IDs in embeds, looked up once and fetched in bulk when missing
+member_names = MemberNameCache()
+NAMES_PER_PAGE = 20
+
+# Static embeds are built once and copied per use
+templates.build()
+
+# Hidden spare channels for Join-to-Create (disabled when SPARE_POOL_MAX is 0)
+channel_pool = SpareChannelPool(
+    bot,
+    rest,
+    base_size=int(os.getenv('SPARE_POOL_MIN', '0')),
+    max_size=int(os.getenv('SPARE_POOL_MAX', '0'))
+)
+
+def observe_spare_pool(kind, seconds):
+    (spare_claim_seconds if kind == "claim" else spare_refill_seconds).observe(seconds)
+
+channel_pool.observer = observe_spare_pool
+
+def member_name(guild, user_id):
+    """Display name for a user ID, even if they left the server"""
+    return member_names.name(guild, user_id) or f"Unknown ({user_id})"
+
+def resolve_channel(ctx):
+    """The managed channel a command applies to, without needing the caller in voice
+
+    The channel the caller is in comes first, then one they own, then one
+    they host.
+    """
+    if ctx.guild is None:
+        return None
+    guild_id = ctx.guild.id
+    return (
+        voice_channels.channel_of(guild_id, ctx.author.id)
+        or voice_channels.owned_by(guild_id, ctx.author.id)
+        or voice_channels.hosted_by(guild_id, ctx.author.id)
+    )
 
-# Store voice channel data
-voice_channels = {}
+# Size options of the panel buttons with their visual styles
+SIZE_PRESETS = [
+    ("Duo", "2", "🎮", discord.ButtonStyle.blurple),
+    ("Trio", "3", "🎲", discord.ButtonStyle.green),
+    ("Quad", "4", "🎯", discord.ButtonStyle.blurple),
+    ("Penta", "5", "🎪", discord.ButtonStyle.red),
+    ("Hexa", "6", "🎨", discord.ButtonStyle.blurple),
+    ("Septa", "7", "🎭", discord.ButtonStyle.green),
+    ("Octa", "8", "🎼", discord.ButtonStyle.blurple),
+    ("Deca", "10", "🎬", discord.ButtonStyle.red),
+    ("Unlimited", "0", "♾️", discord.ButtonStyle.blurple),
+    ("Custom", "custom", "⚙️", discord.ButtonStyle.gray)
+]
+PRESET_NAMES = {int(size): label for label, size, _, _ in SIZE_PRESETS if size.isdigit()}
 
-class VoiceChannel:
-    def __init__(self, channel, owner):
-        self.channel = channel
-        self.owner = owner
-        self.guests = set()
-        self.blacklist = set()
-        self.whitelist = set()
-        self.is_private = False
-        self.host = owner  # Current host (can be different from owner)
+def preset_name(size):
+    """The panel preset a channel size matches, for !stats"""
+    return PRESET_NAMES.get(size, "Custom")
 
 class ChannelSizeView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)  # Buttons don't timeout
         
-        # Define size options with their visual styles
-        sizes = [
-            ("Duo", "2", "🎮", discord.ButtonStyle.blurple),
-            ("Trio", "3", "🎲", discord.ButtonStyle.green),
-            ("Quad", "4", "🎯", discord.ButtonStyle.blurple),
-            ("Penta", "5", "🎪", discord.ButtonStyle.red),
-            ("Hexa", "6", "🎨", discord.ButtonStyle.blurple),
-            ("Septa", "7", "🎭", discord.ButtonStyle.green),
-            ("Octa", "8", "🎼", discord.ButtonStyle.blurple),
-            ("Deca", "10", "🎬", discord.ButtonStyle.red),
-            ("Unlimited", "0", "♾️", discord.ButtonStyle.blurple),
-            ("Custom", "custom", "⚙️", discord.ButtonStyle.gray)
-        ]
-        
         # Add buttons to the view
-        for label, size, emoji, style in sizes:
+        for label, size, emoji, style in SIZE_PRESETS:
             self.add_item(ChannelSizeButton(label, size, emoji, style))
 
 class ChannelSizeButton(discord.ui.Button):
@@ -62,324 +315,597 @@ class ChannelSizeButton(discord.ui.Button):
 
     async def callback(self, interaction: discord.Interaction):
         if self.size == "custom":
-            embed = discord.Embed(
-                title="⚙️ Custom Size Channel",
-                description=(
-                    "To create a custom size channel, use the command:\n"
-                    "`!size <number>` - Set any size between 1 and 99"
-                ),
-                color=discord.Color.yellow()
-            )
-            embed.set_footer(text="Example: !size 15")
+            embed = templates.render("custom_size")
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
-            
+
+        # Acknowledge first: creating the channel can take longer than
+        # Discord's 3 second deadline, the result follows as a followup
+        started = time.perf_counter()
+        with button_latency.stage("ack"):
+            await interaction.response.defer(ephemeral=True, thinking=True)
+
+        # Repeated clicks while a creation is running share its result
+        key = (interaction.guild.id, interaction.user.id)
+        creation = button_creations.get(key)
+        if creation is None:
+            creation = asyncio.ensure_future(self.create_channel(interaction))
+            button_creations[key] = creation
+            creation.add_done_callback(lambda _: button_creations.pop(key, None))
+        else:
+            button_latency.count("merged_clicks")
+        embed = await asyncio.shield(creation)
+
+        with button_latency.stage("followup"):
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        button_latency.record("total", time.perf_counter() - started)
+
+    async def create_channel(self, interaction):
+        """Create (or reuse) the member's channel; returns the reply embed"""
         try:
+            config = guild_configs.get(interaction.guild.id)
+            if config is None:
+                return templates.render("panel_error", message="Voice channels are not set up on this server.")
+
+            # Reuse the channel this member already owns
+            owned = owned_channel(interaction.guild.id, interaction.user.id)
+            if owned:
+                if interaction.user.voice:
+                    await rest.move(interaction.user, owned.channel)
+                return discord.Embed(
+                    title="🎮 You Already Have a Channel",
+                    description=f"You already own **{owned.channel.name}**. Use `!size` to change its size.",
+                    color=discord.Color.blue()
+                )
+
+            with button_latency.stage("admission"):
+                refusal = await admission.admit(interaction.guild.id, interaction.user.id)
+            if refusal:
+                return discord.Embed(
+                    title="⏳ Slow Down",
+                    description=refusal,
+                    color=discord.Color.orange()
+                )
+
             size = int(self.size)
             overwrites = {
                 interaction.guild.default_role: discord.PermissionOverwrite(connect=True),
                 interaction.user: discord.PermissionOverwrite(connect=True, manage_channels=True)
             }
             
-            # Get or create voice category
-            voice_category = discord.utils.get(interaction.guild.categories, name="Voice Channels")
-            if not voice_category:
-                voice_category = await interaction.guild.create_category("Voice Channels")
+            # Voice category from the resolver cache (created on first use)
+            with button_latency.stage("category"):
+                voice_category = await channel_resolver.get_or_create_category(
+                    interaction.guild,
+                    config.button_category,
+                    PRIORITY_USER
+                )
             
             # Create the channel
-            channel = await interaction.guild.create_voice_channel(
-                name=f"{interaction.user.name}'s Channel",
-                category=voice_category,
-                user_limit=size if size > 0 else None,
-                overwrites=overwrites
-            )
+            with button_latency.stage("create"):
+                channel = await rest.create_voice_channel(
+                    interaction.guild,
+                    name=f"{interaction.user.name}'s Channel",
+                    category=voice_category,
+                    user_limit=size if size > 0 else None,
+                    overwrites=overwrites
+                )
             
             # Store channel data
-            voice_channels[channel.id] = VoiceChannel(channel, interaction.user)
+            channel_data = voice_channels.add(VoiceChannel(channel.id, interaction.guild.id, interaction.user.id))
+            state_store.save(channel_data)
+            audit("create", interaction.guild.id, channel, interaction.user, source="button", size=size)
+            analytics.channel_created(interaction.guild.id, channel.id, interaction.user.id, preset_name(size))
+            track_occupancy(interaction.guild.id)
             
             # Move user if they're in a voice channel
             if interaction.user.voice:
-                await interaction.user.move_to(channel)
+                with button_latency.stage("move"):
+                    await rest.move(interaction.user, channel)
             
-            # Create success embed
-            embed = discord.Embed(
-                title="🎮 Channel Created",
-                description=(
-                    f"Your voice channel has been created with "
-                    f"{'unlimited' if size == 0 else str(size)} slots!"
-                ),
+            # Send to log channel
+            log_embed = discord.Embed(
+                title="🎮 Voice Channel Created",
+                description=f"{interaction.user.name} created a new voice channel",
                 color=discord.Color.green()
             )
-            embed.add_field(
-                name="📋 Channel Info",
-                value=(
-                    f"**Name:** {channel.name}\n"
-                    f"**Size:** {'Unlimited' if size == 0 else f'{size} members'}\n"
-                    f"**Owner:** {interaction.user.name}"
-                ),
-                inline=False
-            )
-            embed.add_field(
-                name="🛠️ Available Commands",
-                value=(
-                    "• `!name <new_name>` - Rename channel\n"
-                    "• `!privacy` - Toggle private mode\n"
-                    "• `!size <number>` - Change size\n"
-                    "• `!help` - View all commands"
-                ),
-                inline=False
+            log_embed.add_field(name="Channel Name", value=channel.name)
+            log_embed.add_field(name="Size", value=f"{'Unlimited' if size == 0 else str(size)} slots")
+            log_embed.add_field(name="Created By", value=interaction.user.name)
+            log_sink.log(interaction.guild, log_embed)
+
+            # Create success embed
+            return templates.render(
+                "channel_created",
+                slots='unlimited' if size == 0 else str(size),
+                name=channel.name,
+                size='Unlimited' if size == 0 else f'{size} members',
+                owner=interaction.user.name
             )
-            embed.set_footer(text="Anti Stress Voice Channels • Type !commands for more options")
-            
-            # Send to log channel if exists
-            log_channel = discord.utils.get(interaction.guild.text_channels, name="voice-logs")
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="🎮 Voice Channel Created",
-                    description=f"{interaction.user.name} created a new voice channel",
-                    color=discord.Color.green()
-                )
-                log_embed.add_field(name="Channel Name", value=channel.name)
-                log_embed.add_field(name="Size", value=f"{'Unlimited' if size == 0 else str(size)} slots")
-                log_embed.add_field(name="Created By", value=interaction.user.name)
-                await log_channel.send(embed=log_embed)
-            
-            await interaction.response.send_message(embed=embed, ephemeral=True)
             
         except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"Failed to create channel: {str(e)}",
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(embed=error_embed, ephemeral=True)
+            button_latency.count("failed")
+            return templates.render("panel_error", message=f"Failed to create channel: {str(e)}")
 
 async def create_info_embed():
     """Create the voice channel information embed"""
-    embed = discord.Embed(
-        title="🎮 Anti Stress Voice Channels",
-        description=(
-            "Create your own custom voice channel with advanced features and full control! "
-            "Choose from preset sizes or create a custom-sized channel."
-        ),
-        color=discord.Color.blue()
-    )
-    
-    # Channel Features
-    embed.add_field(
-        name="✨ Channel Features",
-        value=(
-            "• 🔒 Private or Public mode\n"
-            "• 👥 Custom member limit\n"
-            "• 📝 Custom channel name\n"
-            "• 🎵 Adjustable bitrate\n"
-            "• ⚡ Quick size presets"
-        ),
-        inline=True
-    )
-    
-    # Management Features
-    embed.add_field(
-        name="🛠️ Management",
-        value=(
-            "• 👑 Full owner controls\n"
-            "• ✅ Whitelist system\n"
-            "• ❌ Blacklist system\n"
-            "• 🎯 Temporary hosts\n"
-            "• 🔄 Auto-cleanup"
-        ),
-        inline=True
-    )
-    
-    # Size Presets
-    embed.add_field(
-        name="📊 Available Sizes",
-        value=(
-            "**Quick Create Buttons:**\n"
-            "• 🎮 Duo (2) • 🎲 Trio (3)\n"
-            "• 🎯 Quad (4) • 🎪 Penta (5)\n"
-            "• 🎨 Hexa (6) • 🎭 Septa (7)\n"
-            "• 🎼 Octa (8) • 🎬 Deca (10)\n"
-            "• ♾️ Unlimited • ⚙️ Custom"
-        ),
-        inline=False
-    )
-    
-    # Important Notes
-    embed.add_field(
-        name="📝 Important Notes",
-        value=(
-            "• Channels auto-delete when empty\n"
-            "• Staff can access any channel if needed\n"
-            "• All server rules apply in custom channels\n"
-            "• Use `!commands` for full command list\n"
-            "• Click buttons below to create a channel"
-        ),
-        inline=False
-    )
-    
-    embed.set_footer(text="Anti Stress Voice Channels • Click a button below to create your channel")
-    return embed
+    return templates.render("info")
 
 import asyncio
 
 import os
 
-GUILD_ID = int(os.getenv('GUILD_ID', '0'))
+# Per-guild settings from GUILD_CONFIG_PATH (reload with !reloadconfig); without
+# the file the bot serves GUILD_ID with the channels from the environment
+guild_configs = GuildConfigStore(
+    os.getenv('GUILD_CONFIG_PATH', 'guilds.json'),
+    fallback_guild_id=int(os.getenv('GUILD_ID', '0')),
+    fallback={
+        "info_channel_id": os.getenv('INFO_CHANNEL_ID'),
+        "help_channel_id": os.getenv('HELP_CHANNEL_ID'),
+    }
+)
+log_sink.channel_name_of = lambda guild: guild_configs.get(guild.id).log_channel if guild.id in guild_configs else None
+# The single-guild panel record from before per-guild settings is GUILD_ID's
+info_panel.legacy_guild_id = guild_configs.fallback_guild_id or None
+
+# Guilds whose state was restored / whose info panel was synced since startup
+restored_guilds = set()
+synced_panels = set()
+# Stored records of the guilds present at startup, until each is restored
+stored_records = None
+
+# Member-count presence over every guild, refreshed only when the count changes
+presence = PresenceManager(
+    bot,
+    None,
+    min_interval=float(os.getenv('PRESENCE_MIN_INTERVAL', '60')),
+    rotate_interval=float(os.getenv('PRESENCE_ROTATE_INTERVAL', '0')),
+    static_activities=["Powered by custom-vcs", "Owner: Oliver_Ol"]
+)
+
+async def backfill_audit_index():
+    """Index what was logged while the index was missing, then start the audit writer"""
+    global audit_backfilled
+    if audit_index is None or audit_backfilled:
+        audit_log.start()
+        return
+    audit_backfilled = True
+    try:
+        added = await asyncio.to_thread(audit_index.backfill, audit_log.segments())
+        if added:
+            print(f"Indexed {added} audit events from the log files")
+    except Exception as e:
+        print(f"Error indexing the audit log: {str(e)}")
+    audit_log.start()
+
+def start_audit_log():
+    """Start the audit writer once the index has caught up, without holding up startup
+
+    Events recorded during the backfill wait on the writer's queue.
+    """
+    global audit_startup
+    if audit_startup is None or audit_startup.done():
+        audit_startup = asyncio.create_task(backfill_audit_index())
 
 @bot.event
 async def on_ready():
     print(f'{bot.user} has connected to Discord!')
 
-    # Start background task to cycle activities
-    bot.loop.create_task(cycle_activities())
+    # Size buttons keep working on panels posted before a restart
+    if not bot.persistent_views:
+        bot.add_view(ChannelSizeView())
+
+    # Start the presence task (only one runs across reconnects)
+    presence.start()
+
+    # Start the batched voice-logs writer
+    log_sink.start()
+    start_audit_log()
+    state_store.start()
+    deletion_timers.start()
+    await metrics_server.start()
+    cluster_bus.start()
+
+    # Set up every guild the bot serves
+    load_stored_records()
+    for guild in bot.guilds:
+        if guild.id in guild_configs:
+            await setup_guild(guild)
+    channel_pool.start()
+
+async def setup_guild(guild):
+    """Restore state, create the standing channels and post the info panel for a guild"""
+    config = guild_configs.get(guild.id)
+    if config is None:
+        return
+    try:
+        # Restore managed channels from the state store (first connect only)
+        if guild.id not in restored_guilds:
+            restored_guilds.add(guild.id)
+            load_voice_channels(guild)
+            await reconcile_voice_channels(guild, config)
 
-    # Create initial voice channel if it doesn't exist
-    guild = discord.utils.get(bot.guilds, id=GUILD_ID)
-    if guild:
         # Create voice category
-        voice_category = discord.utils.get(guild.categories, name="・ PRIVATE VOICE ZONE・")
-        if not voice_category:
-            voice_category = await guild.create_category("・ PRIVATE VOICE ZONE・")
-        
+        voice_category = await channel_resolver.get_or_create_category(guild, config.voice_category)
+
         # Create join channel
-        join_channel = discord.utils.get(guild.voice_channels, name="private¹")
-        if not join_channel:
-            join_channel = await guild.create_voice_channel(
-                name="private¹",
-                category=voice_category
-            )
-        
-        # Post info in the designated info channel
-        info_channel_id = os.getenv('INFO_CHANNEL_ID')
-        if info_channel_id:
-            try:
-                info_channel = await bot.fetch_channel(int(info_channel_id))
-                # Send new info embed
-                await info_channel.send(embed=await create_info_embed(), view=ChannelSizeView())
-            except Exception as e:
-                print(f"Error posting to info channel: {str(e)}")
-
-async def cycle_activities():
-    while True:
-        guild = discord.utils.get(bot.guilds, id=GUILD_ID)
-        if guild:
-            total_members = guild.member_count
-        else:
-            total_members = 0
-        
-        activities = [
-            discord.Game(name=f"Hug {total_members} members!"),
-            discord.Game(name="Powered by custom-vcs"),
-            discord.Game(name="Owner: Oliver_Ol")
-        ]
-        
-        for activity in activities:
-            await bot.change_presence(activity=activity)
-            await asyncio.sleep(10)  # Display each activity for 10 seconds
+        await channel_resolver.get_or_create_voice_channel(
+            guild,
+            config.join_channel,
+            category=voice_category
+        )
+
+        # Pre-warm spare channels next to every Join-to-Create trigger
+        if channel_pool.enabled:
+            for channel in guild.voice_channels:
+                if channel.name == config.lobby_channel:
+                    channel_pool.track(channel.category)
+
+        # Post or refresh the info panel once; reconnects leave it alone
+        if guild.id not in synced_panels:
+            synced_panels.add(guild.id)
+            await sync_info_panel(guild)
+    except Exception as e:
+        print(f"Error setting up guild {guild.id}: {str(e)}")
+
+async def sync_info_panel(guild):
+    """Post the guild's info panel, or edit it if its content changed"""
+    config = guild_configs.get(guild.id)
+    if config is None or not config.info_channel_id:
+        return
+    try:
+        result = await info_panel.sync(guild.id, config.info_channel_id, await create_info_embed(), ChannelSizeView())
+        print(f"Info panel for guild {guild.id} {result}")
+    except Exception as e:
+        print(f"Error posting to info channel: {str(e)}")
+
+def load_stored_records():
+    """Read every stored record once at startup, grouped by guild for load_voice_channels"""
+    global stored_records
+    if stored_records is not None:
+        return
+    if SHARD_IDS:
+        # Other workers' guilds share the database; load_voice_channels reads this worker's one by one
+        stored_records = {}
+        return
+    stored_records = {guild.id: [] for guild in bot.guilds}
+    for record in state_store.load_all():
+        stored_records.setdefault(record["guild_id"], []).append(record)
+
+def load_voice_channels(guild):
+    """Rebuild a guild's voice_channels from the startup bulk read"""
+    records = stored_records.pop(guild.id, None) if stored_records else None
+    if records is None:
+        # Joined (or came back) after startup
+        records = state_store.load_guild(guild.id)
+    for record in records:
+        # Channels deleted while the bot was offline are dropped
+        if guild.get_channel(record["channel_id"]) is None:
+            state_store.delete(record["channel_id"])
+            continue
+        channel_data = voice_channels.add(VoiceChannel.from_record(record))
+        for present in channel_data.channel.members:
+            voice_channels.member_joined(guild.id, present.id, channel_data.channel_id)
+    print(f"Restored {len(voice_channels.in_guild(guild.id))} managed voice channels in guild {guild.id}")
+
+async def reconcile_voice_channels(guild, config):
+    """Adopt or clean up temporary channels that state does not account for"""
+    categories = [
+        channel_resolver.category(guild, config.voice_category),
+        channel_resolver.category(guild, config.button_category),
+    ]
+    for channel in guild.voice_channels:
+        if channel.name == config.lobby_channel:
+            categories.append(channel.category)
+            # Take back spares left from the last run before they pass for orphans
+            channel_pool.track(channel.category)
+    categories = {category.id: category for category in categories if category}.values()
+    spares = {
+        channel.id
+        for category in categories
+        for channel in category.voice_channels
+        if channel_pool.is_spare(channel.id)
+    }
+
+    adopt, orphans, stale = plan_reconciliation(categories, voice_channels.in_guild(guild.id), spares)
+
+    # Re-adopt occupied channels
+    for channel, owner in adopt:
+        channel_data = voice_channels.add(VoiceChannel(channel.id, guild.id, owner.id))
+        state_store.save(channel_data)
+        audit("adopt", guild.id, channel, target=owner, reason="reconcile")
+        for present in channel.members:
+            voice_channels.member_joined(guild.id, present.id, channel.id)
+
+    # Drop the stale records first so the delete events find nothing to
+    # forget, then delete empty channels a few at a time
+    for channel in stale:
+        forget_channel(channel.id, channel, "reconcile")
+    deleted = await delete_channels(orphans + stale, rest)
+    orphan_ids = {channel.id for channel in orphans}
+    for channel in deleted:
+        if channel.id in orphan_ids:
+            audit("delete", guild.id, channel, reason="reconcile")
+
+    if adopt or deleted:
+        embed = discord.Embed(
+            title="Voice Channels Reconciled",
+            description="Temporary channels were checked after a restart",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Adopted", value=str(len(adopt)))
+        embed.add_field(name="Deleted", value=str(len(deleted)))
+        log_sink.log(guild, embed)
+    track_occupancy(guild.id)
+    print(f"Reconciled voice channels: {len(adopt)} adopted, {len(deleted)} deleted")
+
+@bot.event
+async def on_member_join(member):
+    if member.guild.id in guild_configs:
+        presence.member_count_changed()
+
+@bot.event
+async def on_member_update(before, after):
+    # Cached names go stale when a member is renamed
+    if before.name != after.name:
+        member_names.forget(after.id)
+
+@bot.event
+async def on_user_update(before, after):
+    if before.name != after.name:
+        member_names.forget(after.id)
+
+@bot.event
+async def on_guild_join(guild):
+    if guild.id in guild_configs:
+        await setup_guild(guild)
+
+@bot.event
+async def on_guild_remove(guild):
+    forget_guild(guild.id)
+
+def forget_guild(guild_id):
+    """Drop a guild's in-memory state; what is stored is kept in case it comes back"""
+    for channel_data in voice_channels.drop_guild(guild_id):
+        deletion_timers.cancel(channel_data.channel_id)
+    channel_resolver.forget_guild(guild_id)
+    analytics.forget_guild(guild_id)
+    restored_guilds.discard(guild_id)
+    synced_panels.discard(guild_id)
+
+@bot.event
+async def on_member_remove(member):
+    if member.guild.id in guild_configs:
+        presence.member_count_changed()
 
 @bot.event
+@timed(voice_update_seconds)
+@profiler.profile("on_voice_state_update")
 async def on_voice_state_update(member, before, after):
     """Handle voice channel join/leave events"""
-    if member.guild.id != GUILD_ID:
+    config = guild_configs.get(member.guild.id)
+    if config is None:
         return
 
-    # Get or create log channel
-    log_channel = discord.utils.get(member.guild.text_channels, name="voice-logs")
-    if not log_channel:
-        try:
-            log_channel = await member.guild.create_text_channel("voice-logs")
-        except:
-            log_channel = None
+    # Keep the member -> managed channel index current
+    if before.channel != after.channel:
+        if after.channel:
+            voice_channels.member_joined(member.guild.id, member.id, after.channel.id)
+        else:
+            voice_channels.member_left(member.guild.id, member.id)
+        track_occupancy(member.guild.id)
+
+        # A move is a leave and a join
+        if before.channel:
+            audit("leave", member.guild.id, before.channel, member)
+        if after.channel:
+            audit("join", member.guild.id, after.channel, member)
 
     # When a user joins the "Join to Create" channel
-    if after.channel and after.channel.name == "➕ Join to Create":
-        # Create a new voice channel for the user
-        category = after.channel.category
-        new_channel = await member.guild.create_voice_channel(
-            name=f"{member.name}'s Channel",
-            category=category
-        )
-        # Move the user to their new channel
-        await member.move_to(new_channel)
-        # Store the channel data
-        voice_channels[new_channel.id] = VoiceChannel(new_channel, member)
-        
-        # Log channel creation
-        if log_channel:
-            embed = discord.Embed(
-                title="Voice Channel Created",
-                description=f"{member.name} created a new voice channel",
-                color=discord.Color.green()
-            )
-            embed.add_field(name="Channel Name", value=new_channel.name)
-            embed.add_field(name="Created By", value=member.name)
-            await log_channel.send(embed=embed)
-        
+    if after.channel and after.channel.name == config.lobby_channel:
+        # Creation awaits Discord; run it on the member's actor so their
+        # events stay in order without holding up anyone else
+        await voice_actors.submit(("member", member.guild.id, member.id), join_to_create, member, after.channel)
+
     # When a user joins any voice channel
     elif after.channel and after.channel != before.channel:
-        if log_channel:
-            embed = discord.Embed(
-                title="User Joined Voice",
-                description=f"{member.name} joined a voice channel",
-                color=discord.Color.blue()
-            )
-            embed.add_field(name="Channel", value=after.channel.name)
-            await log_channel.send(embed=embed)
+        # Someone came back before the grace period ran out
+        deletion_timers.cancel(after.channel.id)
+
+        embed = discord.Embed(
+            title="User Joined Voice",
+            description=f"{member.name} joined a voice channel",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Channel", value=after.channel.name)
+        log_sink.log(member.guild, embed)
     
     # When a user leaves a voice channel
     if before.channel:
         if before.channel.id in voice_channels:
             # If the channel is empty and it's not the "Join to Create" channel
-            if len(before.channel.members) == 0 and before.channel.name != "➕ Join to Create":
-                # Log channel deletion
-                if log_channel:
-                    embed = discord.Embed(
-                        title="Voice Channel Deleted",
-                        description=f"Empty channel was automatically deleted",
-                        color=discord.Color.red()
-                    )
-                    embed.add_field(name="Channel Name", value=before.channel.name)
-                    await log_channel.send(embed=embed)
-                
-                # Delete the channel
-                await before.channel.delete()
-                # Remove the channel data
-                del voice_channels[before.channel.id]
+            if len(before.channel.members) == 0 and before.channel.name != config.lobby_channel:
+                if EMPTY_CHANNEL_GRACE > 0:
+                    deletion_timers.schedule(before.channel.id, EMPTY_CHANNEL_GRACE, queue_channel_deletion)
+                else:
+                    await queue_channel_deletion(before.channel.id)
         
         # Log user leaving
-        elif log_channel and not after.channel:
+        elif not after.channel:
             embed = discord.Embed(
                 title="User Left Voice",
                 description=f"{member.name} left the voice channel",
                 color=discord.Color.orange()
             )
             embed.add_field(name="Channel", value=before.channel.name)
-            await log_channel.send(embed=embed)
+            log_sink.log(member.guild, embed)
+
+async def join_to_create(member, lobby):
+    """Give a member who joined the lobby their own channel"""
+    # Send members who already own a channel back to it
+    owned = owned_channel(member.guild.id, member.id)
+    if owned:
+        await rest.move(member, owned.channel)
+        return
+
+    refusal = await admission.admit(member.guild.id, member.id)
+    if refusal:
+        # Over the limit: take them out of the lobby
+        await rest.move(member, None)
+        embed = discord.Embed(
+            title="Voice Channel Creation Refused",
+            description=f"{member.name} was creating channels too quickly",
+            color=discord.Color.orange()
+        )
+        embed.add_field(name="Reason", value=refusal)
+        log_sink.log(member.guild, embed)
+        return
+
+    # Claim a pre-warmed spare, or create a new voice channel for the user
+    category = lobby.category
+    new_channel = await channel_pool.claim(member.guild, category, f"{member.name}'s Channel")
+    if new_channel is None:
+        new_channel = await rest.create_voice_channel(
+            member.guild,
+            name=f"{member.name}'s Channel",
+            category=category
+        )
+    # Store the channel data before the move so the join event sees it
+    channel_data = voice_channels.add(VoiceChannel(new_channel.id, member.guild.id, member.id))
+    state_store.save(channel_data)
+    audit("create", member.guild.id, new_channel, member, source="lobby")
+    analytics.channel_created(member.guild.id, new_channel.id, member.id, "Join to Create")
+    track_occupancy(member.guild.id)
+    # Move the user to their new channel
+    await rest.move(member, new_channel)
+    
+    # Log channel creation
+    embed = discord.Embed(
+        title="Voice Channel Created",
+        description=f"{member.name} created a new voice channel",
+        color=discord.Color.green()
+    )
+    embed.add_field(name="Channel Name", value=new_channel.name)
+    embed.add_field(name="Created By", value=member.name)
+    log_sink.log(member.guild, embed)
+
+async def queue_channel_deletion(channel_id):
+    # Deletes for a channel run in order on its actor, so two leaves can't race
+    await voice_actors.submit(("channel", channel_id), delete_empty_channel, channel_id)
+
+def forget_channel(channel_id, channel=None, reason="gone"):
+    """Drop a managed channel's record everywhere; returns it, or None if it wasn't managed"""
+    channel_data = voice_channels.remove(channel_id)
+    if channel_data is None:
+        return None
+    state_store.delete(channel_id)
+    deletion_timers.cancel(channel_id)
+    analytics.channel_deleted(channel_data.guild_id, channel_id)
+    track_occupancy(channel_data.guild_id)
+    if channel is None:
+        audit("delete", channel_data.guild_id, channel_id=channel_id, reason=reason)
+    else:
+        audit("delete", channel_data.guild_id, channel, reason=reason)
+    return channel_data
+
+def owned_channel(guild_id, user_id):
+    """The member's managed channel, or None; a record whose channel is gone is dropped"""
+    owned = voice_channels.owned_by(guild_id, user_id)
+    if owned is not None and owned.channel is None:
+        forget_channel(owned.channel_id)
+        return None
+    return owned
+
+async def delete_empty_channel(channel_id):
+    """Delete a managed channel if it is still empty"""
+    channel_data = voice_channels.get(channel_id)
+    if channel_data is None:
+        return
+    channel = channel_data.channel
+    if channel is not None and channel.members:
+        return
+
+    # Remove the channel data first so a second leave event can't race us
+    forget_channel(channel_id, channel, "gone" if channel is None else "empty")
+    if channel is None:
+        return
+
+    # Log channel deletion
+    embed = discord.Embed(
+        title="Voice Channel Deleted",
+        description=f"Empty channel was automatically deleted",
+        color=discord.Color.red()
+    )
+    embed.add_field(name="Channel Name", value=channel.name)
+    log_sink.log(channel.guild, embed)
+
+    # Delete the channel
+    await rest.delete_channel(channel)
+
+@bot.event
+async def on_guild_channel_create(channel):
+    channel_resolver.channel_created(channel)
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    channel_resolver.channel_deleted(channel)
+    channel_pool.forget(channel.id)
+    deletion_timers.cancel(channel.id)
+    # Deleted by hand: the owner must be able to create a new one
+    forget_channel(channel.id, channel, "deleted")
+
+@bot.event
+async def on_raw_message_delete(payload):
+    # Repost the info panel if someone deleted it
+    guild_id = info_panel.message_deleted(payload.message_id)
+    if guild_id is not None and bot.get_guild(guild_id):
+        await sync_info_panel(bot.get_guild(guild_id))
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    channel_resolver.channel_updated(before, after)
 
 # Channel Management Commands
 def guild_only():
     def predicate(ctx):
-        return ctx.guild and ctx.guild.id == GUILD_ID
+        return ctx.guild is not None and ctx.guild.id in guild_configs
     return commands.check(predicate)
 
 @bot.command(name='create')
 @guild_only()
 async def create_voice(ctx, name: str, size: int = 0):
     """Create a new voice channel"""
+    owned = owned_channel(ctx.guild.id, ctx.author.id)
+    if owned:
+        error_embed = templates.render("error", message=f'You already own the voice channel "{owned.channel.name}"!')
+        await ctx.send(embed=error_embed)
+        return
+
+    refusal = await admission.admit(ctx.guild.id, ctx.author.id)
+    if refusal:
+        error_embed = templates.render("error", message=refusal)
+        await ctx.send(embed=error_embed)
+        return
+
     try:
         overwrites = {
             ctx.guild.default_role: discord.PermissionOverwrite(connect=True),
             ctx.author: discord.PermissionOverwrite(connect=True, manage_channels=True)
         }
         
-        channel = await ctx.guild.create_voice_channel(
-            name,
+        channel = await rest.create_voice_channel(
+            ctx.guild,
+            name=name,
             user_limit=size if size > 0 else None,
             overwrites=overwrites
         )
         
-        voice_channels[channel.id] = VoiceChannel(channel, ctx.author)
+        channel_data = voice_channels.add(VoiceChannel(channel.id, ctx.guild.id, ctx.author.id))
+        state_store.save(channel_data)
+        audit("create", ctx.guild.id, channel, ctx.author, source="command", size=size)
+        analytics.channel_created(ctx.guild.id, channel.id, ctx.author.id, preset_name(size))
+        track_occupancy(ctx.guild.id)
         
         # Create success embed
         embed = discord.Embed(
@@ -391,43 +917,31 @@ async def create_voice(ctx, name: str, size: int = 0):
         embed.add_field(name="Size", value=f"{size} people" if size > 0 else "Unlimited")
         embed.add_field(name="Owner", value=ctx.author.name)
         
-        # Send to log channel if exists
-        log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-        if log_channel:
-            await log_channel.send(embed=embed)
+        # Send to log channel
+        log_sink.log(ctx.guild, embed)
             
         await ctx.send(embed=embed)
     except Exception as e:
-        error_embed = discord.Embed(
-            title="Error",
-            description=f'Error creating channel: {str(e)}',
-            color=discord.Color.red()
-        )
+        error_embed = templates.render("error", message=f'Error creating channel: {str(e)}')
         await ctx.send(embed=error_embed)
 
 @bot.command(name='privacy')
 async def toggle_privacy(ctx):
     """Toggle channel privacy"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        error_embed = discord.Embed(
-            title="Error",
-            description="You must be in your custom voice channel!",
-            color=discord.Color.red()
-        )
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        error_embed = templates.render("error", message="You must be in or own a custom voice channel!")
         await ctx.send(embed=error_embed)
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
-        error_embed = discord.Embed(
-            title="Error",
-            description="Only the channel owner can change privacy settings!",
-            color=discord.Color.red()
-        )
+    if ctx.author.id != channel_data.owner_id:
+        error_embed = templates.render("error", message="Only the channel owner can change privacy settings!")
         await ctx.send(embed=error_embed)
         return
         
     channel_data.is_private = not channel_data.is_private
+    state_store.save(channel_data)
+    audit("privacy", ctx.guild.id, channel_data.channel, ctx.author, is_private=channel_data.is_private)
+    await apply_overwrites(channel_data, rest)
     status = "private" if channel_data.is_private else "public"
     
     # Create success embed
@@ -440,36 +954,28 @@ async def toggle_privacy(ctx):
     embed.add_field(name="Status", value=status.capitalize())
     embed.add_field(name="Owner", value=ctx.author.name)
     
-    # Send to log channel if exists
-    log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-    if log_channel:
-        await log_channel.send(embed=embed)
+    # Send to log channel
+    log_sink.log(ctx.guild, embed)
         
     await ctx.send(embed=embed)
 
 @bot.command(name='whitelist')
 async def whitelist_user(ctx, member: discord.Member):
     """Add a user to the whitelist"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        error_embed = discord.Embed(
-            title="Error",
-            description="You must be in your custom voice channel!",
-            color=discord.Color.red()
-        )
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        error_embed = templates.render("error", message="You must be in or own a custom voice channel!")
         await ctx.send(embed=error_embed)
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
-        error_embed = discord.Embed(
-            title="Error",
-            description="Only the channel owner can modify the whitelist!",
-            color=discord.Color.red()
-        )
+    if ctx.author.id != channel_data.owner_id:
+        error_embed = templates.render("error", message="Only the channel owner can modify the whitelist!")
         await ctx.send(embed=error_embed)
         return
         
-    channel_data.whitelist.add(member.id)
+    channel_data.add("whitelist", member.id)
+    state_store.save(channel_data)
+    audit("list_add", ctx.guild.id, channel_data.channel, ctx.author, member, list="whitelist")
+    await apply_overwrites(channel_data, rest)
     
     # Create success embed
     embed = discord.Embed(
@@ -481,46 +987,38 @@ async def whitelist_user(ctx, member: discord.Member):
     embed.add_field(name="Whitelisted User", value=member.name)
     embed.add_field(name="Owner", value=ctx.author.name)
     
-    # Send to log channel if exists
-    log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-    if log_channel:
-        log_embed = discord.Embed(
-            title="Whitelist Updated",
-            description=f"A user was added to channel whitelist",
-            color=discord.Color.blue()
-        )
-        log_embed.add_field(name="Channel", value=channel_data.channel.name)
-        log_embed.add_field(name="Added User", value=member.name)
-        log_embed.add_field(name="Added By", value=ctx.author.name)
-        await log_channel.send(embed=log_embed)
+    # Send to log channel
+    log_embed = discord.Embed(
+        title="Whitelist Updated",
+        description=f"A user was added to channel whitelist",
+        color=discord.Color.blue()
+    )
+    log_embed.add_field(name="Channel", value=channel_data.channel.name)
+    log_embed.add_field(name="Added User", value=member.name)
+    log_embed.add_field(name="Added By", value=ctx.author.name)
+    log_sink.log(ctx.guild, log_embed)
         
     await ctx.send(embed=embed)
 
 @bot.command(name='blacklist')
 async def blacklist_user(ctx, member: discord.Member):
     """Add a user to the blacklist"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        error_embed = discord.Embed(
-            title="Error",
-            description="You must be in your custom voice channel!",
-            color=discord.Color.red()
-        )
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        error_embed = templates.render("error", message="You must be in or own a custom voice channel!")
         await ctx.send(embed=error_embed)
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
-        error_embed = discord.Embed(
-            title="Error",
-            description="Only the channel owner can modify the blacklist!",
-            color=discord.Color.red()
-        )
+    if ctx.author.id != channel_data.owner_id:
+        error_embed = templates.render("error", message="Only the channel owner can modify the blacklist!")
         await ctx.send(embed=error_embed)
         return
         
-    channel_data.blacklist.add(member.id)
-    if member.voice and member.voice.channel == channel_data.channel:
-        await member.move_to(None)  # Disconnect the user if they're in the channel
+    channel_data.add("blacklist", member.id)
+    state_store.save(channel_data)
+    audit("list_add", ctx.guild.id, channel_data.channel, ctx.author, member, list="blacklist")
+    await apply_overwrites(channel_data, rest)
+    if member.voice and member.voice.channel.id == channel_data.channel_id:
+        await rest.move(member, None, PRIORITY_PERMISSIONS)  # Disconnect the user if they're in the channel
     
     # Create success embed
     embed = discord.Embed(
@@ -532,36 +1030,29 @@ async def blacklist_user(ctx, member: discord.Member):
     embed.add_field(name="Blacklisted User", value=member.name)
     embed.add_field(name="Owner", value=ctx.author.name)
     
-    # Send to log channel if exists
-    log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-    if log_channel:
-        log_embed = discord.Embed(
-            title="Blacklist Updated",
-            description=f"A user was added to channel blacklist",
-            color=discord.Color.red()
-        )
-        log_embed.add_field(name="Channel", value=channel_data.channel.name)
-        log_embed.add_field(name="Blacklisted User", value=member.name)
-        log_embed.add_field(name="Added By", value=ctx.author.name)
-        if member.voice and member.voice.channel == channel_data.channel:
-            log_embed.add_field(name="Action", value="User was disconnected from the channel")
-        await log_channel.send(embed=log_embed)
+    # Send to log channel
+    log_embed = discord.Embed(
+        title="Blacklist Updated",
+        description=f"A user was added to channel blacklist",
+        color=discord.Color.red()
+    )
+    log_embed.add_field(name="Channel", value=channel_data.channel.name)
+    log_embed.add_field(name="Blacklisted User", value=member.name)
+    log_embed.add_field(name="Added By", value=ctx.author.name)
+    if member.voice and member.voice.channel.id == channel_data.channel_id:
+        log_embed.add_field(name="Action", value="User was disconnected from the channel")
+    log_sink.log(ctx.guild, log_embed)
         
     await ctx.send(embed=embed)
 
 @bot.command(name='info')
 async def channel_info(ctx):
     """Display channel information"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        error_embed = discord.Embed(
-            title="Error",
-            description="You must be in a custom voice channel!",
-            color=discord.Color.red()
-        )
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        error_embed = templates.render("error", message="You must be in or own a custom voice channel!")
         await ctx.send(embed=error_embed)
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
     channel = channel_data.channel
     
     info = discord.Embed(
@@ -570,8 +1061,8 @@ async def channel_info(ctx):
     )
     
     # Basic Information
-    info.add_field(name="Owner", value=channel_data.owner.name, inline=True)
-    info.add_field(name="Current Host", value=channel_data.host.name, inline=True)
+    info.add_field(name="Owner", value=member_name(ctx.guild, channel_data.owner_id), inline=True)
+    info.add_field(name="Current Host", value=member_name(ctx.guild, channel_data.host_id), inline=True)
     info.add_field(name="Privacy", value="Private" if channel_data.is_private else "Public", inline=True)
     
     # Channel Settings
@@ -580,64 +1071,53 @@ async def channel_info(ctx):
     info.add_field(name="Current Users", value=len(channel.members), inline=True)
     
     # Current Members
-    members_list = "\n".join([member.name for member in channel.members]) or "None"
+    members_list = clip_lines([member.name for member in channel.members]) or "None"
     info.add_field(name="Current Members", value=members_list, inline=False)
     
     # Whitelist/Blacklist
     if channel_data.whitelist:
-        whitelist = "\n".join([ctx.guild.get_member(user_id).name for user_id in channel_data.whitelist if ctx.guild.get_member(user_id)]) or "None"
+        whitelist = clip_lines(await member_names.resolve(ctx.guild, channel_data.whitelist)) or "None"
         info.add_field(name="Whitelisted Users", value=whitelist, inline=True)
     
     if channel_data.blacklist:
-        blacklist = "\n".join([ctx.guild.get_member(user_id).name for user_id in channel_data.blacklist if ctx.guild.get_member(user_id)]) or "None"
+        blacklist = clip_lines(await member_names.resolve(ctx.guild, channel_data.blacklist)) or "None"
         info.add_field(name="Blacklisted Users", value=blacklist, inline=True)
     
     # Guest List
     if channel_data.guests:
-        guests = "\n".join([ctx.guild.get_member(user_id).name for user_id in channel_data.guests if ctx.guild.get_member(user_id)]) or "None"
+        guests = clip_lines(await member_names.resolve(ctx.guild, channel_data.guests)) or "None"
         info.add_field(name="Guest List", value=guests, inline=False)
     
     info.set_footer(text="Use !commands to see available channel management commands")
     
-    # Send to log channel if exists
-    log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-    if log_channel:
-        log_embed = discord.Embed(
-            title="Channel Info Requested",
-            description=f"Channel information was viewed",
-            color=discord.Color.blue()
-        )
-        log_embed.add_field(name="Channel", value=channel.name)
-        log_embed.add_field(name="Requested By", value=ctx.author.name)
-        await log_channel.send(embed=log_embed)
+    # Send to log channel
+    log_embed = discord.Embed(
+        title="Channel Info Requested",
+        description=f"Channel information was viewed",
+        color=discord.Color.blue()
+    )
+    log_embed.add_field(name="Channel", value=channel.name)
+    log_embed.add_field(name="Requested By", value=ctx.author.name)
+    log_sink.log(ctx.guild, log_embed)
     
     await ctx.send(embed=info)
 
 @bot.command(name='size')
 async def set_size(ctx, limit: int):
     """Set the channel size limit"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        error_embed = discord.Embed(
-            title="Error",
-            description="You must be in your custom voice channel!",
-            color=discord.Color.red()
-        )
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        error_embed = templates.render("error", message="You must be in or own a custom voice channel!")
         await ctx.send(embed=error_embed)
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
-        error_embed = discord.Embed(
-            title="Error",
-            description="Only the channel owner can change the size limit!",
-            color=discord.Color.red()
-        )
+    if ctx.author.id != channel_data.owner_id:
+        error_embed = templates.render("error", message="Only the channel owner can change the size limit!")
         await ctx.send(embed=error_embed)
         return
     
     try:
         old_limit = channel_data.channel.user_limit or "Unlimited"
-        await channel_data.channel.edit(user_limit=limit if limit > 0 else None)
+        await rest.edit_channel(channel_data.channel, PRIORITY_PERMISSIONS, user_limit=limit if limit > 0 else None)
         
         # Create success embed
         embed = discord.Embed(
@@ -649,54 +1129,40 @@ async def set_size(ctx, limit: int):
         embed.add_field(name="New Size", value=f"{limit} people" if limit > 0 else "Unlimited")
         embed.add_field(name="Previous Size", value=f"{old_limit}")
         
-        # Send to log channel if exists
-        log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-        if log_channel:
-            log_embed = discord.Embed(
-                title="Channel Size Changed",
-                description=f"Voice channel size was modified",
-                color=discord.Color.blue()
-            )
-            log_embed.add_field(name="Channel", value=channel_data.channel.name)
-            log_embed.add_field(name="Changed By", value=ctx.author.name)
-            log_embed.add_field(name="Old Size", value=f"{old_limit}")
-            log_embed.add_field(name="New Size", value=f"{limit} people" if limit > 0 else "Unlimited")
-            await log_channel.send(embed=log_embed)
+        # Send to log channel
+        log_embed = discord.Embed(
+            title="Channel Size Changed",
+            description=f"Voice channel size was modified",
+            color=discord.Color.blue()
+        )
+        log_embed.add_field(name="Channel", value=channel_data.channel.name)
+        log_embed.add_field(name="Changed By", value=ctx.author.name)
+        log_embed.add_field(name="Old Size", value=f"{old_limit}")
+        log_embed.add_field(name="New Size", value=f"{limit} people" if limit > 0 else "Unlimited")
+        log_sink.log(ctx.guild, log_embed)
             
         await ctx.send(embed=embed)
     except discord.errors.InvalidArgument:
-        error_embed = discord.Embed(
-            title="Error",
-            description="Invalid size limit! Must be between 0 (unlimited) and 99.",
-            color=discord.Color.red()
-        )
+        error_embed = templates.render("error", message="Invalid size limit! Must be between 0 (unlimited) and 99.")
         await ctx.send(embed=error_embed)
 
 @bot.command(name='name')
 async def change_name(ctx, *, new_name: str):
     """Change the channel name"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        error_embed = discord.Embed(
-            title="Error",
-            description="You must be in your custom voice channel!",
-            color=discord.Color.red()
-        )
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        error_embed = templates.render("error", message="You must be in or own a custom voice channel!")
         await ctx.send(embed=error_embed)
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
-        error_embed = discord.Embed(
-            title="Error",
-            description="Only the channel owner can change the channel name!",
-            color=discord.Color.red()
-        )
+    if ctx.author.id != channel_data.owner_id:
+        error_embed = templates.render("error", message="Only the channel owner can change the channel name!")
         await ctx.send(embed=error_embed)
         return
     
     try:
         old_name = channel_data.channel.name
-        await channel_data.channel.edit(name=new_name)
+        await rest.edit_channel(channel_data.channel, name=new_name)
+        audit("rename", ctx.guild.id, channel_data.channel, ctx.author, previous_name=old_name, name=new_name)
         
         # Create success embed
         embed = discord.Embed(
@@ -708,53 +1174,41 @@ async def change_name(ctx, *, new_name: str):
         embed.add_field(name="Previous Name", value=old_name)
         embed.add_field(name="Changed By", value=ctx.author.name)
         
-        # Send to log channel if exists
-        log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-        if log_channel:
-            log_embed = discord.Embed(
-                title="Channel Name Changed",
-                description=f"Voice channel name was modified",
-                color=discord.Color.blue()
-            )
-            log_embed.add_field(name="Old Name", value=old_name)
-            log_embed.add_field(name="New Name", value=new_name)
-            log_embed.add_field(name="Changed By", value=ctx.author.name)
-            await log_channel.send(embed=log_embed)
+        # Send to log channel
+        log_embed = discord.Embed(
+            title="Channel Name Changed",
+            description=f"Voice channel name was modified",
+            color=discord.Color.blue()
+        )
+        log_embed.add_field(name="Old Name", value=old_name)
+        log_embed.add_field(name="New Name", value=new_name)
+        log_embed.add_field(name="Changed By", value=ctx.author.name)
+        log_sink.log(ctx.guild, log_embed)
             
         await ctx.send(embed=embed)
     except discord.errors.InvalidArgument:
-        error_embed = discord.Embed(
-            title="Error",
-            description="Invalid channel name! The name must be between 1 and 100 characters.",
-            color=discord.Color.red()
-        )
+        error_embed = templates.render("error", message="Invalid channel name! The name must be between 1 and 100 characters.")
         await ctx.send(embed=error_embed)
 
 @bot.command(name='guests')
 async def manage_guests(ctx, action: str, member: discord.Member = None):
     """Manage guest list for the channel"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        error_embed = discord.Embed(
-            title="Error",
-            description="You must be in your custom voice channel!",
-            color=discord.Color.red()
-        )
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        error_embed = templates.render("error", message="You must be in or own a custom voice channel!")
         await ctx.send(embed=error_embed)
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner and ctx.author != channel_data.host:
-        error_embed = discord.Embed(
-            title="Error",
-            description="Only the channel owner or host can manage guests!",
-            color=discord.Color.red()
-        )
+    if ctx.author.id not in (channel_data.owner_id, channel_data.host_id):
+        error_embed = templates.render("error", message="Only the channel owner or host can manage guests!")
         await ctx.send(embed=error_embed)
         return
 
     try:
         if action.lower() == "add" and member:
-            channel_data.guests.add(member.id)
+            channel_data.add("guests", member.id)
+            state_store.save(channel_data)
+            audit("list_add", ctx.guild.id, channel_data.channel, ctx.author, member, list="guests")
+            await apply_overwrites(channel_data, rest)
             embed = discord.Embed(
                 title="Guest Added",
                 description=f"{member.name} has been added to the guest list",
@@ -764,21 +1218,22 @@ async def manage_guests(ctx, action: str, member: discord.Member = None):
             embed.add_field(name="Guest", value=member.name)
             embed.add_field(name="Added By", value=ctx.author.name)
             
-            # Log the action
-            log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="Guest List Updated",
-                    description=f"A new guest was added",
-                    color=discord.Color.blue()
-                )
-                log_embed.add_field(name="Channel", value=channel_data.channel.name)
-                log_embed.add_field(name="Guest Added", value=member.name)
-                log_embed.add_field(name="Added By", value=ctx.author.name)
-                await log_channel.send(embed=log_embed)
+            # Send to log channel
+            log_embed = discord.Embed(
+                title="Guest List Updated",
+                description=f"A new guest was added",
+                color=discord.Color.blue()
+            )
+            log_embed.add_field(name="Channel", value=channel_data.channel.name)
+            log_embed.add_field(name="Guest Added", value=member.name)
+            log_embed.add_field(name="Added By", value=ctx.author.name)
+            log_sink.log(ctx.guild, log_embed)
                 
         elif action.lower() == "remove" and member:
-            channel_data.guests.remove(member.id)
+            channel_data.remove("guests", member.id)
+            state_store.save(channel_data)
+            audit("list_remove", ctx.guild.id, channel_data.channel, ctx.author, member, list="guests")
+            await apply_overwrites(channel_data, rest)
             embed = discord.Embed(
                 title="Guest Removed",
                 description=f"{member.name} has been removed from the guest list",
@@ -788,73 +1243,64 @@ async def manage_guests(ctx, action: str, member: discord.Member = None):
             embed.add_field(name="Guest", value=member.name)
             embed.add_field(name="Removed By", value=ctx.author.name)
             
-            # Log the action
-            log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-            if log_channel:
-                log_embed = discord.Embed(
-                    title="Guest List Updated",
-                    description=f"A guest was removed",
-                    color=discord.Color.blue()
-                )
-                log_embed.add_field(name="Channel", value=channel_data.channel.name)
-                log_embed.add_field(name="Guest Removed", value=member.name)
-                log_embed.add_field(name="Removed By", value=ctx.author.name)
-                await log_channel.send(embed=log_embed)
-                
-        elif action.lower() == "list":
-            guest_list = [ctx.guild.get_member(guest_id).name for guest_id in channel_data.guests if ctx.guild.get_member(guest_id)]
-            embed = discord.Embed(
-                title="Guest List",
-                description=f"Current guests for {channel_data.channel.name}",
+            # Send to log channel
+            log_embed = discord.Embed(
+                title="Guest List Updated",
+                description=f"A guest was removed",
                 color=discord.Color.blue()
             )
-            embed.add_field(
-                name="Guests",
-                value="\n".join(guest_list) if guest_list else "No guests",
-                inline=False
-            )
-            embed.set_footer(text="Use !guests add/remove <user> to modify the list")
+            log_embed.add_field(name="Channel", value=channel_data.channel.name)
+            log_embed.add_field(name="Guest Removed", value=member.name)
+            log_embed.add_field(name="Removed By", value=ctx.author.name)
+            log_sink.log(ctx.guild, log_embed)
+                
+        elif action.lower() == "list":
+            guest_pages = chunked(channel_data.guests, NAMES_PER_PAGE) or [[]]
+
+            async def render_page(index):
+                names = await member_names.resolve(ctx.guild, guest_pages[index])
+                embed = discord.Embed(
+                    title="Guest List",
+                    description=f"Current guests for {channel_data.channel.name} ({len(channel_data.guests)})",
+                    color=discord.Color.blue()
+                )
+                embed.add_field(
+                    name="Guests",
+                    value="\n".join(names) if names else "No guests",
+                    inline=False
+                )
+                embed.set_footer(text="Use !guests add/remove <user> to modify the list")
+                return embed
+
+            await send_paged(ctx, render_page, len(guest_pages))
+            return
         else:
-            embed = discord.Embed(
-                title="Error",
-                description="Invalid action! Use 'add', 'remove', or 'list'",
-                color=discord.Color.red()
-            )
+            embed = templates.render("error", message="Invalid action! Use 'add', 'remove', or 'list'")
             
         await ctx.send(embed=embed)
     except Exception as e:
-        error_embed = discord.Embed(
-            title="Error",
-            description=str(e),
-            color=discord.Color.red()
-        )
+        error_embed = templates.render("error", message=str(e))
         await ctx.send(embed=error_embed)
 
 @bot.command(name='host')
 async def set_host(ctx, member: discord.Member):
     """Set a temporary host for the channel"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        error_embed = discord.Embed(
-            title="Error",
-            description="You must be in your custom voice channel!",
-            color=discord.Color.red()
-        )
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        error_embed = templates.render("error", message="You must be in or own a custom voice channel!")
         await ctx.send(embed=error_embed)
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
-        error_embed = discord.Embed(
-            title="Error",
-            description="Only the channel owner can set a host!",
-            color=discord.Color.red()
-        )
+    if ctx.author.id != channel_data.owner_id:
+        error_embed = templates.render("error", message="Only the channel owner can set a host!")
         await ctx.send(embed=error_embed)
         return
     
     try:
-        old_host = channel_data.host
-        channel_data.host = member
+        old_host = member_name(ctx.guild, channel_data.host_id)
+        previous_host_id = channel_data.host_id
+        voice_channels.set_host(channel_data, member.id)
+        state_store.save(channel_data)
+        audit("host", ctx.guild.id, channel_data.channel, ctx.author, member, previous_id=previous_host_id)
         
         # Create success embed
         embed = discord.Embed(
@@ -864,475 +1310,618 @@ async def set_host(ctx, member: discord.Member):
         )
         embed.add_field(name="Channel", value=channel_data.channel.name)
         embed.add_field(name="New Host", value=member.name)
-        embed.add_field(name="Previous Host", value=old_host.name)
+        embed.add_field(name="Previous Host", value=old_host)
         
-        # Send to log channel if exists
-        log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-        if log_channel:
-            log_embed = discord.Embed(
-                title="Channel Host Changed",
-                description=f"Voice channel host was modified",
-                color=discord.Color.blue()
-            )
-            log_embed.add_field(name="Channel", value=channel_data.channel.name)
-            log_embed.add_field(name="Old Host", value=old_host.name)
-            log_embed.add_field(name="New Host", value=member.name)
-            log_embed.add_field(name="Changed By", value=ctx.author.name)
-            await log_channel.send(embed=log_embed)
+        # Send to log channel
+        log_embed = discord.Embed(
+            title="Channel Host Changed",
+            description=f"Voice channel host was modified",
+            color=discord.Color.blue()
+        )
+        log_embed.add_field(name="Channel", value=channel_data.channel.name)
+        log_embed.add_field(name="Old Host", value=old_host)
+        log_embed.add_field(name="New Host", value=member.name)
+        log_embed.add_field(name="Changed By", value=ctx.author.name)
+        log_sink.log(ctx.guild, log_embed)
             
         await ctx.send(embed=embed)
     except Exception as e:
-        error_embed = discord.Embed(
-            title="Error",
-            description=f"Failed to set host: {str(e)}",
-            color=discord.Color.red()
-        )
+        error_embed = templates.render("error", message=f"Failed to set host: {str(e)}")
         await ctx.send(embed=error_embed)
 
 @bot.command(name='view')
 async def view_channel(ctx):
     """View channel settings and information"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        error_embed = discord.Embed(
-            title="❌ Error",
-            description="You must be in a custom voice channel!",
-            color=discord.Color.red()
-        )
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        error_embed = templates.render("panel_error", message="You must be in or own a custom voice channel!")
         await ctx.send(embed=error_embed)
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
     channel = channel_data.channel
     
-    # Create detailed embed
-    view = discord.Embed(
-        title=f"🎮 Channel View: {channel.name}",
-        description="Detailed view of channel settings and status",
-        color=discord.Color.blue()
-    )
-    
-    # Basic Information
-    view.add_field(
-        name="📊 Basic Info",
-        value=f"**👑 Owner:** {channel_data.owner.name}\n"
-              f"**🎯 Current Host:** {channel_data.host.name}\n"
-              f"**🔒 Privacy:** {'Private 🔐' if channel_data.is_private else 'Public 🔓'}\n"
-              f"**👥 User Limit:** {channel.user_limit or '∞ Unlimited'}\n"
-              f"**🎵 Bitrate:** {channel.bitrate//1000}kbps",
-        inline=False
-    )
-    
-    # Current Members
-    current_members = "\n".join([f"• {member.name}" for member in channel.members]) or "None"
-    view.add_field(
-        name=f"👥 Current Members ({len(channel.members)})",
-        value=current_members,
-        inline=False
-    )
-    
-    # Guest List
-    if channel_data.guests:
-        guests = "\n".join([f"• {ctx.guild.get_member(guest_id).name}" for guest_id in channel_data.guests if ctx.guild.get_member(guest_id)]) or "None"
-        view.add_field(
-            name=f"✨ Guest List ({len(channel_data.guests)})",
-            value=guests,
-            inline=False
-        )
-    
-    # Whitelist/Blacklist
-    if channel_data.whitelist:
-        whitelist = "\n".join([f"• {ctx.guild.get_member(user_id).name}" for user_id in channel_data.whitelist if ctx.guild.get_member(user_id)]) or "None"
-        view.add_field(
-            name=f"✅ Whitelist ({len(channel_data.whitelist)})",
-            value=whitelist,
-            inline=True
-        )
-    
-    if channel_data.blacklist:
-        blacklist = "\n".join([f"• {ctx.guild.get_member(user_id).name}" for user_id in channel_data.blacklist if ctx.guild.get_member(user_id)]) or "None"
-        view.add_field(
-            name=f"❌ Blacklist ({len(channel_data.blacklist)})",
-            value=blacklist,
-            inline=True
-        )
-    
-    view.set_footer(text="💡 Use !commands to see available management commands")
-    
-    # Send to log channel if exists
-    log_channel = discord.utils.get(ctx.guild.text_channels, name="voice-logs")
-    if log_channel:
-        log_embed = discord.Embed(
-            title="👁️ Channel Info Viewed",
-            description=f"Channel information was requested",
+    # Page 1 is the overview, then NAMES_PER_PAGE names per page of each list
+    sections = [
+        ("👥 Current Members", [member.id for member in channel.members]),
+        ("✨ Guest List", channel_data.guests),
+        ("✅ Whitelist", channel_data.whitelist),
+        ("❌ Blacklist", channel_data.blacklist),
+    ]
+    pages = [None]
+    for title, user_ids in sections:
+        parts = chunked(user_ids, NAMES_PER_PAGE)
+        for part, chunk in enumerate(parts):
+            pages.append((title, len(user_ids), part, len(parts), chunk))
+
+    async def render_page(index):
+        view = discord.Embed(
+            title=f"🎮 Channel View: {channel.name}",
+            description="Detailed view of channel settings and status",
             color=discord.Color.blue()
         )
-        log_embed.add_field(name="Channel", value=channel.name)
-        log_embed.add_field(name="Viewed By", value=ctx.author.name)
-        await log_channel.send(embed=log_embed)
+        if pages[index] is None:
+            # Basic Information
+            owner, host = await member_names.resolve(ctx.guild, [channel_data.owner_id, channel_data.host_id])
+            view.add_field(
+                name="📊 Basic Info",
+                value=f"**👑 Owner:** {owner}\n"
+                      f"**🎯 Current Host:** {host}\n"
+                      f"**🔒 Privacy:** {'Private 🔐' if channel_data.is_private else 'Public 🔓'}\n"
+                      f"**👥 User Limit:** {channel.user_limit or '∞ Unlimited'}\n"
+                      f"**🎵 Bitrate:** {channel.bitrate//1000}kbps",
+                inline=False
+            )
+            view.add_field(
+                name="📋 Lists",
+                value="\n".join(f"**{title}:** {len(user_ids)}" for title, user_ids in sections),
+                inline=False
+            )
+        else:
+            title, total, part, parts, chunk = pages[index]
+            names = await member_names.resolve(ctx.guild, chunk)
+            view.add_field(
+                name=f"{title} ({total})" + (f" • part {part + 1}/{parts}" if parts > 1 else ""),
+                value="\n".join(f"• {name}" for name in names),
+                inline=False
+            )
+        view.set_footer(text="💡 Use !commands to see available management commands")
+        return view
+    
+    # Send to log channel
+    log_embed = discord.Embed(
+        title="👁️ Channel Info Viewed",
+        description=f"Channel information was requested",
+        color=discord.Color.blue()
+    )
+    log_embed.add_field(name="Channel", value=channel.name)
+    log_embed.add_field(name="Viewed By", value=ctx.author.name)
+    log_sink.log(ctx.guild, log_embed)
     
-    await ctx.send(embed=view)
+    await send_paged(ctx, render_page, len(pages))
 
 @bot.command(name='changehost')
 async def change_host(ctx, member: discord.Member):
     """Change the channel host"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        await ctx.send("You must be in your custom voice channel!")
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        await ctx.send("You must be in or own a custom voice channel!")
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
+    if ctx.author.id != channel_data.owner_id:
         await ctx.send("Only the channel owner can change the host!")
         return
         
-    channel_data.host = member
+    previous_host_id = channel_data.host_id
+    voice_channels.set_host(channel_data, member.id)
+    state_store.save(channel_data)
+    audit("host", ctx.guild.id, channel_data.channel, ctx.author, member, previous_id=previous_host_id)
     await ctx.send(f"{member.name} is now the channel host!")
 
 @bot.command(name='mute')
 async def mute_user(ctx, member: discord.Member):
     """Mute a user in the channel"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        await ctx.send("You must be in your custom voice channel!")
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        await ctx.send("You must be in or own a custom voice channel!")
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner and ctx.author != channel_data.host:
+    if ctx.author.id not in (channel_data.owner_id, channel_data.host_id):
         await ctx.send("Only the channel owner or host can mute users!")
         return
         
-    await member.edit(mute=True)
+    await rest.edit_member(member, mute=True)
     await ctx.send(f"{member.name} has been muted!")
 
 @bot.command(name='unmute')
 async def unmute_user(ctx, member: discord.Member):
     """Unmute a user in the channel"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        await ctx.send("You must be in your custom voice channel!")
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        await ctx.send("You must be in or own a custom voice channel!")
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner and ctx.author != channel_data.host:
+    if ctx.author.id not in (channel_data.owner_id, channel_data.host_id):
         await ctx.send("Only the channel owner or host can unmute users!")
         return
         
-    await member.edit(mute=False)
+    await rest.edit_member(member, mute=False)
     await ctx.send(f"{member.name} has been unmuted!")
 
 @bot.command(name='ban')
 async def ban_user(ctx, member: discord.Member):
     """Ban a user from the channel"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        await ctx.send("You must be in your custom voice channel!")
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        await ctx.send("You must be in or own a custom voice channel!")
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
+    if ctx.author.id != channel_data.owner_id:
         await ctx.send("Only the channel owner can ban users!")
         return
         
-    await channel_data.channel.set_permissions(member, connect=False)
-    if member.voice and member.voice.channel == channel_data.channel:
-        await member.move_to(None)
+    channel_data.add("blacklist", member.id)
+    state_store.save(channel_data)
+    audit("list_add", ctx.guild.id, channel_data.channel, ctx.author, member, list="blacklist")
+    await apply_overwrites(channel_data, rest)
+    if member.voice and member.voice.channel.id == channel_data.channel_id:
+        await rest.move(member, None, PRIORITY_PERMISSIONS)
     await ctx.send(f"{member.name} has been banned from the channel!")
 
 @bot.command(name='unban')
 async def unban_user(ctx, member: discord.Member):
     """Unban a user from the channel"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        await ctx.send("You must be in your custom voice channel!")
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        await ctx.send("You must be in or own a custom voice channel!")
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
+    if ctx.author.id != channel_data.owner_id:
         await ctx.send("Only the channel owner can unban users!")
         return
         
-    await channel_data.channel.set_permissions(member, connect=True)
+    channel_data.discard("blacklist", member.id)
+    state_store.save(channel_data)
+    audit("list_remove", ctx.guild.id, channel_data.channel, ctx.author, member, list="blacklist")
+    await apply_overwrites(channel_data, rest)
     await ctx.send(f"{member.name} has been unbanned from the channel!")
 
 @bot.command(name='reset')
 async def reset_channel(ctx):
     """Reset channel settings to default"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        await ctx.send("You must be in your custom voice channel!")
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        await ctx.send("You must be in or own a custom voice channel!")
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
+    if ctx.author.id != channel_data.owner_id:
         await ctx.send("Only the channel owner can reset the channel!")
         return
         
     # Reset channel settings
     channel_data.is_private = False
-    channel_data.guests.clear()
-    channel_data.blacklist.clear()
-    channel_data.whitelist.clear()
-    channel_data.host = channel_data.owner
+    channel_data.clear_lists()
+    voice_channels.set_host(channel_data, channel_data.owner_id)
+    state_store.save(channel_data)
+    audit("reset", ctx.guild.id, channel_data.channel, ctx.author)
     
-    # Reset channel permissions
-    await channel_data.channel.edit(
+    # Reset channel settings and user-specific permissions in one request
+    await apply_overwrites(
+        channel_data,
+        rest,
         name=f"{ctx.author.name}'s Channel",
         user_limit=None,
         bitrate=64000
     )
-    
-    # Reset all user-specific permissions
-    for overwrite in channel_data.channel.overwrites:
-        if isinstance(overwrite, discord.Member) and overwrite != ctx.author:
-            await channel_data.channel.set_permissions(overwrite, overwrite=None)
             
     await ctx.send("Channel has been reset to default settings!")
 
 @bot.command(name='transfer')
 async def transfer_ownership(ctx, new_owner: discord.Member):
     """Transfer channel ownership to another user"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        await ctx.send("You must be in your custom voice channel!")
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        await ctx.send("You must be in or own a custom voice channel!")
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
+    if ctx.author.id != channel_data.owner_id:
         await ctx.send("Only the channel owner can transfer ownership!")
         return
-        
-    # Update permissions
-    await channel_data.channel.set_permissions(ctx.author, connect=True)
-    await channel_data.channel.set_permissions(new_owner, connect=True, manage_channels=True)
+    # One channel per owner: the owner and host indexes hold a single channel per member
+    hosted = voice_channels.hosted_by(ctx.guild.id, new_owner.id)
+    if owned_channel(ctx.guild.id, new_owner.id) is not None or (hosted is not None and hosted is not channel_data):
+        await ctx.send(f"{new_owner.name} already has a custom voice channel!")
+        return
+
+    # Update channel data (the previous owner keeps access)
+    voice_channels.set_owner(channel_data, new_owner.id)
+    voice_channels.set_host(channel_data, new_owner.id)
+    channel_data.add("whitelist", ctx.author.id)
+    state_store.save(channel_data)
+    audit("owner", ctx.guild.id, channel_data.channel, ctx.author, new_owner, previous_id=ctx.author.id)
     
-    # Update channel data
-    channel_data.owner = new_owner
-    channel_data.host = new_owner
+    # Update permissions
+    await apply_overwrites(channel_data, rest)
     
     await ctx.send(f"Channel ownership has been transferred to {new_owner.name}!")
 
 @bot.command(name='bitrate')
 async def set_bitrate(ctx, bitrate: int):
     """Set the channel bitrate (in kbps)"""
-    if not ctx.author.voice or ctx.author.voice.channel.id not in voice_channels:
-        await ctx.send("You must be in your custom voice channel!")
+    channel_data = resolve_channel(ctx)
+    if channel_data is None:
+        await ctx.send("You must be in or own a custom voice channel!")
         return
-        
-    channel_data = voice_channels[ctx.author.voice.channel.id]
-    if ctx.author != channel_data.owner:
+    if ctx.author.id != channel_data.owner_id:
         await ctx.send("Only the channel owner can change the bitrate!")
         return
         
     try:
         # Convert kbps to bps
-        await channel_data.channel.edit(bitrate=bitrate * 1000)
+        await rest.edit_channel(channel_data.channel, bitrate=bitrate * 1000)
         await ctx.send(f"Channel bitrate set to {bitrate}kbps!")
     except discord.errors.InvalidArgument:
         await ctx.send("Invalid bitrate! Must be between 8 and 96 kbps for most servers.")
 
 
-@bot.command(name='helpvc')
-async def help_command(ctx):
-    """Show help information"""
-    help_channel_id = os.getenv('HELP_CHANNEL_ID')
-    if not help_channel_id:
-        error_embed = discord.Embed(
-            title="❌ Error",
-            description="Help channel not configured. Please contact an administrator.",
-            color=discord.Color.red()
-        )
+LOG_RESULTS = 200
+
+def describe_audit_event(entry):
+    """One !logs line for an audit event, using the names recorded with it"""
+    line = f"<t:{int(entry['ts'])}:f> **{entry['event']}**"
+    if entry.get("actor_name"):
+        line += f" by {entry['actor_name']}"
+    if entry.get("target_name"):
+        line += f" → {entry['target_name']}"
+    if entry.get("list"):
+        line += f" ({entry['list']})"
+    if entry.get("previous_name"):
+        line += f" from \"{entry['previous_name']}\""
+    if entry.get("channel_name"):
+        line += f" in {entry['channel_name']}"
+    return line
+
+@bot.command(name='logs')
+@commands.has_guild_permissions(manage_channels=True)
+async def search_logs(ctx, *args):
+    """Search this server's audit history (moderators)"""
+    if audit_index is None:
+        error_embed = templates.render("error", message="The audit log is turned off on this bot.")
+        await ctx.send(embed=error_embed)
+        return
+    try:
+        query = parse_query(args, time.time())
+    except ValueError as e:
+        error_embed = templates.render("error", message=str(e))
         await ctx.send(embed=error_embed)
         return
 
+    # SQLite blocks, so the lookup runs off the event loop
     try:
-        help_channel = await bot.fetch_channel(int(help_channel_id))
-        
-        # Create help embed
+        results = await asyncio.to_thread(audit_index.search, ctx.guild.id, limit=LOG_RESULTS, **query)
+    except Exception as e:
+        error_embed = templates.render("error", message=f"Failed to search the audit log: {str(e)}")
+        await ctx.send(embed=error_embed)
+        return
+
+    pages = chunked([describe_audit_event(entry) for entry in results], NAMES_PER_PAGE) or [[]]
+
+    async def render_page(index):
         embed = discord.Embed(
-            title="🎮 Voice Channel Help",
-            description=(
-                "Welcome to Anti Stress Voice Channels! Here's your quick guide to "
-                "essential features and commands."
-            ),
+            title="📜 Audit Log",
+            description=clip_lines(pages[index], 4096) if pages[index] else "No matching events.",
             color=discord.Color.blue()
         )
-        
-        # Core Commands
-        embed.add_field(
-            name="📋 Basic Commands",
-            value=(
-                "• `!create <name> [size]` Create a channel\n"
-                "• `!name <new_name>` Rename channel\n"
-                "• `!size <number>` Set member limit\n"
-                "• `!privacy` Toggle private mode\n"
-                "• `!info` View channel details"
-            ),
-            inline=False
-        )
-        
-        # Management
+        more = "+" if len(results) == LOG_RESULTS else ""
+        embed.set_footer(text=f"{len(results)}{more} events, newest first")
+        return embed
+
+    await send_paged(ctx, render_page, len(pages))
+
+def format_duration(seconds):
+    """Short human duration like 4m 10s or 2h 5m"""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m {seconds}s" if minutes else f"{seconds}s"
+
+@bot.command(name='stats')
+@commands.has_guild_permissions(manage_channels=True)
+async def channel_stats(ctx, *args):
+    """Channel activity over a rolling window (moderators; `all` covers every server for the owner)"""
+    window = next((arg for arg in args if arg in WINDOWS), next(iter(WINDOWS)))
+    guild_id = ctx.guild.id
+    if "all" in args:
+        if not await bot.is_owner(ctx.author):
+            error_embed = templates.render("error", message="Only the bot owner can see every server's stats.")
+            await ctx.send(embed=error_embed)
+            return
+        guild_id = None
+    report = analytics.report(guild_id, window)
+    channels, members = voice_channels.occupancy(guild_id)
+
+    embed = discord.Embed(
+        title=f"📈 Channel Stats • last {window}",
+        description="Every server on this bot" if guild_id is None else f"Activity in {ctx.guild.name}",
+        color=discord.Color.blue()
+    )
+    lifetime = report["average_lifetime"]
+    embed.add_field(
+        name="🎮 Channels",
+        value=(
+            f"Created: {report['created']} ({report['created_per_minute']:.2f}/min)\n"
+            f"Deleted: {report['deleted']}\n"
+            f"Average lifetime: {format_duration(lifetime) if lifetime is not None else 'n/a'}"
+        ),
+        inline=False
+    )
+    embed.add_field(
+        name="👥 Occupancy",
+        value=(
+            f"Channels now: {channels} • peak {report['peak_channels']}\n"
+            f"Members now: {members} • peak {report['peak_members']}"
+        ),
+        inline=False
+    )
+    if report["presets"]:
         embed.add_field(
-            name="⚙️ Management",
-            value=(
-                "• `!whitelist <user>` Allow specific users\n"
-                "• `!blacklist <user>` Block specific users\n"
-                "• `!guests add/remove <user>` Manage guests\n"
-                "• `!host <user>` Set temporary host\n"
-                "• `!transfer <user>` Transfer ownership"
-            ),
-            inline=False
+            name="📏 Sizes",
+            value=clip_lines([f"{preset}: {count}" for preset, count in report["presets"]]),
+            inline=True
         )
-        
-        # Quick Tips
+    if report["hosts"]:
+        host_ids = [owner_id for owner_id, _ in report["hosts"]]
+        names = await member_names.resolve(ctx.guild, host_ids) if guild_id is not None else [f"<@{i}>" for i in host_ids]
         embed.add_field(
-            name="💡 Quick Tips",
-            value=(
-                "• Use quick-create buttons below info panel\n"
-                "• Private channels are invite-only\n"
-                "• Temporary hosts can manage users\n"
-                "• Channels auto-delete when empty\n"
-                "• Type `!commands` for full command list"
-            ),
-            inline=False
+            name="👑 Top Hosts",
+            value=clip_lines([f"{name}: {count}" for name, (_, count) in zip(names, report["hosts"])]),
+            inline=True
         )
+    embed.set_footer(text=f"!stats {' / '.join(WINDOWS)}")
+    await ctx.send(embed=embed)
+
+@bot.command(name='helpvc')
+async def help_command(ctx):
+    """Show help information"""
+    config = guild_configs.get(ctx.guild.id) if ctx.guild else None
+    help_channel_id = config.help_channel_id if config else None
+    if not help_channel_id:
+        error_embed = templates.render("panel_error", message="Help channel not configured. Please contact an administrator.")
+        await ctx.send(embed=error_embed)
+        return
+
+    try:
+        help_channel = await bot.fetch_channel(help_channel_id)
         
-        embed.set_footer(text="Anti Stress Voice Channels • Type !helpvc for quick help or !commands for detailed list")
+        embed = templates.render("quick_help")
 
         # Send new help embed
-        await help_channel.send(embed=embed)
+        await rest.send(help_channel, embed=embed)
         
         # Send confirmation to user
-        confirm_embed = discord.Embed(
-            title="✅ Help Updated",
-            description=f"Help information has been posted in <#{help_channel_id}>",
-            color=discord.Color.green()
-        )
+        confirm_embed = templates.render("help_updated", what="Help information", channel_id=help_channel_id)
         await ctx.send(embed=confirm_embed)
         
     except Exception as e:
-        error_embed = discord.Embed(
-            title="❌ Error",
-            description=f"Failed to update help channel: {str(e)}",
-            color=discord.Color.red()
-        )
+        error_embed = templates.render("panel_error", message=f"Failed to update help channel: {str(e)}")
         await ctx.send(embed=error_embed)
 
 @bot.command(name='commands')
 async def show_commands(ctx):
     """Display available commands"""
-    help_channel_id = os.getenv('HELP_CHANNEL_ID')
+    config = guild_configs.get(ctx.guild.id) if ctx.guild else None
+    help_channel_id = config.help_channel_id if config else None
     if not help_channel_id:
-        error_embed = discord.Embed(
-            title="❌ Error",
-            description="Help channel not configured. Please contact an administrator.",
-            color=discord.Color.red()
-        )
+        error_embed = templates.render("panel_error", message="Help channel not configured. Please contact an administrator.")
         await ctx.send(embed=error_embed)
         return
 
     try:
-        help_channel = await bot.fetch_channel(int(help_channel_id))
+        help_channel = await bot.fetch_channel(help_channel_id)
         
-        help_embed = discord.Embed(
-            title="🎮 Anti Stress Voice Commands",
-            description=(
-                "Welcome to Anti Stress Voice Channels! Here's your complete guide to all "
-                "available commands and features. Commands are organized by category for easy reference."
-            ),
-            color=discord.Color.blue()
-        )
+        help_embed = templates.render("commands")
 
-        # Core Channel Management
-        help_embed.add_field(
-            name="🎯 Core Commands",
-            value=(
-                "• `!create <name> [size]` Create your own channel\n"
-                "• `!info` View channel features and options\n"
-                "• `!view` See detailed channel information"
-            ),
-            inline=False
-        )
+        # Clear existing messages in help channel
+        # async for message in help_channel.history(limit=100):
+        #     await message.delete()
 
-        # Channel Settings
-        help_embed.add_field(
-            name="⚙️ Channel Settings",
-            value=(
-                "• `!name <new_name>` Rename your channel\n"
-                "• `!size <limit>` Set member limit (0 for unlimited)\n"
-                "• `!bitrate <value>` Adjust audio quality (8-96 kbps)\n"
-                "• `!reset` Restore default settings"
-            ),
-            inline=False
-        )
+        # Send new help embed
+        await rest.send(help_channel, embed=help_embed)
+        
+        # Send confirmation to user
+        confirm_embed = templates.render("help_updated", what="Command list", channel_id=help_channel_id)
+        await ctx.send(embed=confirm_embed)
+        
+    except Exception as e:
+        error_embed = templates.render("panel_error", message=f"Failed to update help channel: {str(e)}")
+        await ctx.send(embed=error_embed)
 
-        # Privacy & Security
-        help_embed.add_field(
-            name="🔒 Privacy & Security",
-            value=(
-                "• `!privacy` Toggle private/public mode\n"
-                "• `!whitelist <user>` Allow specific users\n"
-                "• `!blacklist <user>` Block specific users\n"
-                "• `!unban <user>` Remove user from blacklist"
-            ),
-            inline=False
-        )
+@bot.command(name='perf')
+@commands.is_owner()
+async def perf_report(ctx, mode: str = None, setting: str = None):
+    """Show handler latency percentiles, or control the sampling profiler"""
+    if mode == "sample":
+        if setting == "on":
+            sampler.start()
+            await ctx.send(f"Sampling profiler on (every {sampler.interval * 1000:.0f}ms).")
+        elif setting == "off":
+            sampler.stop()
+            await ctx.send("Sampling profiler off.")
+        elif setting == "reset":
+            sampler.reset()
+            await ctx.send("Sampling profiler data cleared.")
+        else:
+            embed = discord.Embed(
+                title="🔬 Sampled Stacks",
+                description=(
+                    f"{'Running' if sampler.running else 'Stopped'} • "
+                    f"{sampler.samples} samples, {sampler.idle} idle"
+                ),
+                color=discord.Color.blue()
+            )
+            busy = max(1, sampler.samples - sampler.idle)
+            for stack, hits in sampler.top(5):
+                embed.add_field(name=f"{hits / busy:.0%} of busy samples", value=f"`{stack[:1000]}`", inline=False)
+            await ctx.send(embed=embed)
+        return
 
-        # User Management
-        help_embed.add_field(
-            name="👥 User Management",
+    embed = discord.Embed(
+        title="⏱️ Handler Performance",
+        description="Wall time per handler (ms) over the recent invocations",
+        color=discord.Color.blue()
+    )
+    for row in profiler.report()[:10]:
+        embed.add_field(
+            name=f"{row['handler']} ({row['count']})",
             value=(
-                "• `!guests add <user>` Add to guest list\n"
-                "• `!guests remove <user>` Remove from guest list\n"
-                "• `!guests list` View current guests\n"
-                "• `!mute <user>` Mute a user\n"
-                "• `!unmute <user>` Unmute a user"
+                f"p50 {row['p50'] * 1000:.1f} • p95 {row['p95'] * 1000:.1f} • p99 {row['p99'] * 1000:.1f}\n"
+                f"await p95 {row['await_p95'] * 1000:.1f} • busy p95 {row['busy_p95'] * 1000:.1f} • "
+                f"REST {row['rest_avg']:.1f}/call"
             ),
             inline=False
         )
-
-        # Administrative
-        help_embed.add_field(
-            name="👑 Administrative",
-            value=(
-                "• `!transfer <user>` Transfer channel ownership\n"
-                "• `!host <user>` Set temporary host\n"
-                "• `!changehost <user>` Change current host"
+    slowest = profiler.slowest(5)
+    if slowest:
+        embed.add_field(
+            name="🐢 Slowest Recent",
+            value="\n".join(
+                f"<t:{int(i.started_at)}:T> {i.handler} {i.wall * 1000:.0f}ms "
+                f"(await {i.awaiting * 1000:.0f}ms, {i.rest_calls} REST)"
+                for i in slowest
             ),
             inline=False
         )
+    embed.set_footer(text=f"Sampling profiler {'on' if sampler.running else 'off'} • !perf sample on/off/reset")
+    await ctx.send(embed=embed)
 
-        # Pro Tips
-        help_embed.add_field(
-            name="💡 Pro Tips",
-            value=(
-                "• Use quick-create buttons below info panel\n"
-                "• Private channels are invite-only\n"
-                "• Channels auto-delete when empty\n"
-                "• Owners can set temporary hosts\n"
-                "• Staff can access any channel if needed"
-            ),
-            inline=False
-        )
+@cluster_bus.handler("stats")
+async def cluster_stats():
+    """This worker's numbers for !cluster"""
+    return {
+        "shards": SHARD_IDS,
+        "guilds": len(bot.guilds),
+        "members": sum(guild.member_count or 0 for guild in bot.guilds),
+        "managed_channels": len(voice_channels),
+        "latency": None if bot.latency != bot.latency else bot.latency,
+        "rest_queued": sum(rest.queue_depth().values()),
+        "voice_actors": len(voice_actors.actors),
+    }
 
-        help_embed.set_footer(
-            text="Anti Stress Voice Channels • Type !helpvc for quick help or !commands for detailed list"
-        )
+@cluster_bus.handler("owned_channels")
+async def cluster_owned_channels(user_id):
+    """Managed channels owned by a user in this worker's guilds"""
+    owned = (voice_channels.owned_by(guild_id, user_id) for guild_id in voice_channels.guilds)
+    return [
+        {"guild_id": channel_data.guild_id, "channel_id": channel_data.channel_id}
+        for channel_data in owned if channel_data is not None
+    ]
 
-        # Clear existing messages in help channel
-        # async for message in help_channel.history(limit=100):
-        #     await message.delete()
+@bot.command(name='cluster')
+@commands.is_owner()
+async def cluster_report(ctx, action: str = None, target: int = None):
+    """Show cluster workers, find a member's channels on every shard, or restart a worker"""
+    if not cluster_bus.enabled:
+        await ctx.send("The bot is not running in cluster mode.")
+        return
+    try:
+        if action == "restart" and target is not None:
+            result = (await cluster_bus.call("restart", "supervisor", worker=target))[0]
+            if result.get("value"):
+                await ctx.send(f"Restarting worker {target}.")
+            else:
+                await ctx.send(f"Worker {target} is not running.")
+            return
 
-        # Send new help embed
-        await help_channel.send(embed=help_embed)
-        
-        # Send confirmation to user
-        confirm_embed = discord.Embed(
-            title="✅ Help Updated",
-            description=f"Command list has been posted in <#{help_channel_id}>",
-            color=discord.Color.green()
-        )
-        await ctx.send(embed=confirm_embed)
-        
-    except Exception as e:
-        error_embed = discord.Embed(
-            title="❌ Error",
-            description=f"Failed to update help channel: {str(e)}",
-            color=discord.Color.red()
+        if action == "find" and target is not None:
+            results = await cluster_bus.call("owned_channels", user_id=target)
+            lines = [
+                f"<#{channel['channel_id']}> (guild {channel['guild_id']}, worker {result['worker']})"
+                for result in results
+                for channel in result.get("value") or ()
+            ]
+            embed = discord.Embed(
+                title="🔎 Owned Channels",
+                description=clip_lines(lines, 4096) if lines else f"<@{target}> owns no channels",
+                color=discord.Color.blue()
+            )
+            await ctx.send(embed=embed)
+            return
+
+        workers = (await cluster_bus.call("workers", "supervisor"))[0].get("value") or []
+        stats = {result["worker"]: result for result in await cluster_bus.call("stats")}
+    except (ConnectionError, asyncio.TimeoutError) as e:
+        error_embed = templates.render("error", message=f"Cluster bus unavailable: {str(e)}")
+        await ctx.send(embed=error_embed)
+        return
+
+    embed = discord.Embed(title="🧩 Cluster", color=discord.Color.blue())
+    for worker in workers:
+        result = stats.get(worker["worker"], {})
+        if "value" in result:
+            numbers = result["value"]
+            latency = "?" if numbers["latency"] is None else f"{numbers['latency'] * 1000:.0f}ms"
+            value = (
+                f"Guilds: {numbers['guilds']} • Members: {numbers['members']}\n"
+                f"Channels: {numbers['managed_channels']} • Gateway: {latency}\n"
+                f"REST queued: {numbers['rest_queued']} • Actors: {numbers['voice_actors']}"
+            )
+        else:
+            value = f"Not answering ({result.get('error', 'not connected')})"
+        shards = worker["shards"]
+        embed.add_field(
+            name=f"Worker {worker['worker']} • shards {shards[0]}-{shards[-1]} • restarts {worker['restarts']}",
+            value=value,
+            inline=False
         )
+    embed.set_footer(text="!cluster find <user id> • !cluster restart <worker>")
+    await ctx.send(embed=embed)
+
+@cluster_bus.handler("reload_config")
+async def reload_guild_configs():
+    """Re-read the guild settings and apply them to the guilds this process serves"""
+    added, changed, removed = guild_configs.reload()
+    for guild_id in removed:
+        forget_guild(guild_id)
+    for guild_id in added | changed:
+        guild = bot.get_guild(guild_id)
+        if guild is not None:
+            synced_panels.discard(guild_id)
+            await setup_guild(guild)
+    return {"added": len(added), "changed": len(changed), "removed": len(removed)}
+
+@bot.command(name='reloadconfig')
+@commands.is_owner()
+async def reload_config(ctx):
+    """Reload the per-guild settings file without restarting"""
+    try:
+        if cluster_bus.enabled:
+            # Every worker reloads its own copy
+            results = await cluster_bus.call("reload_config")
+        else:
+            results = [{"worker": WORKER_ID, "value": await reload_guild_configs()}]
+    except (OSError, ValueError, ConnectionError, asyncio.TimeoutError) as e:
+        error_embed = templates.render("error", message=f"Could not reload the guild settings: {str(e)}")
         await ctx.send(embed=error_embed)
+        return
+
+    embed = discord.Embed(title="🔄 Guild Settings Reloaded", color=discord.Color.green())
+    for result in results:
+        if "value" in result:
+            counts = result["value"]
+            value = f"Added: {counts['added']} • Changed: {counts['changed']} • Removed: {counts['removed']}"
+        else:
+            embed.color = discord.Color.red()
+            value = f"Failed: {result['error']}"
+        embed.add_field(name=f"Worker {result['worker']}", value=value, inline=False)
+    await ctx.send(embed=embed)
+
+# Time every command for !perf
+profiler.wrap_commands(bot)
+
+def stop_on_sigterm(signum, frame):
+    # The cluster supervisor stops workers with SIGTERM; shut down like Ctrl+C
+    raise KeyboardInterrupt
+
+if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, stop_on_sigterm)
+
+    # Run the bot
+    bot.run(os.getenv('DISCORD_TOKEN'))
 
-# Run the bot
-bot.run(os.getenv('DISCORD_TOKEN'))
+    # Write any state changes and audit events that are still queued
+    state_store.close()
+    audit_log.close()
+    if audit_index is not None:
+        audit_index.close()
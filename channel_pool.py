@@ -0,0 +1,190 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+import discord
+
+from rest_scheduler import PRIORITY_BACKGROUND, PRIORITY_USER
+
+SPARE_CHANNEL_NAME = "⏳ spare"
+
+
+class _CategoryPool:
+    def __init__(self, guild_id, category_id):
+        self.guild_id = guild_id
+        self.category_id = category_id
+        self.spares = deque()  # hidden spare channel IDs
+        self.joins = deque()  # monotonic times of recent trigger joins
+        self.deficits = deque()  # monotonic times spares were claimed, oldest first
+
+
+class SpareChannelPool:
+    """Keeps hidden spare voice channels ready for Join-to-Create
+
+    A trigger join claims a spare with a single edit (name, overwrites and
+    visibility) instead of waiting on create_voice_channel. The pool per
+    category grows with the recent join rate, between base_size and
+    max_size, and is refilled by one background task.
+    """
+
+    def __init__(self, bot, scheduler, base_size=0, max_size=0, rate_window=300.0, refill_horizon=30.0):
+        self.bot = bot
+        self.scheduler = scheduler
+        self.base_size = base_size
+        self.max_size = max_size
+        self.rate_window = rate_window
+        self.refill_horizon = refill_horizon
+        self.pools = {}  # (guild_id, category_id) -> _CategoryPool
+        self.claims = 0
+        self.misses = 0
+        self.claim_latency = deque(maxlen=256)  # seconds
+        self.refill_lag = deque(maxlen=256)  # seconds
+        # Optional hook called as observer(kind, seconds) for "claim" latency and "refill" lag
+        self.observer = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def start(self):
+        """Start the background refill task (safe to call on every reconnect)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def track(self, category):
+        """Keep a pool for a trigger category, adopting spares left from a previous run"""
+        if category is None or not self.enabled:
+            return None
+        key = (category.guild.id, category.id)
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = _CategoryPool(category.guild.id, category.id)
+            for channel in category.voice_channels:
+                if channel.name == SPARE_CHANNEL_NAME and not channel.members:
+                    pool.spares.append(channel.id)
+            self._wakeup.set()
+        return pool
+
+    def target_size(self, pool):
+        """Pool size for the recent join rate"""
+        now = time.monotonic()
+        while pool.joins and now - pool.joins[0] > self.rate_window:
+            pool.joins.popleft()
+        rate = len(pool.joins) / self.rate_window
+        wanted = math.ceil(rate * self.refill_horizon)
+        return max(self.base_size, min(self.max_size, wanted))
+
+    async def claim(self, guild, category, name):
+        """Turn a spare into a visible channel; None if no spare is ready"""
+        pool = self.track(category)
+        if pool is None:
+            return None
+        started = time.monotonic()
+        pool.joins.append(started)
+        self._wakeup.set()
+
+        while pool.spares:
+            channel = guild.get_channel(pool.spares.popleft())
+            if channel is None or channel.members:
+                continue
+            try:
+                await self.scheduler.edit_channel(
+                    channel,
+                    PRIORITY_USER,
+                    name=name,
+                    overwrites=dict(category.overwrites)
+                )
+            except discord.HTTPException as e:
+                print(f"Error claiming spare channel: {str(e)}")
+                continue
+            pool.deficits.append(time.monotonic())
+            self.claims += 1
+            self._observe(self.claim_latency, "claim", time.monotonic() - started)
+            return channel
+
+        self.misses += 1
+        return None
+
+    def forget(self, channel_id):
+        """Drop a spare that was deleted outside the pool"""
+        for pool in self.pools.values():
+            if channel_id in pool.spares:
+                pool.spares.remove(channel_id)
+                return
+
+    def is_spare(self, channel_id):
+        return any(channel_id in pool.spares for pool in self.pools.values())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_horizon)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            for pool in list(self.pools.values()):
+                await self._refill(pool)
+
+    async def _refill(self, pool):
+        guild = self.bot.get_guild(pool.guild_id)
+        category = guild.get_channel(pool.category_id) if guild else None
+        if category is None:
+            self.pools.pop((pool.guild_id, pool.category_id), None)
+            return
+
+        target = self.target_size(pool)
+        while len(pool.spares) < target:
+            overwrites = dict(category.overwrites)
+            hidden = overwrites.get(guild.default_role, discord.PermissionOverwrite())
+            hidden = discord.PermissionOverwrite(**dict(hidden))
+            hidden.update(view_channel=False)
+            overwrites[guild.default_role] = hidden
+            overwrites[guild.me] = discord.PermissionOverwrite(view_channel=True, connect=True)
+            try:
+                channel = await self.scheduler.create_voice_channel(
+                    guild,
+                    PRIORITY_BACKGROUND,
+                    name=SPARE_CHANNEL_NAME,
+                    category=category,
+                    overwrites=overwrites
+                )
+            except discord.HTTPException as e:
+                print(f"Error creating spare channel: {str(e)}")
+                return
+            pool.spares.append(channel.id)
+            if pool.deficits:
+                self._observe(self.refill_lag, "refill", time.monotonic() - pool.deficits.popleft())
+
+        # Shrink back when the join rate drops
+        while len(pool.spares) > target:
+            channel = guild.get_channel(pool.spares.pop())
+            if channel is not None:
+                try:
+                    await self.scheduler.delete_channel(channel)
+                except discord.HTTPException:
+                    pass
+        if len(pool.spares) >= target:
+            pool.deficits.clear()
+
+    def _observe(self, samples, kind, seconds):
+        samples.append(seconds)
+        if self.observer is not None:
+            self.observer(kind, seconds)
+
+    def stats(self):
+        """Claim and refill numbers for monitoring"""
+        def summary(samples):
+            if not samples:
+                return {"avg": 0.0, "max": 0.0}
+            return {"avg": sum(samples) / len(samples), "max": max(samples)}
+
+        return {
+            "claims": self.claims,
+            "misses": self.misses,
+            "spares": sum(len(pool.spares) for pool in self.pools.values()),
+            "claim_latency": summary(self.claim_latency),
+            "refill_lag": summary(self.refill_lag),
+        }
@@ -0,0 +1,138 @@
+import asyncio
+import time
+
+import discord
+
+from rest_scheduler import PRIORITY_BACKGROUND
+
+
+def _kind(channel):
+    """Cache bucket for a guild channel"""
+    if isinstance(channel, discord.CategoryChannel):
+        return "category"
+    if isinstance(channel, discord.VoiceChannel):
+        return "voice"
+    return "text"
+
+
+class ChannelResolver:
+    """Caches named channel and category IDs per guild
+
+    The first lookup for a name scans the guild once; later lookups are a
+    dict hit plus guild.get_channel(). Misses are cached too, so a missing
+    channel does not cost a scan per event. Entries are dropped from the
+    on_guild_channel_* listeners.
+    """
+
+    def __init__(self, scheduler, create_cooldown=60.0):
+        self.scheduler = scheduler
+        self.create_cooldown = create_cooldown
+        self.cache = {}  # guild_id -> {(kind, name): channel_id or None}
+        self._last_create = {}  # (guild_id, kind, name) -> monotonic time
+        self._creating = {}  # (guild_id, kind, name) -> Task
+
+    def text_channel(self, guild, name):
+        return self._lookup(guild, "text", name)
+
+    def voice_channel(self, guild, name):
+        return self._lookup(guild, "voice", name)
+
+    def category(self, guild, name):
+        return self._lookup(guild, "category", name)
+
+    async def get_or_create_text_channel(self, guild, name, priority=PRIORITY_BACKGROUND, **kwargs):
+        return await self._get_or_create(guild, "text", name, guild.create_text_channel, priority, kwargs)
+
+    async def get_or_create_voice_channel(self, guild, name, priority=PRIORITY_BACKGROUND, **kwargs):
+        return await self._get_or_create(guild, "voice", name, guild.create_voice_channel, priority, kwargs)
+
+    async def get_or_create_category(self, guild, name, priority=PRIORITY_BACKGROUND, **kwargs):
+        return await self._get_or_create(guild, "category", name, guild.create_category, priority, kwargs)
+
+    def _lookup(self, guild, kind, name):
+        entries = self.cache.setdefault(guild.id, {})
+        key = (kind, name)
+        if key in entries:
+            channel_id = entries[key]
+            if channel_id is None:
+                return None
+            channel = guild.get_channel(channel_id)
+            if channel is not None and channel.name == name:
+                return channel
+
+        # Cold or stale entry: scan the guild once
+        if kind == "category":
+            channels = guild.categories
+        elif kind == "voice":
+            channels = guild.voice_channels
+        else:
+            channels = guild.text_channels
+        channel = discord.utils.get(channels, name=name)
+        entries[key] = channel.id if channel else None
+        return channel
+
+    async def _get_or_create(self, guild, kind, name, create, priority, kwargs):
+        channel = self._lookup(guild, kind, name)
+        if channel:
+            return channel
+
+        key = (guild.id, kind, name)
+        # Join a create that is already in flight instead of starting another
+        task = self._creating.get(key)
+        if task is not None:
+            return await self._await_create(task, kind, name)
+
+        # Only try to create each missing channel once per cooldown window
+        now = time.monotonic()
+        last = self._last_create.get(key)
+        if last is not None and now - last < self.create_cooldown:
+            return None
+        self._last_create[key] = now
+
+        task = asyncio.ensure_future(
+            self.scheduler.submit(priority, f"guild_channels:{guild.id}", create, name, **kwargs)
+        )
+        self._creating[key] = task
+        try:
+            channel = await self._await_create(task, kind, name, report=True)
+        finally:
+            self._creating.pop(key, None)
+        if channel is not None:
+            self.cache.setdefault(guild.id, {})[(kind, name)] = channel.id
+        return channel
+
+    @staticmethod
+    async def _await_create(task, kind, name, report=False):
+        """The created channel, or None if the create failed (only the creator reports it)"""
+        try:
+            return await asyncio.shield(task)
+        except discord.HTTPException as e:
+            if report:
+                print(f"Error creating {kind} channel {name}: {str(e)}")
+            return None
+
+    # Invalidation, called from the on_guild_channel_* listeners
+    def channel_created(self, channel):
+        entries = self.cache.get(channel.guild.id)
+        if entries is not None:
+            # Replaces a cached miss, if there was one
+            entries.pop((_kind(channel), channel.name), None)
+
+    def channel_deleted(self, channel):
+        entries = self.cache.get(channel.guild.id)
+        if entries is not None:
+            key = (_kind(channel), channel.name)
+            if entries.get(key) == channel.id:
+                del entries[key]
+
+    def channel_updated(self, before, after):
+        if before.name == after.name:
+            return
+        entries = self.cache.get(after.guild.id)
+        if entries is not None:
+            kind = _kind(after)
+            entries.pop((kind, before.name), None)
+            entries.pop((kind, after.name), None)
+
+    def forget_guild(self, guild_id):
+        self.cache.pop(guild_id, None)
@@ -0,0 +1,388 @@
+"""Cluster mode: several bot processes, each owning a range of gateway shards
+
+    python cluster.py
+
+The supervisor splits SHARD_COUNT shards over CLUSTER_WORKERS processes,
+each running bot.py as an AutoShardedBot for its range, and restarts any
+worker that exits. Workers talk through a state bus on a Unix socket
+(CLUSTER_SOCKET): calls to one or all workers and calls to the
+supervisor, one JSON message per line.
+"""
+import asyncio
+import itertools
+import json
+import os
+import signal
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# Longest single bus message (one JSON line)
+MESSAGE_LIMIT = 2 ** 20
+
+
+def shard_ranges(shard_count, workers):
+    """Split shard IDs 0..shard_count-1 into `workers` contiguous ranges"""
+    workers = max(1, min(workers, shard_count))
+    size, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for worker in range(workers):
+        end = start + size + (1 if worker < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+def _send(writer, message):
+    writer.write((json.dumps(message) + "\n").encode())
+
+
+class StateBus:
+    """The supervisor's end of the bus
+
+    A call names a method and a target: one worker, every worker (None), or
+    "supervisor". Worker calls are forwarded to the targets and their
+    results gathered into one reply; workers that don't answer within the
+    call's timeout are reported as timed out.
+    """
+
+    def __init__(self, path, call_timeout=5.0):
+        self.path = path
+        self.call_timeout = call_timeout
+        self.workers = {}  # worker_id -> writer
+        self.handlers = {}  # method -> async callable for target "supervisor"
+        self._pending = {}  # forwarded call id -> (results, waiting worker ids, done event)
+        self._ids = itertools.count(1)
+        self._server = None
+
+    async def start(self):
+        if self._server is not None:
+            return
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path, limit=MESSAGE_LIMIT)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in list(self.workers.values()):
+            writer.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _serve(self, reader, writer):
+        worker_id = None
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                op = message["op"]
+                if op == "hello":
+                    worker_id = message["worker"]
+                    self.workers[worker_id] = writer
+                    print(f"Worker {worker_id} joined the bus (shards {message.get('shards')})")
+                elif op == "call":
+                    asyncio.create_task(self._call(writer, message))
+                elif op == "result":
+                    self._result(worker_id, message)
+        except (ConnectionError, ValueError, KeyError) as e:
+            print(f"Error on cluster bus connection: {str(e)}")
+        finally:
+            if worker_id is not None and self.workers.get(worker_id) is writer:
+                del self.workers[worker_id]
+                print(f"Worker {worker_id} left the bus")
+            writer.close()
+
+    async def _call(self, writer, message):
+        method = message["method"]
+        args = message.get("args", {})
+        target = message.get("target")
+        timeout = message.get("timeout", self.call_timeout)
+
+        if target == "supervisor":
+            handler = self.handlers.get(method)
+            if handler is None:
+                results = [{"worker": "supervisor", "error": f"unknown method {method}"}]
+            else:
+                try:
+                    results = [{"worker": "supervisor", "value": await handler(**args)}]
+                except Exception as e:
+                    results = [{"worker": "supervisor", "error": str(e)}]
+        else:
+            targets = list(self.workers) if target is None else [target]
+            forward_id = next(self._ids)
+            gathered = {}
+            waiting = set()
+            done = asyncio.Event()
+            for worker_id in targets:
+                worker = self.workers.get(worker_id)
+                if worker is None:
+                    gathered[worker_id] = {"worker": worker_id, "error": "not connected"}
+                    continue
+                waiting.add(worker_id)
+                _send(worker, {"op": "invoke", "id": forward_id, "method": method, "args": args})
+            if waiting:
+                self._pending[forward_id] = (gathered, waiting, done)
+                try:
+                    await asyncio.wait_for(done.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    for worker_id in waiting:
+                        gathered[worker_id] = {"worker": worker_id, "error": "timed out"}
+                finally:
+                    del self._pending[forward_id]
+            results = [gathered[worker_id] for worker_id in targets]
+
+        try:
+            _send(writer, {"op": "reply", "id": message["id"], "results": results})
+        except ConnectionError:
+            pass
+
+    def _result(self, worker_id, message):
+        pending = self._pending.get(message["id"])
+        if pending is None or worker_id not in pending[1]:
+            return
+        gathered, waiting, done = pending
+        result = {"worker": worker_id}
+        if "error" in message:
+            result["error"] = message["error"]
+        else:
+            result["value"] = message.get("value")
+        gathered[worker_id] = result
+        waiting.discard(worker_id)
+        if not waiting:
+            done.set()
+
+
+class BusClient:
+    """A worker's end of the bus; does nothing when no socket path is set
+
+    Methods other processes may call are registered with handler(). The
+    client reconnects on its own if the supervisor restarts the bus.
+    """
+
+    def __init__(self, path, worker_id=0, shard_ids=None, timeout=5.0):
+        self.path = path
+        self.worker_id = worker_id
+        self.shard_ids = shard_ids or []
+        self.timeout = timeout
+        self.handlers = {}  # method -> async callable(**args)
+        self._writer = None
+        self._replies = {}  # request id -> future
+        self._ids = itertools.count(1)
+        self._task = None
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    @property
+    def connected(self):
+        return self._writer is not None
+
+    def handler(self, name):
+        """Decorator registering an async function as bus method `name`"""
+        def register(func):
+            self.handlers[name] = func
+            return func
+        return register
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        delay = 1.0
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=MESSAGE_LIMIT)
+                _send(writer, {"op": "hello", "worker": self.worker_id, "shards": self.shard_ids})
+                self._writer = writer
+                delay = 1.0
+                async for line in reader:
+                    self._dispatch(json.loads(line))
+            except (OSError, ValueError) as e:
+                print(f"Error on cluster bus: {str(e)}")
+            finally:
+                self._writer = None
+                for future in self._replies.values():
+                    if not future.done():
+                        future.set_exception(ConnectionError("Cluster bus disconnected"))
+                self._replies.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _dispatch(self, message):
+        op = message["op"]
+        if op == "invoke":
+            asyncio.create_task(self._invoke(message))
+        elif op == "reply":
+            future = self._replies.pop(message["id"], None)
+            if future is not None and not future.done():
+                future.set_result(message)
+
+    async def _invoke(self, message):
+        handler = self.handlers.get(message["method"])
+        reply = {"op": "result", "id": message["id"]}
+        if handler is None:
+            reply["error"] = f"unknown method {message['method']}"
+        else:
+            try:
+                reply["value"] = await handler(**message.get("args", {}))
+            except Exception as e:
+                reply["error"] = str(e)
+        if self._writer is not None:
+            _send(self._writer, reply)
+
+    async def _request(self, message, timeout):
+        if self._writer is None:
+            raise ConnectionError("Not connected to the cluster bus")
+        message["id"] = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._replies[message["id"]] = future
+        _send(self._writer, message)
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._replies.pop(message["id"], None)
+
+    async def call(self, method, target=None, **args):
+        """Call `method` on one worker, every worker (None) or "supervisor"
+
+        Returns a list of {"worker", "value"} or {"worker", "error"} dicts.
+        """
+        message = {"op": "call", "method": method, "target": target, "args": args, "timeout": self.timeout}
+        reply = await self._request(message, self.timeout + 1.0)
+        return reply["results"]
+
+
+class Supervisor:
+    """Runs one bot.py process per shard range and restarts any that exit
+
+    A worker that exits is restarted after a delay that doubles on each
+    quick crash (up to max_restart_delay) and resets once a worker has
+    stayed up for that long.
+    """
+
+    def __init__(self, shard_count, workers, socket_path, script="bot.py",
+                 restart_delay=1.0, max_restart_delay=60.0):
+        self.shard_count = shard_count
+        self.ranges = shard_ranges(shard_count, workers)
+        self.script = script
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.bus = StateBus(socket_path)
+        self.bus.handlers["workers"] = self.worker_status
+        self.bus.handlers["restart"] = self.restart_worker
+        self.processes = {}  # worker_id -> asyncio subprocess
+        self.restarts = {worker_id: 0 for worker_id in range(len(self.ranges))}
+        self._requested = set()  # workers restarted on request, skip the delay
+        self._stopping = asyncio.Event()
+
+    def _env(self, worker_id):
+        env = dict(os.environ)
+        env["CLUSTER_WORKER_ID"] = str(worker_id)
+        env["CLUSTER_SOCKET"] = self.bus.path
+        env["SHARD_IDS"] = ",".join(str(shard) for shard in self.ranges[worker_id])
+        env["SHARD_COUNT"] = str(self.shard_count)
+        return env
+
+    async def _keep_running(self, worker_id):
+        delay = self.restart_delay
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            process = await asyncio.create_subprocess_exec(sys.executable, self.script, env=self._env(worker_id))
+            self.processes[worker_id] = process
+            print(f"Started worker {worker_id} (pid {process.pid}, shards {self.ranges[worker_id]})")
+            code = await process.wait()
+            if self._stopping.is_set():
+                return
+
+            self.restarts[worker_id] += 1
+            if worker_id in self._requested:
+                self._requested.discard(worker_id)
+                continue
+            if time.monotonic() - started >= self.max_restart_delay:
+                delay = self.restart_delay
+            print(f"Worker {worker_id} exited with code {code}, restarting in {delay:g}s")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.max_restart_delay)
+
+    async def worker_status(self):
+        return [
+            {
+                "worker": worker_id,
+                "shards": shards,
+                "pid": self.processes[worker_id].pid if worker_id in self.processes else None,
+                "running": worker_id in self.processes and self.processes[worker_id].returncode is None,
+                "connected": worker_id in self.bus.workers,
+                "restarts": self.restarts[worker_id],
+            }
+            for worker_id, shards in enumerate(self.ranges)
+        ]
+
+    async def restart_worker(self, worker):
+        process = self.processes.get(worker)
+        if process is None or process.returncode is not None:
+            return False
+        self._requested.add(worker)
+        process.terminate()
+        return True
+
+    def stop(self):
+        self._stopping.set()
+        for process in self.processes.values():
+            if process.returncode is None:
+                process.terminate()
+
+    async def run(self):
+        await self.bus.start()
+        tasks = [asyncio.create_task(self._keep_running(worker_id)) for worker_id in range(len(self.ranges))]
+        await self._stopping.wait()
+
+        # Give workers a moment to flush state, then make sure they are gone
+        for process in self.processes.values():
+            try:
+                await asyncio.wait_for(process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.bus.close()
+
+
+async def recommended_shard_count(token):
+    """Shard count Discord recommends for this bot"""
+    import aiohttp
+
+    headers = {"Authorization": f"Bot {token}"}
+    async with aiohttp.ClientSession() as session:
+        async with session.get("https://discord.com/api/v10/gateway/bot", headers=headers) as response:
+            response.raise_for_status()
+            return (await response.json())["shards"]
+
+
+async def main():
+    load_dotenv()
+    workers = int(os.getenv('CLUSTER_WORKERS', str(os.cpu_count() or 1)))
+    shard_count = int(os.getenv('SHARD_COUNT', '0'))
+    if shard_count <= 0:
+        shard_count = await recommended_shard_count(os.getenv('DISCORD_TOKEN'))
+    socket_path = os.getenv('CLUSTER_SOCKET', 'vcbot-cluster.sock')
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bot.py")
+
+    supervisor = Supervisor(shard_count, workers, socket_path, script)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, supervisor.stop)
+    print(f"Running {shard_count} shards on {len(supervisor.ranges)} workers")
+    await supervisor.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,380 @@
+import discord
+
+def _embed_state(embed):
+    """(slot, value) pairs set on an embed, fields excluded"""
+    state = []
+    for name in discord.Embed.__slots__:
+        if name == "_fields":
+            continue
+        try:
+            state.append((name, getattr(embed, name)))
+        except AttributeError:
+            pass
+    return tuple(state)
+
+
+def copy_embed(embed, state=None):
+    """Copy an embed without the to_dict/from_dict round trip of Embed.copy()
+
+    The setters (set_footer, set_author, ...) replace their dicts rather
+    than editing them, so those are shared; only the field list and field
+    dicts, which add_field/set_field_at change in place, are copied.
+    """
+    copy = discord.Embed.__new__(discord.Embed)
+    for name, value in state or _embed_state(embed):
+        setattr(copy, name, value)
+    fields = getattr(embed, "_fields", None)
+    if fields is not None:
+        copy._fields = [field.copy() for field in fields]
+    return copy
+
+
+class EmbedTemplate:
+    """A prebuilt embed plus the spots that take per-call values"""
+
+    __slots__ = ("embed", "state", "slots")
+
+    def __init__(self, embed):
+        self.embed = embed
+        self.state = _embed_state(embed)
+        # Only strings with {placeholders} are formatted on render
+        self.slots = []
+        for attr in ("title", "description"):
+            if "{" in (getattr(embed, attr) or ""):
+                self.slots.append((attr, None))
+        for index, field in enumerate(getattr(embed, "_fields", ())):
+            for key in ("name", "value"):
+                if "{" in field[key]:
+                    self.slots.append((index, key))
+        if "{" in (embed.footer.text or ""):
+            self.slots.append(("footer", "text"))
+
+    def render(self, values):
+        embed = copy_embed(self.embed, self.state)
+        for where, key in self.slots:
+            if where == "footer":
+                embed._footer = dict(embed._footer, text=embed._footer["text"].format_map(values))
+            elif key is None:
+                setattr(embed, where, getattr(embed, where).format_map(values))
+            else:
+                field = embed._fields[where]
+                field[key] = field[key].format_map(values)
+        return embed
+
+
+class EmbedTemplates:
+    """Registry of embeds that are built once and handed out as copies
+
+    Builders are registered by name and run by build(); call it again after
+    a config change to pick up new content. render() returns a fresh copy
+    with any {placeholders} filled in, so callers may modify it freely.
+    """
+
+    def __init__(self):
+        self.builders = {}
+        self.templates = {}
+
+    def register(self, name):
+        def decorator(builder):
+            self.builders[name] = builder
+            if self.templates:
+                self.templates[name] = EmbedTemplate(builder())
+            return builder
+        return decorator
+
+    def build(self):
+        """(Re)build every registered template"""
+        self.templates = {name: EmbedTemplate(builder()) for name, builder in self.builders.items()}
+
+    def render(self, name, /, **values):
+        if not self.templates:
+            self.build()
+        return self.templates[name].render(values)
+
+
+templates = EmbedTemplates()
+
+
+@templates.register("error")
+def build_error():
+    return discord.Embed(
+        title="Error",
+        description="{message}",
+        color=discord.Color.red()
+    )
+
+
+@templates.register("panel_error")
+def build_panel_error():
+    return discord.Embed(
+        title="❌ Error",
+        description="{message}",
+        color=discord.Color.red()
+    )
+
+
+@templates.register("help_updated")
+def build_help_updated():
+    return discord.Embed(
+        title="✅ Help Updated",
+        description="{what} has been posted in <#{channel_id}>",
+        color=discord.Color.green()
+    )
+
+
+@templates.register("custom_size")
+def build_custom_size():
+    embed = discord.Embed(
+        title="⚙️ Custom Size Channel",
+        description=(
+            "To create a custom size channel, use the command:\n"
+            "`!size <number>` - Set any size between 1 and 99"
+        ),
+        color=discord.Color.yellow()
+    )
+    embed.set_footer(text="Example: !size 15")
+    return embed
+
+
+@templates.register("channel_created")
+def build_channel_created():
+    embed = discord.Embed(
+        title="🎮 Channel Created",
+        description="Your voice channel has been created with {slots} slots!",
+        color=discord.Color.green()
+    )
+    embed.add_field(
+        name="📋 Channel Info",
+        value=(
+            "**Name:** {name}\n"
+            "**Size:** {size}\n"
+            "**Owner:** {owner}"
+        ),
+        inline=False
+    )
+    embed.add_field(
+        name="🛠️ Available Commands",
+        value=(
+            "• `!name <new_name>` - Rename channel\n"
+            "• `!privacy` - Toggle private mode\n"
+            "• `!size <number>` - Change size\n"
+            "• `!help` - View all commands"
+        ),
+        inline=False
+    )
+    embed.set_footer(text="Anti Stress Voice Channels • Type !commands for more options")
+    return embed
+
+
+@templates.register("info")
+def build_info():
+    """The voice channel information embed"""
+    embed = discord.Embed(
+        title="🎮 Anti Stress Voice Channels",
+        description=(
+            "Create your own custom voice channel with advanced features and full control! "
+            "Choose from preset sizes or create a custom-sized channel."
+        ),
+        color=discord.Color.blue()
+    )
+
+    # Channel Features
+    embed.add_field(
+        name="✨ Channel Features",
+        value=(
+            "• 🔒 Private or Public mode\n"
+            "• 👥 Custom member limit\n"
+            "• 📝 Custom channel name\n"
+            "• 🎵 Adjustable bitrate\n"
+            "• ⚡ Quick size presets"
+        ),
+        inline=True
+    )
+
+    # Management Features
+    embed.add_field(
+        name="🛠️ Management",
+        value=(
+            "• 👑 Full owner controls\n"
+            "• ✅ Whitelist system\n"
+            "• ❌ Blacklist system\n"
+            "• 🎯 Temporary hosts\n"
+            "• 🔄 Auto-cleanup"
+        ),
+        inline=True
+    )
+
+    # Size Presets
+    embed.add_field(
+        name="📊 Available Sizes",
+        value=(
+            "**Quick Create Buttons:**\n"
+            "• 🎮 Duo (2) • 🎲 Trio (3)\n"
+            "• 🎯 Quad (4) • 🎪 Penta (5)\n"
+            "• 🎨 Hexa (6) • 🎭 Septa (7)\n"
+            "• 🎼 Octa (8) • 🎬 Deca (10)\n"
+            "• ♾️ Unlimited • ⚙️ Custom"
+        ),
+        inline=False
+    )
+
+    # Important Notes
+    embed.add_field(
+        name="📝 Important Notes",
+        value=(
+            "• Channels auto-delete when empty\n"
+            "• Staff can access any channel if needed\n"
+            "• All server rules apply in custom channels\n"
+            "• Use `!commands` for full command list\n"
+            "• Click buttons below to create a channel"
+        ),
+        inline=False
+    )
+
+    embed.set_footer(text="Anti Stress Voice Channels • Click a button below to create your channel")
+    return embed
+
+
+@templates.register("quick_help")
+def build_quick_help():
+    """Short help posted by !helpvc"""
+    embed = discord.Embed(
+        title="🎮 Voice Channel Help",
+        description=(
+            "Welcome to Anti Stress Voice Channels! Here's your quick guide to "
+            "essential features and commands."
+        ),
+        color=discord.Color.blue()
+    )
+
+    # Core Commands
+    embed.add_field(
+        name="📋 Basic Commands",
+        value=(
+            "• `!create <name> [size]` Create a channel\n"
+            "• `!name <new_name>` Rename channel\n"
+            "• `!size <number>` Set member limit\n"
+            "• `!privacy` Toggle private mode\n"
+            "• `!info` View channel details"
+        ),
+        inline=False
+    )
+
+    # Management
+    embed.add_field(
+        name="⚙️ Management",
+        value=(
+            "• `!whitelist <user>` Allow specific users\n"
+            "• `!blacklist <user>` Block specific users\n"
+            "• `!guests add/remove <user>` Manage guests\n"
+            "• `!host <user>` Set temporary host\n"
+            "• `!transfer <user>` Transfer ownership"
+        ),
+        inline=False
+    )
+
+    # Quick Tips
+    embed.add_field(
+        name="💡 Quick Tips",
+        value=(
+            "• Use quick-create buttons below info panel\n"
+            "• Private channels are invite-only\n"
+            "• Temporary hosts can manage users\n"
+            "• Channels auto-delete when empty\n"
+            "• Type `!commands` for full command list"
+        ),
+        inline=False
+    )
+
+    embed.set_footer(text="Anti Stress Voice Channels • Type !helpvc for quick help or !commands for detailed list")
+    return embed
+
+
+@templates.register("commands")
+def build_commands():
+    """Full command list posted by !commands"""
+    embed = discord.Embed(
+        title="🎮 Anti Stress Voice Commands",
+        description=(
+            "Welcome to Anti Stress Voice Channels! Here's your complete guide to all "
+            "available commands and features. Commands are organized by category for easy reference."
+        ),
+        color=discord.Color.blue()
+    )
+
+    # Core Channel Management
+    embed.add_field(
+        name="🎯 Core Commands",
+        value=(
+            "• `!create <name> [size]` Create your own channel\n"
+            "• `!info` View channel features and options\n"
+            "• `!view` See detailed channel information"
+        ),
+        inline=False
+    )
+
+    # Channel Settings
+    embed.add_field(
+        name="⚙️ Channel Settings",
+        value=(
+            "• `!name <new_name>` Rename your channel\n"
+            "• `!size <limit>` Set member limit (0 for unlimited)\n"
+            "• `!bitrate <value>` Adjust audio quality (8-96 kbps)\n"
+            "• `!reset` Restore default settings"
+        ),
+        inline=False
+    )
+
+    # Privacy & Security
+    embed.add_field(
+        name="🔒 Privacy & Security",
+        value=(
+            "• `!privacy` Toggle private/public mode\n"
+            "• `!whitelist <user>` Allow specific users\n"
+            "• `!blacklist <user>` Block specific users\n"
+            "• `!unban <user>` Remove user from blacklist"
+        ),
+        inline=False
+    )
+
+    # User Management
+    embed.add_field(
+        name="👥 User Management",
+        value=(
+            "• `!guests add <user>` Add to guest list\n"
+            "• `!guests remove <user>` Remove from guest list\n"
+            "• `!guests list` View current guests\n"
+            "• `!mute <user>` Mute a user\n"
+            "• `!unmute <user>` Unmute a user"
+        ),
+        inline=False
+    )
+
+    # Administrative
+    embed.add_field(
+        name="👑 Administrative",
+        value=(
+            "• `!transfer <user>` Transfer channel ownership\n"
+            "• `!host <user>` Set temporary host\n"
+            "• `!changehost <user>` Change current host"
+        ),
+        inline=False
+    )
+
+    # Pro Tips
+    embed.add_field(
+        name="💡 Pro Tips",
+        value=(
+            "• Use quick-create buttons below info panel\n"
+            "• Private channels are invite-only\n"
+            "• Channels auto-delete when empty\n"
+            "• Owners can set temporary hosts\n"
+            "• Staff can access any channel if needed"
+        ),
+        inline=False
+    )
+
+    embed.set_footer(
+        text="Anti Stress Voice Channels • Type !helpvc for quick help or !commands for detailed list"
+    )
+    return embed
@@ -0,0 +1,131 @@
+import json
+import os
+
+# Settings every guild has, with the values used when a guild doesn't set them
+DEFAULTS = {
+    "lobby_channel": "➕ Join to Create",  # Joining it creates a channel
+    "voice_category": "・ PRIVATE VOICE ZONE・",  # Category created on startup
+    "join_channel": "private¹",  # Voice channel created in that category
+    "button_category": "Voice Channels",  # Where the size buttons create channels
+    "log_channel": "voice-logs",  # Text channel for voice logs (null disables them)
+    "info_channel_id": None,  # Where the info panel is posted
+    "help_channel_id": None,  # Where !helpvc and !commands post
+}
+
+ID_SETTINGS = ("info_channel_id", "help_channel_id")
+
+
+class GuildConfig:
+    """Settings for one guild"""
+
+    __slots__ = ("guild_id",) + tuple(DEFAULTS)
+
+    def __init__(self, guild_id, settings):
+        self.guild_id = guild_id
+        for name, default in DEFAULTS.items():
+            setattr(self, name, settings.get(name, default))
+
+    @classmethod
+    def parse(cls, guild_id, settings, defaults):
+        unknown = set(settings) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown settings for guild {guild_id}: {', '.join(sorted(unknown))}")
+        merged = dict(defaults)
+        merged.update(settings)
+        for name in ID_SETTINGS:
+            value = merged.get(name)
+            merged[name] = int(value) if value else None
+        return cls(guild_id, merged)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in DEFAULTS}
+
+    def __eq__(self, other):
+        return isinstance(other, GuildConfig) and self.guild_id == other.guild_id and self.as_dict() == other.as_dict()
+
+
+class GuildConfigStore:
+    """Per-guild settings from a JSON file, reloadable while the bot runs
+
+    The file looks like:
+
+        {
+            "all_guilds": false,
+            "defaults": {"log_channel": "voice-logs"},
+            "guilds": {
+                "123456789012345678": {"info_channel_id": 234567890123456789}
+            }
+        }
+
+    Only listed guilds are served unless all_guilds is true, in which case
+    every other guild gets the defaults. Without a file the bot serves the
+    single guild given by `fallback_guild_id` with `fallback` settings
+    (the GUILD_ID / INFO_CHANNEL_ID / HELP_CHANNEL_ID environment).
+    """
+
+    def __init__(self, path, fallback_guild_id=0, fallback=None):
+        self.path = path
+        self.fallback_guild_id = fallback_guild_id
+        self.fallback = fallback or {}
+        self.configs = {}  # guild_id -> GuildConfig
+        self.defaults = dict(DEFAULTS)
+        self.all_guilds = False
+        self.load()
+
+    def get(self, guild_id):
+        """The guild's config, or None if the bot doesn't serve it"""
+        config = self.configs.get(guild_id)
+        if config is None and self.all_guilds:
+            config = self.configs[guild_id] = GuildConfig(guild_id, self.defaults)
+        return config
+
+    def __contains__(self, guild_id):
+        return self.get(guild_id) is not None
+
+    def _read(self):
+        """(configs, defaults, all_guilds) from the file or the fallback"""
+        if not os.path.exists(self.path):
+            defaults = dict(DEFAULTS)
+            configs = {}
+            if self.fallback_guild_id:
+                settings = {}
+                for name, value in self.fallback.items():
+                    # Placeholders left in .env behave like unset values
+                    if name in ID_SETTINGS and value and not str(value).isdigit():
+                        print(f"Ignoring {name}: {value!r} is not an ID")
+                        continue
+                    settings[name] = value
+                configs[self.fallback_guild_id] = GuildConfig.parse(self.fallback_guild_id, settings, defaults)
+            return configs, defaults, False
+
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        defaults = GuildConfig.parse(0, data.get("defaults", {}), DEFAULTS).as_dict()
+        configs = {}
+        for guild_id, settings in data.get("guilds", {}).items():
+            configs[int(guild_id)] = GuildConfig.parse(int(guild_id), settings, defaults)
+        return configs, defaults, bool(data.get("all_guilds", False))
+
+    def load(self):
+        self.configs, self.defaults, self.all_guilds = self._read()
+
+    def reload(self):
+        """Re-read the settings; returns (added, changed, removed) guild IDs
+
+        Raises ValueError (or OSError) and keeps the current settings if the
+        file can't be read.
+        """
+        configs, defaults, all_guilds = self._read()
+        if all_guilds:
+            # Guilds served on defaults keep being served, with the new defaults
+            for guild_id in self.configs:
+                if guild_id not in configs:
+                    configs[guild_id] = GuildConfig(guild_id, defaults)
+        added = {guild_id for guild_id in configs if guild_id not in self.configs}
+        removed = {guild_id for guild_id in self.configs if guild_id not in configs}
+        changed = {
+            guild_id for guild_id in configs
+            if guild_id in self.configs and configs[guild_id] != self.configs[guild_id]
+        }
+        self.configs, self.defaults, self.all_guilds = configs, defaults, all_guilds
+        return added, changed, removed
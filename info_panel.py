@@ -0,0 +1,88 @@
+import hashlib
+import json
+
+import discord
+
+PANEL_KEY = "info_panel"
+
+
+def panel_hash(embed, view):
+    """Fingerprint of what the panel shows, used to skip no-op edits"""
+    payload = {"embed": embed.to_dict(), "components": view.to_components()}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class InfoPanel:
+    """The info embed with the size buttons, kept as one message per guild
+
+    The posted message is remembered in the state store. On startup it is
+    edited only if its content changed, and a new one is posted only if
+    there is none yet (or it was deleted), so restarts don't pile up
+    duplicates. An unchanged panel costs one fetch per run, to notice a
+    message deleted while the bot was offline; after that, deletes are
+    seen through message_deleted().
+
+    Panels posted before per-guild settings were stored under one key;
+    that record belongs to `legacy_guild_id` (the single guild served
+    then) and no other guild.
+    """
+
+    def __init__(self, bot, scheduler, store, legacy_guild_id=None):
+        self.bot = bot
+        self.scheduler = scheduler
+        self.store = store
+        self.legacy_guild_id = legacy_guild_id
+        self._stored = {}  # guild_id -> cached copy of the stored panel record
+        self._by_message = {}  # message_id -> guild_id, for deletes
+        self._verified = set()  # guild_ids whose stored message was seen to exist this run
+
+    def stored(self, guild_id):
+        record = self._stored.get(guild_id)
+        if record is None:
+            record = self.store.get_meta(f"{PANEL_KEY}:{guild_id}")
+            if record is None and guild_id == self.legacy_guild_id:
+                record = self.store.get_meta(PANEL_KEY)
+            self._stored[guild_id] = record or {}
+        return self._stored[guild_id]
+
+    async def sync(self, guild_id, channel_id, embed, view):
+        """Bring the guild's panel in channel_id up to date; returns what was done"""
+        digest = panel_hash(embed, view)
+        stored = self.stored(guild_id)
+        channel = self.bot.get_partial_messageable(channel_id)
+
+        if stored.get("channel_id") == channel_id and stored.get("message_id"):
+            message = channel.get_partial_message(stored["message_id"])
+            try:
+                if stored.get("hash") == digest:
+                    if guild_id not in self._verified:
+                        await self.scheduler.fetch_message(message)
+                        self._verified.add(guild_id)
+                    self._by_message[stored["message_id"]] = guild_id
+                    return "unchanged"
+                await self.scheduler.edit_message(message, embed=embed, view=view)
+                self._remember(guild_id, channel_id, message.id, digest)
+                return "edited"
+            except discord.NotFound:
+                pass  # Deleted while we were away; post a new one
+
+        message = await self.scheduler.send(channel, embed=embed, view=view)
+        self._remember(guild_id, channel_id, message.id, digest)
+        return "posted"
+
+    def message_deleted(self, message_id):
+        """Forget a panel whose message was deleted; returns its guild ID, or None"""
+        guild_id = self._by_message.pop(message_id, None)
+        if guild_id is not None:
+            self._stored[guild_id] = {}
+            self._verified.discard(guild_id)
+            self.store.set_meta(f"{PANEL_KEY}:{guild_id}", {})
+        return guild_id
+
+    def _remember(self, guild_id, channel_id, message_id, digest):
+        previous = self._stored.get(guild_id, {}).get("message_id")
+        self._by_message.pop(previous, None)
+        self._stored[guild_id] = {"channel_id": channel_id, "message_id": message_id, "hash": digest}
+        self._verified.add(guild_id)
+        self._by_message[message_id] = guild_id
+        self.store.set_meta(f"{PANEL_KEY}:{guild_id}", self._stored[guild_id])
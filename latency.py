@@ -0,0 +1,61 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted sequence (0.0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class StageLatency:
+    """Recent durations of the named stages of a multi-step operation
+
+    Each stage keeps its last `samples` timings in a ring buffer, so the
+    percentiles reflect current behaviour and memory stays bounded.
+    """
+
+    def __init__(self, samples=500):
+        self.samples = samples
+        self.timings = {}  # stage -> deque of seconds
+        self.counters = {}  # event name -> count
+        # Optional hook called as observer(stage, seconds) for every timing
+        self.observer = None
+
+    def record(self, stage, seconds):
+        timings = self.timings.get(stage)
+        if timings is None:
+            timings = self.timings[stage] = deque(maxlen=self.samples)
+        timings.append(seconds)
+        if self.observer is not None:
+            self.observer(stage, seconds)
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block (awaits included) as stage `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def count(self, name):
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    def stats(self):
+        """Per-stage sample count and p50/p95/max in milliseconds"""
+        return {
+            "stages": {
+                stage: {
+                    "count": len(timings),
+                    "p50_ms": round(percentile(timings, 0.50) * 1000, 1),
+                    "p95_ms": round(percentile(timings, 0.95) * 1000, 1),
+                    "max_ms": round(max(timings) * 1000, 1),
+                }
+                for stage, timings in self.timings.items() if timings
+            },
+            "counters": dict(self.counters),
+        }
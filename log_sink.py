@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections import deque
+
+import discord
+
+from rest_scheduler import PRIORITY_BACKGROUND
+
+# Discord allows up to 10 embeds and 6000 embed characters per message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+class VoiceLogSink:
+    """Batches voice-logs embeds into as few messages as possible"""
+
+    def __init__(self, bot, resolver, scheduler, channel_name="voice-logs", max_queue=500,
+                 flush_interval=2.0, create_missing=True, enabled=True):
+        self.bot = bot
+        self.enabled = enabled
+        self.resolver = resolver
+        self.scheduler = scheduler
+        self.channel_name = channel_name
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self.create_missing = create_missing
+        self.pending = {}  # guild_id -> deque of embeds
+        self.retry_at = {}  # guild_id -> monotonic time its log channel may be tried again
+        # Optional hook returning the log channel name for a guild (None: no logs)
+        self.channel_name_of = None
+        self.dropped = 0
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def log(self, guild, embed):
+        """Queue an embed for the guild's log channel without waiting on Discord"""
+        if guild is None or not self.enabled:
+            return
+        queue = self.pending.get(guild.id)
+        if queue is None:
+            queue = self.pending[guild.id] = deque(maxlen=self.max_queue)
+        # A full deque silently drops its oldest entry on append
+        if len(queue) == self.max_queue:
+            self.dropped += 1
+        queue.append(embed)
+        if len(queue) >= MAX_EMBEDS_PER_MESSAGE:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the background writer (safe to call on every reconnect)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush what is left and stop the writer"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def queue_depth(self):
+        return sum(len(queue) for queue in self.pending.values())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep the writer alive for the next round
+                print(f"Error writing voice logs: {str(e)}")
+
+    async def flush(self):
+        """Send every queued embed, packed into messages of up to 10 embeds
+
+        A guild whose log channel is rate limited or failing is skipped
+        until its back-off ends, without holding up the other guilds.
+        """
+        now = time.monotonic()
+        for guild_id in list(self.pending):
+            if self.retry_at.get(guild_id, 0) > now:
+                continue
+            self.retry_at.pop(guild_id, None)
+            queue = self.pending[guild_id]
+            while queue:
+                guild = self.bot.get_guild(guild_id)
+                log_channel = await self._get_log_channel(guild) if guild else None
+                if log_channel is None:
+                    # Nowhere to send it; discard instead of retrying forever
+                    self.dropped += len(queue)
+                    queue.clear()
+                    break
+
+                batch = self._take_batch(queue)
+                try:
+                    await self.scheduler.send(log_channel, PRIORITY_BACKGROUND, embeds=batch)
+                except discord.HTTPException as e:
+                    # Put the batch back and let the queue absorb new entries
+                    # (dropping the oldest) while we back off
+                    for embed in reversed(batch):
+                        if len(queue) == self.max_queue:
+                            self.dropped += 1
+                            continue
+                        queue.appendleft(embed)
+                    retry_after = getattr(e, "retry_after", None) or self.flush_interval
+                    print(f"Error sending voice logs: {str(e)}")
+                    self.retry_at[guild_id] = time.monotonic() + retry_after
+                    break
+                self.sent_messages += 1
+                self.sent_embeds += len(batch)
+
+    def _take_batch(self, queue):
+        batch = []
+        chars = 0
+        while queue and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            size = len(queue[0])
+            if batch and chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            batch.append(queue.popleft())
+            chars += size
+        return batch
+
+    async def _get_log_channel(self, guild):
+        name = self.channel_name_of(guild) if self.channel_name_of is not None else self.channel_name
+        if not name:
+            return None
+        if self.create_missing:
+            return await self.resolver.get_or_create_text_channel(guild, name)
+        return self.resolver.text_channel(guild, name)
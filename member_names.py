@@ -0,0 +1,77 @@
+import time
+from collections import OrderedDict
+
+# Members that could not be found are not looked up again for this long
+MISSING_TTL = 300.0
+
+
+class MemberNameCache:
+    """User ID -> name, looked up once and kept until the user changes
+
+    Lookups go to the cache, then the guild's member cache. IDs that are
+    still unknown are fetched from the gateway in bulk (100 per request) by
+    resolve(). Entries are dropped by forget(), called from the member and
+    user update listeners, and the oldest ones are evicted past max_size.
+    """
+
+    def __init__(self, max_size=10_000):
+        self.max_size = max_size
+        self.names = OrderedDict()  # user_id -> name
+        self.missing = {}  # user_id -> monotonic time it may be retried
+        self.hits = 0
+        self.misses = 0
+        self.fetched = 0
+
+    def name(self, guild, user_id):
+        """Cached or cache-resolvable name, or None (never makes a request)"""
+        name = self.names.get(user_id)
+        if name is not None:
+            self.hits += 1
+            self.names.move_to_end(user_id)
+            return name
+        self.misses += 1
+        member = guild.get_member(user_id)
+        if member is None:
+            return None
+        self._store(user_id, member.name)
+        return member.name
+
+    async def resolve(self, guild, user_ids):
+        """Names for user_ids in order, fetching unknown members in bulk"""
+        found = {}
+        unknown = []
+        now = time.monotonic()
+        for user_id in dict.fromkeys(user_ids):
+            name = self.name(guild, user_id)
+            if name is not None:
+                found[user_id] = name
+            elif self.missing.get(user_id, 0) <= now:
+                unknown.append(user_id)
+
+        for start in range(0, len(unknown), 100):
+            chunk = unknown[start:start + 100]
+            try:
+                members = await guild.query_members(user_ids=chunk, limit=len(chunk), cache=True)
+            except Exception as e:
+                print(f"Error fetching member names: {str(e)}")
+                members = []
+            self.fetched += len(members)
+            for member in members:
+                self._store(member.id, member.name)
+                found[member.id] = member.name
+            for user_id in chunk:
+                if user_id not in found:
+                    self.missing[user_id] = now + MISSING_TTL
+
+        return [found.get(user_id, f"Unknown ({user_id})") for user_id in user_ids]
+
+    def forget(self, user_id):
+        self.names.pop(user_id, None)
+        self.missing.pop(user_id, None)
+
+    def _store(self, user_id, name):
+        self.names[user_id] = name
+        self.names.move_to_end(user_id)
+        self.missing.pop(user_id, None)
+        if len(self.names) > self.max_size:
+            self.names.popitem(last=False)
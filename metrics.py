@@ -0,0 +1,210 @@
+import functools
+import math
+import time
+from bisect import bisect_left
+
+from aiohttp import web
+
+# Seconds; covers a fast cache hit up to a badly rate limited request
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _read(name, function):
+    """Series from a scrape-time callback: a number, or {label values: number}"""
+    try:
+        value = function()
+    except Exception as e:
+        print(f"Error reading metric {name}: {str(e)}")
+        return
+    series = value if isinstance(value, dict) else {(): value}
+    for labels, number in series.items():
+        if number is None or (isinstance(number, float) and math.isnan(number)):
+            continue
+        yield labels if isinstance(labels, tuple) else (labels,), number
+
+
+class Counter:
+    """Monotonic count, optionally split by label values
+
+    Either incremented with inc(), or read when scraped from a callback
+    (set_function) for totals another object already keeps.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}  # label values tuple -> count
+        self.functions = []  # callables returning a total, or {label values: total}
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set_function(self, function):
+        self.functions.append(function)
+
+    def expose(self):
+        for labels, value in self.values.items():
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+        for function in self.functions:
+            for labels, number in _read(self.name, function):
+                yield f"{self.name}{_labels(self.labels, labels)} {_number(number)}"
+
+
+class Gauge:
+    """Current value, read from callbacks when scraped
+
+    Nothing is updated on the hot path: each series is a function that is
+    only called when /metrics is requested.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.functions = []  # callables returning a number, or {label values: number}
+
+    def set_function(self, function):
+        self.functions.append(function)
+
+    def expose(self):
+        for function in self.functions:
+            for labels, number in _read(self.name, function):
+                yield f"{self.name}{_labels(self.labels, labels)} {_number(number)}"
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets
+
+    observe() is a bisect and three increments; cumulative bucket counts
+    are only worked out when scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values tuple -> [bucket counts..., sum, count]
+
+    def observe(self, value, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def expose(self):
+        for labels, series in self.series.items():
+            running = 0
+            for bound, count in zip(self.buckets + (math.inf,), series):
+                running += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {running}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(series[-2])}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {series[-1]}"
+
+
+class MetricsRegistry:
+    """Named metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def _add(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+def timed(histogram, *labels):
+    """Decorator recording how long each call of a coroutine function takes"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *labels)
+        return wrapper
+    return decorator
+
+
+class MetricsServer:
+    """Serves registry.render() on http://host:port/metrics"""
+
+    def __init__(self, registry, host="127.0.0.1", port=0):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def start(self):
+        """Start listening (safe to call on every reconnect; port 0 disables it)"""
+        if self._runner is not None or not self.port:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as e:
+            print(f"Error starting metrics server on {self.host}:{self.port}: {str(e)}")
+            await runner.cleanup()
+            return
+        self._runner = runner
+
+    async def _handle(self, request):
+        return web.Response(
+            body=self.registry.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+        )
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,63 @@
+import discord
+
+from rest_scheduler import PRIORITY_PERMISSIONS
+
+
+def desired_overwrites(channel_data):
+    """Overwrite map a managed channel should have, derived from its record
+
+    Role overwrites and the bot's own overwrite are kept as they are. Member
+    overwrites come only from the record: the owner can manage the channel,
+    whitelisted users and guests can connect, blacklisted users cannot.
+    """
+    channel = channel_data.channel
+    guild = channel.guild
+    desired = {}
+    for target, overwrite in channel.overwrites.items():
+        if isinstance(target, discord.Role) or target.id == guild.me.id:
+            desired[target] = overwrite
+
+    # Private channels are closed to @everyone; public ones drop that deny
+    everyone = discord.PermissionOverwrite(**dict(desired.get(guild.default_role, discord.PermissionOverwrite())))
+    if channel_data.is_private:
+        everyone.update(connect=False)
+    elif everyone.connect is False:
+        everyone.update(connect=None)
+    if everyone.is_empty():
+        desired.pop(guild.default_role, None)
+    else:
+        desired[guild.default_role] = everyone
+
+    def target(user_id):
+        return guild.get_member(user_id) or discord.Object(id=user_id)
+
+    for user_id in channel_data.whitelist + channel_data.guests:
+        desired[target(user_id)] = discord.PermissionOverwrite(connect=True)
+    for user_id in channel_data.blacklist:
+        desired[target(user_id)] = discord.PermissionOverwrite(connect=False)
+    desired[target(channel_data.owner_id)] = discord.PermissionOverwrite(connect=True, manage_channels=True)
+    return desired
+
+
+def overwrites_differ(current, desired):
+    """Compare two overwrite maps by target ID"""
+    current_by_id = {target.id: overwrite for target, overwrite in current.items()}
+    desired_by_id = {target.id: overwrite for target, overwrite in desired.items()}
+    return current_by_id != desired_by_id
+
+
+async def apply_overwrites(channel_data, scheduler, **fields):
+    """Bring the channel's overwrites in line with its record in one edit
+
+    Extra channel fields (name, user_limit, ...) ride along in the same
+    request. Nothing is sent when there is no difference and no fields.
+    Returns True if a request was made.
+    """
+    channel = channel_data.channel
+    desired = desired_overwrites(channel_data)
+    if overwrites_differ(channel.overwrites, desired):
+        fields["overwrites"] = desired
+    if not fields:
+        return False
+    await scheduler.edit_channel(channel, PRIORITY_PERMISSIONS, **fields)
+    return True
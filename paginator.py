@@ -0,0 +1,91 @@
+import discord
+
+
+def chunked(items, size):
+    """Split a sequence into lists of at most `size` items"""
+    return [list(items[start:start + size]) for start in range(0, len(items), size)]
+
+
+class PagedEmbedView(discord.ui.View):
+    """Previous/next buttons over embed pages that are rendered on demand
+
+    `render_page(index)` is an async callable returning the embed for a
+    page; each page is rendered the first time it is shown and then reused.
+    Only the member who asked for the pages can flip through them.
+    """
+
+    def __init__(self, render_page, page_count, author_id, timeout=180.0):
+        super().__init__(timeout=timeout)
+        self.render_page = render_page
+        self.page_count = page_count
+        self.author_id = author_id
+        self.page = 0
+        self.pages = {}  # index -> rendered Embed
+        self.message = None
+        self._update_buttons()
+
+    async def get_page(self, index):
+        embed = self.pages.get(index)
+        if embed is None:
+            embed = await self.render_page(index)
+            footer = f"Page {index + 1}/{self.page_count}"
+            if embed.footer.text:
+                footer = f"{embed.footer.text} • {footer}"
+            embed.set_footer(text=footer)
+            self.pages[index] = embed
+        return embed
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("Only the member who asked can change pages.", ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction, index):
+        self.page = max(0, min(index, self.page_count - 1))
+        self._update_buttons()
+        # Rendering may need a member fetch, so acknowledge first
+        await interaction.response.defer()
+        await interaction.edit_original_response(embed=await self.get_page(self.page), view=self)
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.gray)
+    async def previous_page(self, interaction, button):
+        await self._show(interaction, self.page - 1)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.gray)
+    async def next_page(self, interaction, button):
+        await self._show(interaction, self.page + 1)
+
+    async def on_timeout(self):
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+
+async def send_paged(ctx, render_page, page_count):
+    """Send page 1, with page buttons if there is more than one page"""
+    if page_count <= 1:
+        return await ctx.send(embed=await render_page(0))
+    view = PagedEmbedView(render_page, page_count, ctx.author.id)
+    view.message = await ctx.send(embed=await view.get_page(0), view=view)
+    return view.message
+
+
+def clip_lines(lines, limit=1024):
+    """Join lines for one embed field, ending in "… and N more" if they don't all fit"""
+    text = ""
+    for index, line in enumerate(lines):
+        candidate = f"{text}\n{line}" if text else line
+        remaining = len(lines) - index - 1
+        suffix = f"\n… and {remaining} more" if remaining else ""
+        if len(candidate) + len(suffix) > limit:
+            more = f"… and {len(lines) - index} more"
+            return f"{text}\n{more}" if text else more
+        text = candidate
+    return text
@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import discord
+
+
+class PresenceManager:
+    """Keeps the bot's presence in sync with the member count
+
+    The count is the guild's, or the total over every guild the bot is in
+    when guild_id is None.
+
+    Presence is only sent when the member count actually changed, and at
+    most once every `min_interval` seconds. The static activities can be
+    rotated in as well by setting `rotate_interval`. Only one task runs no
+    matter how often start() is called, and it is restarted if it crashes.
+    """
+
+    def __init__(self, bot, guild_id, min_interval=60.0, rotate_interval=0.0, static_activities=()):
+        self.bot = bot
+        self.guild_id = guild_id
+        self.min_interval = min_interval
+        self.rotate_interval = rotate_interval
+        # Built once; they never change
+        self.static_activities = [discord.Game(name=name) for name in static_activities]
+        self.updates_sent = 0
+        self._sent_count = None
+        self._sent_at = 0.0
+        self._rotation = 0
+        self._changed = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        """Start the presence task unless it is already running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._supervise())
+
+    def member_count_changed(self):
+        self._changed.set()
+
+    async def _supervise(self):
+        backoff = 1.0
+        while True:
+            try:
+                await self._run()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Presence task failed, restarting: {str(e)}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 300.0)
+
+    async def _run(self):
+        self._changed.set()  # Always send once after (re)starting
+        while True:
+            timeout = self.rotate_interval if self.rotate_interval > 0 else None
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                # Time to show the next static activity
+                await self._rotate()
+                continue
+            self._changed.clear()
+
+            # Respect the minimum interval between presence updates
+            wait = self.min_interval - (time.monotonic() - self._sent_at)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._send_member_count()
+
+    def _member_count(self):
+        if self.guild_id is None:
+            return sum(guild.member_count or 0 for guild in self.bot.guilds)
+        guild = self.bot.get_guild(self.guild_id)
+        return guild.member_count if guild else 0
+
+    async def _send_member_count(self):
+        total_members = self._member_count()
+        if total_members == self._sent_count:
+            return
+        await self._change(discord.Game(name=f"Hug {total_members} members!"))
+        self._sent_count = total_members
+
+    async def _rotate(self):
+        if not self.static_activities:
+            return
+        # Slot 0 is the member count, the rest are the static activities
+        self._rotation = (self._rotation + 1) % (len(self.static_activities) + 1)
+        if self._rotation == 0:
+            self._sent_count = None
+            await self._send_member_count()
+        else:
+            await self._change(self.static_activities[self._rotation - 1])
+            self._sent_count = None
+
+    async def _change(self, activity):
+        await self.bot.change_presence(activity=activity)
+        self._sent_at = time.monotonic()
+        self.updates_sent += 1
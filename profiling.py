@@ -0,0 +1,196 @@
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from latency import percentile
+
+# Invocation being profiled in the current task (inherited by tasks it spawns)
+_current = contextvars.ContextVar("profiled_invocation", default=None)
+
+
+class Invocation:
+    __slots__ = ("handler", "started_at", "wall", "busy", "rest_calls")
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.started_at = time.time()
+        self.wall = 0.0
+        self.busy = 0.0  # Time actually running on the event loop
+        self.rest_calls = 0
+
+    @property
+    def awaiting(self):
+        """Time spent suspended in awaits"""
+        return max(0.0, self.wall - self.busy)
+
+
+class _Stepped:
+    """Drives a coroutine step by step, adding up the time spent in each step"""
+
+    def __init__(self, coro, invocation):
+        self.coro = coro
+        self.invocation = invocation
+
+    def __await__(self):
+        coro = self.coro
+        value, error = None, None
+        while True:
+            started = time.perf_counter()
+            try:
+                if error is not None:
+                    yielded = coro.throw(error)
+                else:
+                    yielded = coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.invocation.busy += time.perf_counter() - started
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+
+
+class Profiler:
+    """Per-handler wall time, await time and REST calls in ring buffers
+
+    wrap() instruments a coroutine function; every call is recorded into a
+    fixed-size buffer for its handler name. report() gives percentiles per
+    handler and the slowest invocations still in the buffers.
+    """
+
+    def __init__(self, samples=256):
+        self.samples = samples
+        self.history = {}  # handler -> deque of Invocation
+
+    def wrap(self, func, handler=None):
+        handler = handler or func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            invocation = Invocation(handler)
+            token = _current.set(invocation)
+            started = time.perf_counter()
+            try:
+                return await _Stepped(func(*args, **kwargs), invocation)
+            finally:
+                invocation.wall = time.perf_counter() - started
+                _current.reset(token)
+                self._record(invocation)
+        return wrapper
+
+    def profile(self, handler=None):
+        """Decorator form of wrap()"""
+        return lambda func: self.wrap(func, handler)
+
+    def wrap_commands(self, bot):
+        """Instrument the callback of every registered command"""
+        for command in bot.walk_commands():
+            command.callback = self.wrap(command.callback, f"!{command.qualified_name}")
+
+    @staticmethod
+    def rest_call(route):
+        """Count a REST request against the invocation that issued it"""
+        invocation = _current.get()
+        if invocation is not None:
+            invocation.rest_calls += 1
+
+    def _record(self, invocation):
+        history = self.history.get(invocation.handler)
+        if history is None:
+            history = self.history[invocation.handler] = deque(maxlen=self.samples)
+        history.append(invocation)
+
+    def report(self):
+        """Percentiles per handler, slowest (by p95) first"""
+        rows = []
+        for handler, history in self.history.items():
+            if not history:
+                continue
+            walls = [i.wall for i in history]
+            rows.append({
+                "handler": handler,
+                "count": len(history),
+                "p50": percentile(walls, 0.50),
+                "p95": percentile(walls, 0.95),
+                "p99": percentile(walls, 0.99),
+                "await_p95": percentile([i.awaiting for i in history], 0.95),
+                "busy_p95": percentile([i.busy for i in history], 0.95),
+                "rest_avg": sum(i.rest_calls for i in history) / len(history),
+            })
+        rows.sort(key=lambda row: row["p95"], reverse=True)
+        return rows
+
+    def slowest(self, count=5):
+        invocations = [i for history in self.history.values() for i in history]
+        invocations.sort(key=lambda i: i.wall, reverse=True)
+        return invocations[:count]
+
+
+class SamplingProfiler:
+    """Samples the event loop thread's stack from a side thread
+
+    Because it runs in its own thread it still sees where the loop is stuck
+    when a handler blocks it. Off by default; start()/stop() switch it at
+    runtime. Stacks are kept as the innermost `depth` frames.
+    """
+
+    def __init__(self, interval=0.005, depth=6):
+        self.interval = interval
+        self.depth = depth
+        self.stacks = Counter()
+        self.samples = 0
+        self.idle = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._target = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=None):
+        """Start sampling the calling thread (call it from the event loop)"""
+        if interval:
+            self.interval = interval
+        if self.running:
+            return
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self):
+        self.stacks.clear()
+        self.samples = 0
+        self.idle = 0
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            self.samples += 1
+            if frame.f_code.co_name in ("select", "poll", "epoll", "control"):
+                # Waiting for I/O, nothing running
+                self.idle += 1
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.depth:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[" < ".join(stack)] += 1
+
+    def top(self, count=5):
+        return self.stacks.most_common(count)
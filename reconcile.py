@@ -0,0 +1,80 @@
+import asyncio
+
+import discord
+
+
+def find_owner(channel):
+    """Owner of an unmanaged channel, taken from its manage_channels overwrite"""
+    fallback = None
+    for target, overwrite in channel.overwrites.items():
+        if isinstance(target, discord.Member) and overwrite.manage_channels:
+            if target in channel.members:
+                return target
+            fallback = fallback or target
+    if fallback is not None:
+        return fallback
+    # Join-to-Create channels carry no overwrite; whoever is inside takes over
+    return channel.members[0] if channel.members else None
+
+
+def looks_managed(channel):
+    """True for channels the bot creates (owner overwrite or default name)"""
+    if channel.name.endswith("'s Channel"):
+        return True
+    return any(
+        isinstance(target, discord.Member) and overwrite.manage_channels
+        for target, overwrite in channel.overwrites.items()
+    )
+
+
+def plan_reconciliation(categories, known_channels, skip_ids=()):
+    """Diff one guild's cached channels against its known records
+
+    `known_channels` are the guild's VoiceChannel records only; other
+    guilds' channels are theirs to reconcile. Returns (adopt, orphans,
+    stale): occupied unknown channels with their owner, empty unknown
+    channels, and known channels that emptied while the bot was offline.
+    Only reads the gateway cache.
+    """
+    known_channels = list(known_channels)
+    known_ids = {channel_data.channel_id for channel_data in known_channels}
+    adopt = []
+    orphans = []
+    for category in categories:
+        for channel in category.voice_channels:
+            if channel.id in known_ids or channel.id in skip_ids:
+                continue
+            if not looks_managed(channel):
+                continue
+            if channel.members:
+                owner = find_owner(channel)
+                if owner is not None:
+                    adopt.append((channel, owner))
+            else:
+                orphans.append(channel)
+
+    stale = []
+    for channel_data in known_channels:
+        channel = channel_data.channel
+        if channel is not None and not channel.members:
+            stale.append(channel)
+    return adopt, orphans, stale
+
+
+async def delete_channels(channels, scheduler, concurrency=5):
+    """Delete channels with at most `concurrency` requests in flight; returns the deleted ones"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def delete(channel):
+        async with semaphore:
+            try:
+                await scheduler.delete_channel(channel, reason="Empty temporary channel found at startup")
+                return True
+            except discord.NotFound:
+                return True
+            except discord.HTTPException as e:
+                print(f"Error deleting {channel.name}: {str(e)}")
+                return False
+
+    results = await asyncio.gather(*(delete(channel) for channel in channels))
+    return [channel for channel, deleted in zip(channels, results) if deleted]
@@ -0,0 +1,345 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+
+import discord
+
+# Priority classes, lowest number runs first
+PRIORITY_USER = 0  # moves and creates someone is waiting on
+PRIORITY_PERMISSIONS = 1  # overwrites, mutes, moderation
+PRIORITY_BACKGROUND = 2  # log messages, cosmetic edits, cleanup
+
+PRIORITY_NAMES = {
+    PRIORITY_USER: "user",
+    PRIORITY_PERMISSIONS: "permissions",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Requests a route kind may have in flight at once. Routes not listed run one
+# at a time, so edits to one channel or moves of one member keep their order;
+# discord.py's rate limiter paces the requests of a shared bucket.
+ROUTE_LIMITS = {
+    "guild_channels": 5,  # channel creates in one guild
+}
+
+
+class _Job:
+    __slots__ = ("priority", "route", "func", "args", "kwargs", "future", "queued_at", "started", "edit_key",
+                 "guild_id", "callers")
+
+    def __init__(self, priority, route, func, args, kwargs):
+        self.priority = priority
+        self.route = route
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+        self.started = False
+        self.edit_key = None
+        self.guild_id = None
+        self.callers = 1  # Callers waiting on a merged edit
+
+
+class _Route:
+    __slots__ = ("limit", "running", "waiting", "calls", "rate_limited")
+
+    def __init__(self, limit=1):
+        self.limit = limit
+        self.running = 0
+        self.waiting = deque()
+        self.calls = 0
+        self.rate_limited = 0
+
+
+class RestScheduler:
+    """Runs every Discord mutation through one prioritized queue
+
+    Jobs are ordered by priority class, then arrival. Each route (one
+    channel's edits, one member's moves, one guild's channel creates) has
+    at most its ROUTE_LIMITS requests in flight, so a backed-up route cannot
+    hold workers that other routes could use. While other guilds have
+    requests waiting, one guild uses at most `guild_limit` workers, so a
+    busy guild cannot starve the rest; idle workers still take its extra
+    requests. Queued edits to the same channel are merged into a single
+    request.
+    """
+
+    def __init__(self, workers=16, max_retries=3, guild_limit=4, route_limits=None):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.guild_limit = guild_limit
+        self.route_limits = dict(ROUTE_LIMITS if route_limits is None else route_limits)
+        self.routes = {}
+        self.merged_edits = 0
+        self.wait_times = {priority: deque(maxlen=256) for priority in PRIORITY_NAMES}
+        # Optional hook called as call_observer(route, seconds, status) after every request
+        self.call_observer = None
+        # Optional hook called as submit_observer(route) for every new request queued
+        self.submit_observer = None
+        # Optional hook called as wait_observer(priority name, seconds) when a request leaves the queue
+        self.wait_observer = None
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending_edits = {}  # channel_id -> queued _Job
+        self._guild_running = {}  # guild_id -> requests running
+        self._guild_waiting = {}  # guild_id -> jobs parked at the guild limit
+        self._queued = {priority: 0 for priority in PRIORITY_NAMES}
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+
+    def start(self):
+        """Start the worker tasks (safe to call more than once)"""
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    # Submitting work
+    async def submit(self, priority, route, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) and wait for its result"""
+        return await self.submit_nowait(priority, route, func, *args, **kwargs)
+
+    def submit_nowait(self, priority, route, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) and return a future for its result"""
+        self.start()
+        job = _Job(priority, route, func, args, kwargs)
+        self._submitted(job)
+        return job.future
+
+    async def _submit_for(self, guild, priority, route, func, *args, **kwargs):
+        """submit() for a request on behalf of a guild, counted against its limit"""
+        self.start()
+        job = _Job(priority, route, func, args, kwargs)
+        job.guild_id = guild.id if guild is not None else None
+        self._submitted(job)
+        return await job.future
+
+    async def edit_channel(self, channel, priority=PRIORITY_BACKGROUND, **fields):
+        """channel.edit(**fields), merged with any edit of the channel still queued"""
+        self.start()
+        job = self._pending_edits.get(channel.id)
+        if job is not None and not job.started and not job.future.done():
+            job.kwargs.update(fields)
+            job.callers += 1
+            self.merged_edits += 1
+            if priority < job.priority:
+                # Re-queue under the more urgent class; the old heap entry is skipped
+                self._queued[job.priority] -= 1
+                job.priority = priority
+                self._push(job)
+            return await self._wait_edit(job)
+
+        job = _Job(priority, f"channel:{channel.id}", channel.edit, (), dict(fields))
+        job.edit_key = channel.id
+        job.guild_id = channel.guild.id
+        self._pending_edits[channel.id] = job
+        self._submitted(job)
+        return await self._wait_edit(job)
+
+    async def _wait_edit(self, job):
+        """Wait for a (possibly merged) edit; one caller giving up does not cancel it for the others"""
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            job.callers -= 1
+            if not job.callers and not job.started:
+                # Every caller gave up before it ran: drop it
+                job.future.cancel()
+                if self._pending_edits.get(job.edit_key) is job:
+                    del self._pending_edits[job.edit_key]
+            raise
+
+    # Shortcuts for the common calls
+    async def create_voice_channel(self, guild, priority=PRIORITY_USER, **kwargs):
+        return await self._submit_for(guild, priority, f"guild_channels:{guild.id}", guild.create_voice_channel,
+                                      **kwargs)
+
+    async def move(self, member, channel, priority=PRIORITY_USER):
+        return await self._submit_for(member.guild, priority, f"guild_members:{member.guild.id}:{member.id}",
+                                      member.move_to, channel)
+
+    async def edit_member(self, member, priority=PRIORITY_PERMISSIONS, **kwargs):
+        return await self._submit_for(member.guild, priority, f"guild_members:{member.guild.id}:{member.id}",
+                                      member.edit, **kwargs)
+
+    async def set_permissions(self, channel, target, priority=PRIORITY_PERMISSIONS, **kwargs):
+        return await self._submit_for(channel.guild, priority, f"channel:{channel.id}", channel.set_permissions,
+                                      target, **kwargs)
+
+    async def delete_channel(self, channel, priority=PRIORITY_BACKGROUND, **kwargs):
+        return await self._submit_for(channel.guild, priority, f"channel:{channel.id}", channel.delete, **kwargs)
+
+    async def send(self, channel, priority=PRIORITY_BACKGROUND, **kwargs):
+        return await self._submit_for(getattr(channel, "guild", None), priority, f"channel_messages:{channel.id}",
+                                      channel.send, **kwargs)
+
+    async def edit_message(self, message, priority=PRIORITY_BACKGROUND, **kwargs):
+        return await self._submit_for(getattr(message.channel, "guild", None), priority,
+                                      f"channel_messages:{message.channel.id}", message.edit, **kwargs)
+
+    async def fetch_message(self, message, priority=PRIORITY_BACKGROUND):
+        return await self._submit_for(getattr(message.channel, "guild", None), priority,
+                                      f"channel_messages:{message.channel.id}", message.fetch)
+
+    # Queue internals
+    def _submitted(self, job):
+        if self.submit_observer is not None:
+            self.submit_observer(job.route)
+        self._push(job)
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.priority, next(self._seq), job))
+        self._queued[job.priority] += 1
+        self._wakeup.set()
+
+    def _next_job(self):
+        """Highest priority job whose route is free, or None"""
+        while self._heap:
+            priority, _, job = heapq.heappop(self._heap)
+            if job.started or priority != job.priority:
+                # Stale entry left behind by a merge or a re-queue
+                continue
+            if job.future.done():
+                # The caller gave up before the job ran
+                job.started = True
+                self._queued[job.priority] -= 1
+                continue
+            route = self._route(job.route)
+            if route.running >= route.limit:
+                # Park it on the route; it is re-queued when the route frees up
+                route.waiting.append(job)
+                continue
+            if job.guild_id is not None and self._guild_running.get(job.guild_id, 0) >= self.guild_limit:
+                # Same for a guild that already uses its share of the workers
+                self._guild_waiting.setdefault(job.guild_id, deque()).append(job)
+                continue
+            self._queued[job.priority] -= 1
+            return job
+        return self._next_over_limit()
+
+    def _next_over_limit(self):
+        """Nothing else can run: hand an idle worker a job parked at its guild limit"""
+        for guild_id in list(self._guild_waiting):
+            waiting = self._guild_waiting[guild_id]
+            while waiting:
+                job = waiting.popleft()
+                if job.started:
+                    continue
+                if job.future.done():
+                    job.started = True
+                    self._queued[job.priority] -= 1
+                    continue
+                route = self._route(job.route)
+                if route.running >= route.limit:
+                    route.waiting.append(job)
+                    continue
+                if not waiting:
+                    del self._guild_waiting[guild_id]
+                self._queued[job.priority] -= 1
+                return job
+            del self._guild_waiting[guild_id]
+        return None
+
+    def _route(self, key):
+        route = self.routes.get(key)
+        if route is None:
+            route = self.routes[key] = _Route(self.route_limits.get(key.split(":", 1)[0], 1))
+        return route
+
+    async def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            await self._run(job)
+
+    async def _run(self, job):
+        route = self.routes[job.route]
+        route.running += 1
+        job.started = True
+        if job.guild_id is not None:
+            self._guild_running[job.guild_id] = self._guild_running.get(job.guild_id, 0) + 1
+        if job.edit_key is not None and self._pending_edits.get(job.edit_key) is job:
+            del self._pending_edits[job.edit_key]
+        waited = time.monotonic() - job.queued_at
+        self.wait_times[job.priority].append(waited)
+        if self.wait_observer is not None:
+            self.wait_observer(PRIORITY_NAMES[job.priority], waited)
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                route.calls += 1
+                started = time.perf_counter()
+                try:
+                    result = await job.func(*job.args, **job.kwargs)
+                except discord.HTTPException as e:
+                    self._observe(job.route, started, e.status)
+                    if e.status != 429 or attempt == self.max_retries:
+                        raise
+                    # discord.py normally retries 429s itself; this covers the rest
+                    route.rate_limited += 1
+                    retry_after = getattr(e, "retry_after", None) or 1.0
+                    await asyncio.sleep(retry_after)
+                    continue
+                except Exception:
+                    self._observe(job.route, started, "error")
+                    raise
+                self._observe(job.route, started, "ok")
+                if not job.future.done():
+                    job.future.set_result(result)
+                break
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            route.running -= 1
+            # Hand the route's next parked job back to the queue
+            self._requeue_next(route.waiting)
+            if not route.running and not route.waiting:
+                # Per-member routes come and go; keep only the ones with counters worth reporting
+                if not route.rate_limited:
+                    del self.routes[job.route]
+            if job.guild_id is not None:
+                self._guild_running[job.guild_id] -= 1
+                if not self._guild_running[job.guild_id]:
+                    del self._guild_running[job.guild_id]
+                waiting = self._guild_waiting.get(job.guild_id)
+                if waiting is not None:
+                    self._requeue_next(waiting)
+                    if not waiting:
+                        del self._guild_waiting[job.guild_id]
+            self._wakeup.set()
+
+    def _requeue_next(self, waiting):
+        """Move the first parked job that hasn't run yet back onto the heap"""
+        while waiting:
+            job = waiting.popleft()
+            if not job.started:
+                heapq.heappush(self._heap, (job.priority, next(self._seq), job))
+                break
+
+    def _observe(self, route, started, status):
+        if self.call_observer is not None:
+            self.call_observer(route, time.perf_counter() - started, status)
+
+    def queue_depth(self):
+        return {PRIORITY_NAMES[priority]: count for priority, count in self._queued.items()}
+
+    def stats(self):
+        """Queue depth, wait times and per-route counters"""
+        waits = {}
+        for priority, samples in self.wait_times.items():
+            waits[PRIORITY_NAMES[priority]] = {
+                "avg": sum(samples) / len(samples) if samples else 0.0,
+                "max": max(samples) if samples else 0.0,
+            }
+        return {
+            "queue_depth": self.queue_depth(),
+            "wait_time": waits,
+            "merged_edits": self.merged_edits,
+            "rate_limited": {key: route.rate_limited for key, route in self.routes.items() if route.rate_limited},
+        }
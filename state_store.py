@@ -0,0 +1,220 @@
+import asyncio
+import json
+import sqlite3
+import threading
+
+
+class StateStore:
+    """Persistence interface for voice channel records
+
+    save() and delete() only queue the change; implementations write
+    queued changes in batches in the background (write-behind).
+    """
+
+    def load_all(self):
+        """Return every stored record as a list of dicts"""
+        return []
+
+    def load_guild(self, guild_id):
+        """Return one guild's stored records"""
+        return [record for record in self.load_all() if record["guild_id"] == guild_id]
+
+    def save(self, channel_data):
+        pass
+
+    def delete(self, channel_id):
+        pass
+
+    def get_meta(self, key, default=None):
+        """Small bot-wide value (e.g. the info panel message) saved under key"""
+        return default
+
+    def set_meta(self, key, value):
+        pass
+
+    def start(self):
+        pass
+
+    async def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class MemoryStateStore(StateStore):
+    """Keeps records in process memory only (nothing survives a restart)"""
+
+    def __init__(self):
+        self.records = {}
+        self.meta = {}
+
+    def load_all(self):
+        return list(self.records.values())
+
+    def save(self, channel_data):
+        record = channel_data.to_record()
+        self.records[record["channel_id"]] = record
+
+    def delete(self, channel_id):
+        self.records.pop(channel_id, None)
+
+    def get_meta(self, key, default=None):
+        return self.meta.get(key, default)
+
+    def set_meta(self, key, value):
+        self.meta[key] = value
+
+
+class SQLiteStateStore(StateStore):
+    """Stores records in SQLite (WAL mode) with write-behind batching
+
+    The connection is used from the event loop (loads and meta values) and
+    from the batch writer's thread, so every use holds `_lock`; a meta
+    write can't land in the middle of a batch transaction. Cluster workers
+    share one file: WAL lets them read while another writes, and a writer
+    waits up to `busy_timeout` seconds for another worker's transaction.
+    """
+
+    def __init__(self, path, flush_interval=1.0, batch_size=100, busy_timeout=10.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dirty = {}  # channel_id -> record, or None for a delete
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS voice_channels ("
+            "channel_id INTEGER PRIMARY KEY, "
+            "guild_id INTEGER NOT NULL, "
+            "owner_id INTEGER NOT NULL, "
+            "host_id INTEGER NOT NULL, "
+            "is_private INTEGER NOT NULL, "
+            "whitelist TEXT NOT NULL, "
+            "blacklist TEXT NOT NULL, "
+            "guests TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS voice_channels_guild ON voice_channels (guild_id)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def load_all(self):
+        return self._load("SELECT {} FROM voice_channels")
+
+    def load_guild(self, guild_id):
+        return self._load("SELECT {} FROM voice_channels WHERE guild_id = ?", (guild_id,))
+
+    def _load(self, query, params=()):
+        with self._lock:
+            rows = self._conn.execute(
+                query.format("channel_id, guild_id, owner_id, host_id, is_private, whitelist, blacklist, guests"),
+                params
+            ).fetchall()
+        return [
+            {
+                "channel_id": row[0],
+                "guild_id": row[1],
+                "owner_id": row[2],
+                "host_id": row[3],
+                "is_private": bool(row[4]),
+                "whitelist": json.loads(row[5]),
+                "blacklist": json.loads(row[6]),
+                "guests": json.loads(row[7]),
+            }
+            for row in rows
+        ]
+
+    def save(self, channel_data):
+        record = channel_data.to_record()
+        self.dirty[record["channel_id"]] = record
+        self._changed()
+
+    def delete(self, channel_id):
+        self.dirty[channel_id] = None
+        self._changed()
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key, value):
+        # Rare and tiny, so written straight away rather than batched
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _changed(self):
+        if len(self.dirty) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the background writer (safe to call on every reconnect)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                print(f"Error saving voice channel state: {str(e)}")
+
+    async def flush(self):
+        """Write all queued changes in one transaction off the event loop"""
+        if not self.dirty:
+            return
+        batch, self.dirty = self.dirty, {}
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except sqlite3.Error:
+            # Keep the changes for the next attempt unless newer ones replaced them
+            for channel_id, record in batch.items():
+                self.dirty.setdefault(channel_id, record)
+            raise
+
+    def _write(self, batch):
+        upserts = []
+        deletes = []
+        for channel_id, record in batch.items():
+            if record is None:
+                deletes.append((channel_id,))
+            else:
+                upserts.append((
+                    record["channel_id"],
+                    record["guild_id"],
+                    record["owner_id"],
+                    record["host_id"],
+                    int(record["is_private"]),
+                    json.dumps(record["whitelist"]),
+                    json.dumps(record["blacklist"]),
+                    json.dumps(record["guests"]),
+                ))
+        with self._lock, self._conn:
+            if upserts:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO voice_channels VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    upserts
+                )
+            if deletes:
+                self._conn.executemany("DELETE FROM voice_channels WHERE channel_id = ?", deletes)
+
+    def close(self):
+        """Write anything still queued and close the database"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.dirty:
+            batch, self.dirty = self.dirty, {}
+            self._write(batch)
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,71 @@
+import asyncio
+import math
+
+
+class TimerWheel:
+    """Hashed timer wheel for many cancellable delayed callbacks
+
+    One task ticks through a ring of slots. Scheduling and cancelling are
+    O(1) dict operations, so thousands of pending timers cost one task
+    instead of one sleeping task each. Delays are rounded up to the tick.
+    """
+
+    def __init__(self, tick=1.0, slots=64):
+        self.tick = tick
+        self.slots = [dict() for _ in range(slots)]  # key -> (rounds left, callback)
+        self.position = 0
+        self.timers = {}  # key -> slot index
+        self._task = None
+
+    def start(self):
+        """Start ticking (safe to call on every reconnect)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def schedule(self, key, delay, callback):
+        """Run `await callback(key)` after `delay` seconds, replacing any timer for key"""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay / self.tick))
+        rounds, offset = divmod(ticks, len(self.slots))
+        if offset == 0:
+            rounds, offset = rounds - 1, len(self.slots)
+        index = (self.position + offset) % len(self.slots)
+        self.slots[index][key] = (rounds, callback)
+        self.timers[key] = index
+
+    def cancel(self, key):
+        """Cancel the timer for key; True if one was pending"""
+        index = self.timers.pop(key, None)
+        if index is None:
+            return False
+        del self.slots[index][key]
+        return True
+
+    def pending(self):
+        return len(self.timers)
+
+    def __contains__(self, key):
+        return key in self.timers
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.tick)
+            self.position = (self.position + 1) % len(self.slots)
+            slot = self.slots[self.position]
+            due = []
+            for key, (rounds, callback) in list(slot.items()):
+                if rounds > 0:
+                    slot[key] = (rounds - 1, callback)
+                else:
+                    del slot[key]
+                    del self.timers[key]
+                    due.append((key, callback))
+            # Fire without waiting so a slow callback cannot stall the wheel
+            for key, callback in due:
+                asyncio.create_task(self._fire(key, callback))
+
+    async def _fire(self, key, callback):
+        try:
+            await callback(key)
+        except Exception as e:
+            print(f"Error in scheduled task for {key}: {str(e)}")
@@ -0,0 +1,259 @@
+from bisect import bisect_left
+
+# Lists of user IDs are kept as sorted tuples; the empty tuple is shared,
+# so channels with no whitelist/blacklist/guests cost nothing extra
+ACCESS_LISTS = ("whitelist", "blacklist", "guests")
+
+
+def _insert(ids, user_id):
+    index = bisect_left(ids, user_id)
+    if index < len(ids) and ids[index] == user_id:
+        return ids
+    return ids[:index] + (user_id,) + ids[index:]
+
+
+def _contains(ids, user_id):
+    index = bisect_left(ids, user_id)
+    return index < len(ids) and ids[index] == user_id
+
+
+class VoiceChannel:
+    """State of one managed voice channel, stored as IDs only
+
+    Discord objects are looked up through the client's cache when they are
+    needed, so records never hold stale Member or Channel objects.
+    """
+
+    __slots__ = ("channel_id", "guild_id", "owner_id", "host_id", "is_private", "whitelist", "blacklist", "guests")
+
+    # Set once at startup so records can resolve IDs through the cache
+    client = None
+
+    def __init__(self, channel_id, guild_id, owner_id):
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.owner_id = owner_id
+        self.host_id = owner_id  # Current host (can be different from owner)
+        self.is_private = False
+        self.whitelist = ()
+        self.blacklist = ()
+        self.guests = ()
+
+    # Lazy lookups through the guild cache
+    @property
+    def guild(self):
+        return VoiceChannel.client.get_guild(self.guild_id)
+
+    @property
+    def channel(self):
+        guild = self.guild
+        return guild.get_channel(self.channel_id) if guild else None
+
+    @property
+    def owner(self):
+        guild = self.guild
+        return guild.get_member(self.owner_id) if guild else None
+
+    @property
+    def host(self):
+        guild = self.guild
+        return guild.get_member(self.host_id) if guild else None
+
+    # Access lists
+    def add(self, list_name, user_id):
+        setattr(self, list_name, _insert(getattr(self, list_name), user_id))
+
+    def remove(self, list_name, user_id):
+        ids = getattr(self, list_name)
+        if not _contains(ids, user_id):
+            raise KeyError(user_id)
+        setattr(self, list_name, tuple(i for i in ids if i != user_id))
+
+    def discard(self, list_name, user_id):
+        if _contains(getattr(self, list_name), user_id):
+            self.remove(list_name, user_id)
+
+    def contains(self, list_name, user_id):
+        return _contains(getattr(self, list_name), user_id)
+
+    def clear_lists(self):
+        self.whitelist = ()
+        self.blacklist = ()
+        self.guests = ()
+
+    def to_record(self):
+        """Plain data for the state store"""
+        return {
+            "channel_id": self.channel_id,
+            "guild_id": self.guild_id,
+            "owner_id": self.owner_id,
+            "host_id": self.host_id,
+            "is_private": self.is_private,
+            "whitelist": list(self.whitelist),
+            "blacklist": list(self.blacklist),
+            "guests": list(self.guests),
+        }
+
+    @classmethod
+    def from_record(cls, record):
+        channel_data = cls(record["channel_id"], record["guild_id"], record["owner_id"])
+        channel_data.host_id = record["host_id"]
+        channel_data.is_private = record["is_private"]
+        channel_data.whitelist = tuple(sorted(record["whitelist"])) or ()
+        channel_data.blacklist = tuple(sorted(record["blacklist"])) or ()
+        channel_data.guests = tuple(sorted(record["guests"])) or ()
+        return channel_data
+
+
+class GuildChannels:
+    """One guild's partition of the registry: its records and their indexes"""
+
+    __slots__ = ("channels", "by_owner", "by_host", "by_member", "occupants")
+
+    def __init__(self):
+        self.channels = {}  # channel_id -> VoiceChannel
+        self.by_owner = {}  # owner_id -> channel_id
+        self.by_host = {}  # host_id -> channel_id
+        self.by_member = {}  # member_id -> channel_id the member is in
+        self.occupants = 0  # Members in the guild's managed channels
+
+
+class ChannelRegistry:
+    """All managed channel records, partitioned per guild
+
+    Behaves like a dict of channel_id -> VoiceChannel for reads. Each guild
+    has its own partition with O(1) lookups by owner, host and member, so
+    guilds never share an index and a guild can be dropped as a whole.
+    Changes go through add/remove/set_owner/set_host and the
+    member_joined/member_left hooks so the indexes stay in step.
+    """
+
+    def __init__(self):
+        self.channels = {}  # channel_id -> VoiceChannel, across guilds
+        self.guilds = {}  # guild_id -> GuildChannels
+        self.members = {}  # channel_id -> set of member IDs inside
+        self.occupants = 0  # Members in managed channels, across guilds
+
+    # Dict-style reads
+    def __contains__(self, channel_id):
+        return channel_id in self.channels
+
+    def __getitem__(self, channel_id):
+        return self.channels[channel_id]
+
+    def __iter__(self):
+        return iter(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def get(self, channel_id, default=None):
+        return self.channels.get(channel_id, default)
+
+    def values(self):
+        return self.channels.values()
+
+    def in_guild(self, guild_id):
+        """Records of one guild"""
+        partition = self.guilds.get(guild_id)
+        return partition.channels.values() if partition else ()
+
+    def occupancy(self, guild_id=None):
+        """(managed channels, members in them) for a guild, or every guild"""
+        if guild_id is None:
+            return len(self.channels), self.occupants
+        partition = self.guilds.get(guild_id)
+        return (len(partition.channels), partition.occupants) if partition else (0, 0)
+
+    # Changes
+    def add(self, channel_data):
+        partition = self.guilds.get(channel_data.guild_id)
+        if partition is None:
+            partition = self.guilds[channel_data.guild_id] = GuildChannels()
+        self.channels[channel_data.channel_id] = channel_data
+        partition.channels[channel_data.channel_id] = channel_data
+        partition.by_owner[channel_data.owner_id] = channel_data.channel_id
+        partition.by_host[channel_data.host_id] = channel_data.channel_id
+        self.members.setdefault(channel_data.channel_id, set())
+        return channel_data
+
+    def remove(self, channel_id):
+        """Drop a record and everything indexed to it; returns the record or None"""
+        channel_data = self.channels.pop(channel_id, None)
+        if channel_data is None:
+            return None
+        partition = self.guilds[channel_data.guild_id]
+        del partition.channels[channel_id]
+        self._unindex(partition.by_owner, channel_data.owner_id, channel_id)
+        self._unindex(partition.by_host, channel_data.host_id, channel_id)
+        members = self.members.pop(channel_id, ())
+        for member_id in members:
+            self._unindex(partition.by_member, member_id, channel_id)
+        partition.occupants -= len(members)
+        self.occupants -= len(members)
+        if not partition.channels:
+            del self.guilds[channel_data.guild_id]
+        return channel_data
+
+    def drop_guild(self, guild_id):
+        """Forget a whole guild's records (in memory only); returns them"""
+        partition = self.guilds.pop(guild_id, None)
+        if partition is None:
+            return []
+        self.occupants -= partition.occupants
+        for channel_id in partition.channels:
+            del self.channels[channel_id]
+            self.members.pop(channel_id, None)
+        return list(partition.channels.values())
+
+    def set_owner(self, channel_data, owner_id):
+        partition = self.guilds[channel_data.guild_id]
+        self._unindex(partition.by_owner, channel_data.owner_id, channel_data.channel_id)
+        channel_data.owner_id = owner_id
+        partition.by_owner[owner_id] = channel_data.channel_id
+
+    def set_host(self, channel_data, host_id):
+        partition = self.guilds[channel_data.guild_id]
+        self._unindex(partition.by_host, channel_data.host_id, channel_data.channel_id)
+        channel_data.host_id = host_id
+        partition.by_host[host_id] = channel_data.channel_id
+
+    def member_joined(self, guild_id, member_id, channel_id):
+        """Record that a member is now in channel_id (managed or not)"""
+        self.member_left(guild_id, member_id)
+        partition = self.guilds.get(guild_id)
+        if partition is not None and channel_id in partition.channels:
+            partition.by_member[member_id] = channel_id
+            self.members[channel_id].add(member_id)
+            partition.occupants += 1
+            self.occupants += 1
+
+    def member_left(self, guild_id, member_id):
+        partition = self.guilds.get(guild_id)
+        if partition is None:
+            return
+        channel_id = partition.by_member.pop(member_id, None)
+        members = self.members.get(channel_id)
+        if members is not None and member_id in members:
+            members.discard(member_id)
+            partition.occupants -= 1
+            self.occupants -= 1
+
+    @staticmethod
+    def _unindex(index, key, channel_id):
+        if index.get(key) == channel_id:
+            del index[key]
+
+    # Lookups
+    def owned_by(self, guild_id, user_id):
+        partition = self.guilds.get(guild_id)
+        return partition.channels.get(partition.by_owner.get(user_id)) if partition else None
+
+    def hosted_by(self, guild_id, user_id):
+        partition = self.guilds.get(guild_id)
+        return partition.channels.get(partition.by_host.get(user_id)) if partition else None
+
+    def channel_of(self, guild_id, member_id):
+        """Managed channel the member is currently in"""
+        partition = self.guilds.get(guild_id)
+        return partition.channels.get(partition.by_member.get(member_id)) if partition else None